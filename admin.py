@@ -1,22 +1,26 @@
-import os, sys, sqlite3, random, datetime, json
+import os, sys, sqlite3, random, datetime, calendar, json
 from contextlib import closing
-
-from PyQt6.QtCore import Qt, QTimer, QDate, QLocale
-from PyQt6.QtGui import QFontDatabase, QFont, QPixmap, QIcon
+import startup_trace   # ก่อน PyQt6 เพื่อให้ --profile-startup นับเวลา import ด้วย
+import assets
+import db_manager
+import migrations
+import eventbus
+import seat_layout
+import booking_core
+
+from PyQt6.QtCore import Qt, QDate, QLocale, QAbstractTableModel, QModelIndex, QRectF, QProcess, QUrl
+from PyQt6.QtGui import QFont, QPixmap, QIcon, QPainter, QColor, QPen, QDesktopServices
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QHBoxLayout, QVBoxLayout,
     QFrame, QStackedWidget, QGridLayout, QLineEdit, QTextEdit,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QComboBox,
-    QSizePolicy, QFileDialog, QSpacerItem
+    QHeaderView, QMessageBox, QComboBox,
+    QSizePolicy, QFileDialog, QSpacerItem, QTableView, QStyledItemDelegate, QStyle, QDateEdit
 )
 
 # ---------- PATHS (แก้ให้ตรงเครื่อง) ----------
 # ******************************************************************************
 # ใช้พาธจากโค้ดหน้าหลัก (main.py) เพื่อให้เชื่อมต่อ DB เดียวกัน
 # ⚠️ ตรวจสอบพาธ 4 ตำแหน่งนี้ให้ถูกต้องตามเครื่องของคุณ!
-RUBIK_REG   = os.path.join("font", "Rubik-Regular.ttf")
-RUBIK_BOLD  = os.path.join("font", "Rubik-Bold.ttf")
-FC_MINIMAL  = os.path.join("font", "FC Minimal.ttf")
 LOGO_IMG    = os.path.join("picture", "logo.png")
 
 # ใช้พาธฐานข้อมูลที่กำหนดในโค้ดหน้าหลัก
@@ -27,6 +31,14 @@ DB_USER_PATH = os.path.join(DB_DIR, "passenger_bookings.db")
 DB_ADMIN_PATH = "users.db" 
 # ******************************************************************************
 
+# สคริปต์ส่งออกตั๋ว/ใบเสร็จย้อนหลัง (รันเป็น process แยก ไม่บล็อกหน้าจอ)
+TICKET_EXPORT_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ticket_export.py")
+
+# จำนวนผลลัพธ์สูงสุดต่อการค้นหา 1 ครั้ง (ให้หน้า Booking & Payment ตอบสนองทันขณะพิมพ์)
+SEARCH_RESULT_LIMIT = 500
+# จำนวนแถวที่โหลดต่อครั้งเมื่อเลื่อนตาราง Booking & Payment (ไม่มีคำค้น)
+BOOKING_PAGE_SIZE = 200
+
 # ---------- THEME ----------
 BG_MAIN   = "#fbf7f1"
 BROWN     = "#8a663f"
@@ -37,10 +49,6 @@ INK       = "#111"
 RED_TXT   = "#b35757"
 BUTTON_BG = "#eaf4f7" # สีพื้นหลังปุ่มใน Manage Trip
 
-def load_fonts():
-    for p in (RUBIK_REG, RUBIK_BOLD, FC_MINIMAL):
-        if os.path.exists(p):
-            QFontDatabase.addApplicationFont(p)
 def TH(size=26, w=QFont.Weight.Normal): return QFont("FC Minimal", size, w)
 def EN(size=18, w=QFont.Weight.DemiBold): return QFont("Rubik", size, w)
 
@@ -48,113 +56,41 @@ def EN(size=18, w=QFont.Weight.DemiBold): return QFont("Rubik", size, w)
 
 def db_connect_user():
     """เชื่อมต่อฐานข้อมูลการจองหลัก (passenger_bookings.db)"""
-    os.makedirs(DB_DIR, exist_ok=True)
-    return sqlite3.connect(DB_USER_PATH)
+    return db_manager.connect(DB_USER_PATH)
 
 def db_connect_admin():
     """เชื่อมต่อฐานข้อมูลแอดมิน/สรุปการจอง (users.db)"""
-    # ตรวจสอบเพื่อรองรับการสร้างตาราง bookings ชั่วคราวใน main.py
-    return sqlite3.connect(DB_ADMIN_PATH)
+    return db_manager.connect(DB_ADMIN_PATH)
 
-def db_init():
-    """เตรียมฐานข้อมูล users.db ให้มีตาราง bookings, users, payments และ routes"""
-    # ใช้ db_connect_admin() สำหรับสร้างโครงสร้างตาราง admin (users.db)
-    with closing(db_connect_admin()) as conn, conn, closing(conn.cursor()) as cur:
-        cur.execute("PRAGMA foreign_keys = ON;")
+def db_connect_booking():
+    """
+    เชื่อมต่อ passenger_bookings.db แล้ว ATTACH users.db เป็น schema 'adm' (เหมือน booking_core.db_connect_booking)
+    ใช้แก้ไขข้อมูลทั้งสองไฟล์ใน transaction เดียว
+    """
+    return db_manager.connect(DB_USER_PATH, attach={"adm": DB_ADMIN_PATH})
 
-        # สร้างตาราง Users
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT NOT NULL DEFAULT 'user',
-            phone TEXT,
-            email TEXT,
-            created_at TEXT DEFAULT (DATE('now'))
-        )
-        """)
-        
-        # สร้างตาราง Bookings (ตารางสรุปการจองที่ main.py บันทึก)
-        # ตารางนี้ต้องตรงกับที่ _db_connect_admin() ใน main.py สร้างไว้
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS bookings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ticket_no TEXT UNIQUE NOT NULL,
-            user_id INTEGER,
-            customer_name TEXT NOT NULL,
-            route_from TEXT NOT NULL,
-            route_to TEXT NOT NULL,
-            date TEXT NOT NULL,          -- YYYY-MM-DD
-            status TEXT NOT NULL,        -- รอดำเนินการ/ยืนยัน/เรียบร้อย/ยกเลิก
-            phone TEXT,
-            email TEXT,
-            seat TEXT,
-            price REAL,
-            vat REAL,
-            slip_path TEXT,
-            dep_time TEXT,
-            arr_time TEXT,
-            created_at TEXT DEFAULT (DATETIME('now')),
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE SET NULL
-        )
-        """)
+def _fts_query(keyword: str) -> str:
+    """แปลงคำค้นเป็น FTS5 query: ทุกคำต้องตรง (AND) แบบ prefix, escape เครื่องหมายคำพูด"""
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in keyword.split())
 
-        # สร้างตาราง Payments
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS payments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            booking_id INTEGER NOT NULL,
-            amount REAL NOT NULL,
-            method TEXT,
-            paid_at TEXT DEFAULT (DATETIME('now')),
-            note TEXT,
-            FOREIGN KEY(booking_id) REFERENCES bookings(id) ON DELETE CASCADE
-        )
-        """)
-
-        # 🌟 ส่วนที่เพิ่ม: สร้างตาราง ROUTES 🌟
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS routes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            route_from TEXT NOT NULL,
-            route_to TEXT NOT NULL,
-            departure_time TEXT NOT NULL, -- เช่น '07:00'
-            duration TEXT,                -- เช่น '4:00 ชม.'
-            capacity INTEGER NOT NULL DEFAULT 40,
-            UNIQUE(route_from, route_to, departure_time) -- ไม่ให้มีเที่ยวซ้ำกัน
-        )
-        """)
-        # 🌟 สิ้นสุดส่วนที่เพิ่ม 🌟
-
-        # เพิ่ม Admin user หากไม่มี
-        cur.execute("SELECT COUNT(*) FROM users WHERE username='admin'")
-        if cur.fetchone()[0] == 0:
-            cur.execute(
-                "INSERT INTO users(username, password_hash, role, email) VALUES(?,?,?,?)",
-                ("admin", "Admin1234 (replace with hash)", "admin", "admin@example.com")
-            )
-            
-        conn.commit()
-    
-    # ⚠️ ตรวจสอบว่าตาราง passenger_bookings ใน DB_USER_PATH มีอยู่หรือไม่
-    try:
-        with closing(db_connect_user()) as conn, conn, closing(conn.cursor()) as cur:
-            cur.execute("SELECT 1 FROM passenger_bookings LIMIT 1")
-    except sqlite3.OperationalError:
-        print("WARNING: 'passenger_bookings.db' does not contain 'passenger_bookings' table. Please run main app first.")
+def db_init():
+    """รัน migration ของ users.db (bookings, users, payments, routes, ...) และ passenger_bookings.db ครั้งเดียวตอนเริ่มโปรแกรม"""
+    migrations.migrate(DB_ADMIN_PATH, migrations.ADMIN_MIGRATIONS)
+    migrations.migrate(DB_USER_PATH, migrations.PASSENGER_MIGRATIONS)
+    migrations.apply_ticket_renumbering(DB_USER_PATH, DB_ADMIN_PATH)
+    db_connect_admin().execute("PRAGMA foreign_keys = ON;")
 
 
 # 🌟 ส่วนที่เพิ่ม: ฟังก์ชันสำหรับบันทึกเส้นทางใหม่ 🌟
-def db_add_route(frm: str, to: str, dep_time: str, duration: str, capacity: int):
-    """บันทึกเส้นทางใหม่เข้าตาราง routes ของ users.db"""
+def db_add_route(frm: str, to: str, dep_time: str, duration: str, capacity: int, layout: str = seat_layout.DEFAULT_TEMPLATE):
+    """บันทึกเส้นทางใหม่เข้าตาราง routes ของ users.db (layout = แบบรถใน seat_layout.TEMPLATES)"""
     sql = """
-    INSERT INTO routes (route_from, route_to, departure_time, duration, capacity)
-    VALUES (?, ?, ?, ?, ?)
+    INSERT INTO routes (route_from, route_to, departure_time, duration, capacity, layout)
+    VALUES (?, ?, ?, ?, ?, ?)
     """
     try:
         with closing(db_connect_admin()) as conn, conn, closing(conn.cursor()) as cur:
-            cur.execute(sql, (frm, to, dep_time, duration, capacity))
+            cur.execute(sql, (frm, to, dep_time, duration, capacity, layout))
             return True, "บันทึกสำเร็จ"
     except sqlite3.IntegrityError:
         return False, "เที่ยวรถนี้มีอยู่ในระบบแล้ว (เส้นทางและเวลาออกซ้ำกัน)"
@@ -162,18 +98,77 @@ def db_add_route(frm: str, to: str, dep_time: str, duration: str, capacity: int)
         return False, f"ข้อผิดพลาดในการบันทึก: {e}"
 # 🌟 สิ้นสุดส่วนที่เพิ่ม 🌟
 
-def db_search_bookings(keyword: str):
-    """ค้นหารายการจองในตาราง bookings ของ users.db"""
-    kw = f"%{keyword.strip()}%" if keyword.strip() else "%"
-    sql = """
-    SELECT id, ticket_no, customer_name, route_from, route_to, date, status, price, vat
-    FROM bookings
-    WHERE ticket_no LIKE ? OR customer_name LIKE ? OR (route_from || ' - ' || route_to) LIKE ?
-          OR date LIKE ? OR status LIKE ?
-    ORDER BY date DESC, id DESC
+# คอลัมน์ในตาราง Booking & Payment -> นิพจน์ SQL ที่ใช้เรียง (COALESCE กัน NULL หลุดจากการแบ่งหน้าแบบ keyset)
+# ทุกนิพจน์มี index (key, id) ใน migrations (a6 / a11) — แก้ที่นี่ต้องแก้ index ให้ตรงกันด้วย
+BOOKING_SORT_KEYS = {
+    0: "COALESCE(b.ticket_no, '')",
+    1: "COALESCE(b.customer_name, '')",
+    2: "COALESCE(b.route_from, '') || ' - ' || COALESCE(b.route_to, '')",
+    3: "COALESCE(b.date, '')",
+    4: "COALESCE(b.status, '')",
+    5: "COALESCE(b.price, 0) + COALESCE(b.vat, 0)",
+}
+BOOKING_LIST_COLUMNS = "b.id, b.ticket_no, b.customer_name, b.route_from, b.route_to, b.date, b.status, b.price, b.vat"
+
+def db_page_bookings(sort_col: int = 3, descending: bool = True, after: tuple | None = None,
+                     limit: int = BOOKING_PAGE_SIZE):
     """
+    อ่าน bookings ทีละหน้าแบบ keyset เรียงตาม sort_col (ค่าเริ่มต้น: วันที่ใหม่ -> เก่า)
+    after = (sort_key, id) ของแถวสุดท้ายหน้าก่อน; แต่ละแถวคืนค่า sort_key ต่อท้าย
+    """
+    key = BOOKING_SORT_KEYS.get(sort_col, BOOKING_SORT_KEYS[3])
+    direction, cmp = ("DESC", "<") if descending else ("ASC", ">")
+    where, params = "", [limit]
+    if after is not None:
+        # เขียนแยกแทน row value (key, id) < (?, ?) เพื่อให้ SQLite ใช้ index เป็นช่วงค้นหาได้
+        where = f"WHERE {key} {cmp}= ?2 AND ({key} {cmp} ?2 OR b.id {cmp} ?3)"
+        params += list(after)
+    sql = f"""
+    SELECT {BOOKING_LIST_COLUMNS}, {key} AS sort_key
+    FROM bookings b {where}
+    ORDER BY sort_key {direction}, b.id {direction} LIMIT ?1
+    """
+    with closing(db_connect_admin()) as conn, closing(conn.cursor()) as cur:
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+def db_get_booking_list_row(rid: int):
+    """แถวเดียวของตาราง Booking & Payment (คอลัมน์เดียวกับ db_page_bookings ไม่รวม sort_key)"""
     with closing(db_connect_admin()) as conn, closing(conn.cursor()) as cur:
-        cur.execute(sql, (kw,kw,kw,kw,kw))
+        cur.execute(f"SELECT {BOOKING_LIST_COLUMNS} FROM bookings b WHERE b.id=?", (rid,))
+        return cur.fetchone()
+
+def db_search_bookings(keyword: str, limit: int = SEARCH_RESULT_LIMIT,
+                       sort_col: int | None = None, descending: bool = True):
+    """
+    ค้นหารายการจองในตาราง bookings ของ users.db (ใช้ bookings_fts, ไม่มี FTS5 ใช้ LIKE)
+    sort_col=None เรียงตามความเกี่ยวข้อง ไม่เช่นนั้นเรียงผลลัพธ์ตามคอลัมน์ใน SQL
+    """
+    kw = keyword.strip()
+    if not kw:
+        return [r[:-1] for r in db_page_bookings(3 if sort_col is None else sort_col, descending, limit=limit)]
+    direction = "DESC" if descending else "ASC"
+    order = (f"{BOOKING_SORT_KEYS[sort_col]} {direction}, b.id {direction}" if sort_col in BOOKING_SORT_KEYS
+             else None)
+    with closing(db_connect_admin()) as conn, closing(conn.cursor()) as cur:
+        try:
+            cur.execute(f"""
+            SELECT {BOOKING_LIST_COLUMNS}
+            FROM (SELECT rowid, rank FROM bookings_fts WHERE bookings_fts MATCH ? ORDER BY rank LIMIT ?) f
+            JOIN bookings b ON b.id = f.rowid
+            ORDER BY {order or "f.rank, b.date DESC, b.id DESC"}
+            """, (_fts_query(kw), limit))
+            return cur.fetchall()
+        except sqlite3.OperationalError:
+            pass # ไม่มีตาราง bookings_fts (SQLite ไม่มี FTS5)
+        like = f"%{kw}%"
+        cur.execute(f"""
+        SELECT {BOOKING_LIST_COLUMNS}
+        FROM bookings b
+        WHERE b.ticket_no LIKE ? OR b.customer_name LIKE ? OR (b.route_from || ' - ' || b.route_to) LIKE ?
+              OR b.date LIKE ? OR b.status LIKE ?
+        ORDER BY {order or "b.date DESC, b.id DESC"} LIMIT ?
+        """, (like,like,like,like,like,limit))
         return cur.fetchall()
 
 def db_get_all_routes():
@@ -190,32 +185,26 @@ def db_get_all_routes():
         return cur.fetchall()
 
 def db_delete_route_demo(route_from: str, route_to: str):
-    """ลบรายการจองทั้งหมดของเส้นทางนั้นในตาราง bookings (users.db) และที่นั่งใน passenger_bookings (passenger_bookings.db)"""
+    """ลบรายการจองทั้งหมดของเส้นทางนั้นในตาราง bookings (users.db) และที่นั่งใน passenger_bookings (passenger_bookings.db) ใน transaction เดียว"""
     deleted_admin_rows = 0
     deleted_user_rows = 0
     
     try:
-        with closing(db_connect_admin()) as conn_admin, conn_admin, closing(conn_admin.cursor()) as cur_admin:
+        with closing(db_connect_booking()) as conn, conn, closing(conn.cursor()) as cur:
+            cur.execute("BEGIN IMMEDIATE")
             # 1. ลบรายการสรุปการจองใน users.db
-            cur_admin.execute("DELETE FROM bookings WHERE route_from=? AND route_to=?", (route_from, route_to))
-            deleted_admin_rows = cur_admin.rowcount
-    except Exception as e:
-        print(f"Error deleting admin bookings: {e}")
+            cur.execute("DELETE FROM adm.bookings WHERE route_from=? AND route_to=?", (route_from, route_to))
+            deleted_admin_rows = cur.rowcount
 
-    try:
-        with closing(db_connect_user()) as conn_user, conn_user, closing(conn_user.cursor()) as cur_user:
             # 2. ลบรายการจองที่นั่งใน passenger_bookings.db
-            cur_user.execute("""
+            cur.execute("""
                 DELETE FROM passenger_bookings
-                WHERE trip_info_json LIKE ? AND trip_info_json LIKE ?
-            """, (f'%origin": "{route_from}"%', f'%dest": "{route_to}"%'))
-            deleted_user_rows = cur_user.rowcount
-
-    except sqlite3.OperationalError:
-        # อาจเกิดถ้าตาราง passenger_bookings ไม่มี
-        pass
+                WHERE origin = ? AND dest = ?
+            """, (route_from, route_to))
+            deleted_user_rows = cur.rowcount
     except Exception as e:
-        print(f"Error deleting user bookings: {e}")
+        print(f"Error deleting route bookings: {e}")
+        return 0, 0
 
     return deleted_admin_rows, deleted_user_rows # ส่งคืนจำนวนรายการที่ถูกลบ
 
@@ -228,67 +217,117 @@ def db_get_booking(row_id:int):
                          FROM bookings WHERE id=?""", (row_id,))
         return cur.fetchone()
 
-def _count_seats(seat_text:str)->int:
-    if not seat_text: return 0
-    return len([s.strip() for s in seat_text.split(",") if s.strip()])
-
-# 🚨 ฟังก์ชันนี้ได้รับการแก้ไขเพื่อรวมการเชื่อมต่อ DB ทั้งหมดไว้ใน with block เดียว 🚨
 def db_stats_for_date(ymd:str):
-    """ดึงสถิติจากตาราง bookings และ routes ของ users.db"""
-    with closing(db_connect_admin()) as conn, conn, closing(conn.cursor()) as cur:
+    """ดึงสถิติของวันจากตารางสรุป daily_route_stats (+ ความจุจาก routes) ของ users.db"""
+    with closing(db_connect_admin()) as conn, closing(conn.cursor()) as cur:
         cur.execute("""
-            SELECT route_from, route_to, dep_time, seat, price, COALESCE(vat, price*0.07) as vat_e
-            FROM bookings
-            WHERE date=? AND status <> 'ยกเลิก'
+            SELECT COALESCE(SUM(orders), 0), COALESCE(SUM(revenue), 0) FROM daily_route_stats WHERE date=?
         """, (ymd,))
-        rows = cur.fetchall()
+        total_orders, total_revenue = cur.fetchone()
 
-        total_orders = len(rows)
-        total_revenue = 0.0
-        by_trip = {}
-        for (frm,to,dep,seat,price,vat) in rows:
-            total_revenue += float(price or 0) + float(vat or 0)
-            key = (frm or "", to or "", dep or "")
-            by_trip.setdefault(key, 0)
-            by_trip[key] += _count_seats(seat or "")
-
-        # คำนวณที่นั่งว่างจริง: ดึงเส้นทางทั้งหมดที่เป็นไปได้จากตาราง routes
-        all_routes_trips = {}
-        
-        # 🌟 แก้ไข: การเรียกใช้ SQL ถูกรวมอยู่ใน with block นี้ 🌟
-        cur.execute("SELECT route_from, route_to, departure_time, capacity FROM routes")
-        available_routes = cur.fetchall()
-        # 🌟 สิ้นสุดการแก้ไข 🌟
-        
-        for (frm, to, dep_time, capacity) in available_routes:
-            key = (frm, to, dep_time)
-            all_routes_trips[key] = by_trip.get(key, 0) # จำนวนที่นั่งที่จองแล้ว
-
-        total_seats_in_service = sum(capacity for (_,_,_,capacity) in available_routes)
-
-        total_booked_seats = sum(all_routes_trips.values())
-        
-        total_remaining = total_seats_in_service - total_booked_seats
-        total_remaining = max(0, total_remaining) # ไม่ให้ติดลบ
+        # ที่นั่งว่างจริง: ความจุของทุกเที่ยวใน routes - ที่นั่งที่จองแล้วของเที่ยวเหล่านั้น
+        cur.execute("SELECT COALESCE(SUM(capacity), 0) FROM routes")
+        total_seats_in_service = cur.fetchone()[0]
+        cur.execute("""
+            SELECT COALESCE(SUM(s.seats), 0)
+            FROM daily_route_stats s
+            JOIN routes r ON r.route_from = s.route_from AND r.route_to = s.route_to AND r.departure_time = s.dep_time
+            WHERE s.date=?
+        """, (ymd,))
+        total_booked_seats = cur.fetchone()[0]
+        total_remaining = max(0, total_seats_in_service - total_booked_seats) # ไม่ให้ติดลบ
 
         avg_per_order = (total_revenue/total_orders) if total_orders else 0.0
 
-        top_map = {}
-        for (frm,to,dep,seat,price,vat) in rows:
-            key = f"{frm} → {to}"
-            top_map[key] = top_map.get(key, 0) + 1
-        top_routes = sorted(top_map.items(), key=lambda x: (-x[1], x[0]))[:3]
-        least = min(top_map.items(), key=lambda x: (x[1], x[0])) if top_map else None
+        by_route = """
+            SELECT route_from || ' → ' || route_to AS route, SUM(orders) AS c
+            FROM daily_route_stats WHERE date=?
+            GROUP BY route_from, route_to
+        """
+        cur.execute(by_route + " ORDER BY c DESC, route ASC LIMIT 3", (ymd,))
+        top_routes = cur.fetchall()
+        cur.execute(by_route + " ORDER BY c ASC, route ASC LIMIT 1", (ymd,))
+        least = cur.fetchone()
 
         return {
             "orders": total_orders,
-            "revenue": total_revenue,
+            "revenue": float(total_revenue),
             "avg": avg_per_order,
             "seats_remaining": total_remaining,
             "top_routes": top_routes,
             "least_route": least
         }
 
+# โหมดสรุปยอดตามช่วงเวลา (ข้อความในหน้า Dashboard -> รหัสโหมด)
+STATS_PERIOD_MODES = {"รายวัน":"day", "รายสัปดาห์":"week", "รายเดือน":"month", "รายไตรมาส":"quarter",
+                      "รายปี":"year", "กำหนดเอง":"custom"}
+
+def period_range(mode: str, day: datetime.date, end: datetime.date | None = None) -> tuple[str, str]:
+    """คืนช่วงวันที่ (เริ่ม, สิ้นสุด) แบบ YYYY-MM-DD ของโหมด day/week/month/quarter/year/custom ที่ครอบคลุม day"""
+    if mode == "week":
+        start = day - datetime.timedelta(days=day.weekday())          # จันทร์ - อาทิตย์
+        stop = start + datetime.timedelta(days=6)
+    elif mode in ("month", "quarter", "year"):
+        first_month = {"month": day.month, "quarter": 3 * ((day.month - 1) // 3) + 1, "year": 1}[mode]
+        start = datetime.date(day.year, first_month, 1)
+        months = {"month": 1, "quarter": 3, "year": 12}[mode]
+        y, m = divmod(first_month - 1 + months, 12)
+        stop = datetime.date(day.year + y, m + 1, 1) - datetime.timedelta(days=1)
+    elif mode == "custom" and end is not None:
+        start, stop = min(day, end), max(day, end)
+    else:
+        start = stop = day
+    return start.isoformat(), stop.isoformat()
+
+def db_stats_for_range(start_ymd: str, end_ymd: str, top_n: int = 3):
+    """
+    สรุปยอดช่วงวันที่ [start_ymd, end_ymd] จาก daily_route_stats ด้วย GROUP BY + window function ใน SQL
+    คืน รายได้, จำนวนการจอง, ยอดเฉลี่ย, top_routes และ least_routes (เส้นทางที่ถูกจองน้อยสุด)
+    เส้นทางในตาราง routes ที่ไม่มีการจองในช่วงนี้นับเป็น 0 ครั้ง (ขึ้นใน least_routes ได้)
+    """
+    totals_sql = """
+    SELECT COALESCE(SUM(orders), 0), COALESCE(SUM(revenue), 0)
+    FROM daily_route_stats WHERE date BETWEEN ? AND ?
+    """
+    sql = """
+    WITH all_routes AS (
+        SELECT route_from, route_to FROM routes
+        UNION
+        SELECT route_from, route_to FROM daily_route_stats WHERE date BETWEEN ?1 AND ?2
+    ), per_route AS (
+        SELECT a.route_from || ' → ' || a.route_to AS route, COALESCE(SUM(s.orders), 0) AS orders
+        FROM all_routes a
+        LEFT JOIN daily_route_stats s
+               ON s.route_from = a.route_from AND s.route_to = a.route_to AND s.date BETWEEN ?1 AND ?2
+        GROUP BY a.route_from, a.route_to
+    ), ranked AS (
+        SELECT route, orders,
+               ROW_NUMBER() OVER (ORDER BY orders DESC, route ASC) AS top_rank,
+               ROW_NUMBER() OVER (ORDER BY orders ASC,  route ASC) AS least_rank
+        FROM per_route
+    )
+    SELECT route, orders, top_rank, least_rank
+    FROM ranked WHERE top_rank <= ?3 OR least_rank <= ?3
+    """
+    with closing(db_connect_admin()) as conn, closing(conn.cursor()) as cur:
+        cur.execute(totals_sql, (start_ymd, end_ymd))
+        total_orders, total_revenue = cur.fetchone()
+        cur.execute(sql, (start_ymd, end_ymd, top_n))
+        rows = cur.fetchall()
+
+    total_revenue = float(total_revenue)
+    top_routes = sorted(((r[2], (r[0], r[1])) for r in rows if r[2] <= top_n and r[1] > 0))
+    least_routes = sorted(((r[3], (r[0], r[1])) for r in rows if r[3] <= top_n))
+    return {
+        "start": start_ymd,
+        "end": end_ymd,
+        "orders": total_orders,
+        "revenue": total_revenue,
+        "avg": (total_revenue / total_orders) if total_orders else 0.0,
+        "top_routes": [x for _, x in top_routes],
+        "least_routes": [x for _, x in least_routes],
+    }
+
 def db_get_all_users():
     """ดึงข้อมูลผู้ใช้งานจากตาราง users ของ users.db"""
     sql = "SELECT id, username, role, phone, email, created_at FROM users ORDER BY role DESC, username ASC"
@@ -416,6 +455,14 @@ class AddTripPage(QWidget):
         grid.addWidget(self.in_capacity, 3, 0)
         grid.addWidget(self.in_duration, 3, 1)
 
+        # แบบรถ -> ผังที่นั่งหน้าลูกค้า (seat_layout)
+        grid.addWidget(title("แบบรถ"), 4, 0)
+        self.in_layout = QComboBox(); self.in_layout.setFont(TH(24)); self.in_layout.setMinimumHeight(70)
+        self.in_layout.setStyleSheet(f"QComboBox{{border:2px solid {CARD_LINE};border-radius:10px;padding:10px 12px;}}")
+        for key, name in seat_layout.TEMPLATE_NAMES.items():
+            self.in_layout.addItem(name, key)
+        grid.addWidget(self.in_layout, 5, 0)
+
         time_layout = QVBoxLayout()
         time_layout.addWidget(title("เวลาออก (เลือกได้หลายเวลา)"))
         time_btn_row = QHBoxLayout()
@@ -430,13 +477,13 @@ class AddTripPage(QWidget):
             time_btn_row.addWidget(b)
         time_btn_row.addStretch(1)
         time_layout.addLayout(time_btn_row)
-        grid.addLayout(time_layout, 4, 0, 1, 2) # ขยายให้เต็ม 2 คอลัมน์
+        grid.addLayout(time_layout, 6, 0, 1, 2) # ขยายให้เต็ม 2 คอลัมน์
 
         btn_save = QPushButton("บันทึกเที่ยว")
         btn_save.setFixedSize(220, 70); btn_save.setFont(TH(30, QFont.Weight.Bold))
         btn_save.setStyleSheet("QPushButton{background:#a9c5cf;border:none;border-radius:16px;color:white;}")
         btn_save.clicked.connect(self._save_trip)
-        grid.addWidget(btn_save, 5, 1, 1, 1, Qt.AlignmentFlag.AlignRight) # ย้ายไปอยู่คอลัมน์ 1
+        grid.addWidget(btn_save, 7, 1, 1, 1, Qt.AlignmentFlag.AlignRight) # ย้ายไปอยู่คอลัมน์ 1
 
         grid.setColumnStretch(0, 1); grid.setColumnStretch(1, 1)
         wl.addLayout(grid); wl.addStretch(1)
@@ -455,10 +502,13 @@ class AddTripPage(QWidget):
                 QMessageBox.warning(self, "ข้อมูลไม่ครบถ้วน", "กรุณากรอกจังหวัดปลายทาง"); return
             if not capacity_text or not capacity_text.isdigit() or int(capacity_text) <= 0:
                 QMessageBox.warning(self, "ข้อมูลไม่ครบถ้วน", "กรุณากรอกความจุที่นั่งที่ถูกต้อง (ตัวเลขเท่านั้น)"); return
+            if int(capacity_text) > seat_layout.MAX_CAPACITY:
+                QMessageBox.warning(self, "ข้อมูลไม่ถูกต้อง", f"ความจุที่นั่งต้องไม่เกิน {seat_layout.MAX_CAPACITY} ที่นั่ง"); return
             if not duration:
                 QMessageBox.warning(self, "ข้อมูลไม่ครบถ้วน", "กรุณากรอกระยะเวลาในการเดินทาง"); return
             
             capacity = int(capacity_text)
+            layout = self.in_layout.currentData()
             selected_times = [t for t, b in self.time_buttons.items() if b.isChecked()]
             
             if not selected_times:
@@ -469,7 +519,7 @@ class AddTripPage(QWidget):
             error_messages = []
             
             for dep_time in selected_times:
-                is_success, msg = db_add_route(frm, to, dep_time, duration, capacity)
+                is_success, msg = db_add_route(frm, to, dep_time, duration, capacity, layout)
                 if is_success:
                     success_count += 1
                 elif "ซ้ำกัน" in msg:
@@ -484,6 +534,8 @@ class AddTripPage(QWidget):
             if error_messages:
                 final_msg += f"\n**ข้อผิดพลาดที่เกิดขึ้น:**\n" + "\n".join(error_messages)
             
+            if success_count:
+                eventbus.publish("routes_changed", route_from=frm, route_to=to)
             QMessageBox.information(self, "บันทึกเที่ยวรถ", final_msg)
             self.save_callback()
 
@@ -517,7 +569,7 @@ class DeleteTripPage(QWidget):
         self.pv.addLayout(row)
 
         root.addWidget(self.panel)
-        self.refresh_routes()
+        # รายการเส้นทางโหลดตอนเปิดหน้านี้ (AdminApp._go_delete_trip)
 
     def _delete_route_demo(self, frm: str, to: str):
         reply = QMessageBox.question(self, 'ยืนยันการลบ',
@@ -526,6 +578,7 @@ class DeleteTripPage(QWidget):
 
         if reply == QMessageBox.StandardButton.Yes:
             deleted_admin_rows, deleted_user_rows = db_delete_route_demo(frm, to)
+            eventbus.publish("bookings_deleted", route_from=frm, route_to=to)
             QMessageBox.information(self, "ลบสำเร็จ", 
                 f"ลบเส้นทาง {frm} → {to} เรียบร้อยแล้ว\n"
                 f"- ลบรายการสรุปการจอง (users.db): {deleted_admin_rows} รายการ\n"
@@ -602,6 +655,153 @@ class SimpleStubPage(QWidget):
 
 # ===================== BOOKING & PAYMENT PAGE (NEW COMBINED) =====================
 # (ไม่มีการเปลี่ยนแปลงการทำงาน)
+# ---------- ตาราง Booking & Payment (Model + Delegate) ----------
+STATUS_ROLE = Qt.ItemDataRole.UserRole + 1   # สถานะดิบ ใช้เลือกสี badge
+STATUS_BADGE_BG = {"รอดำเนินการ":"#c7e7ff","ยืนยัน":"#bfe6c8","เรียบร้อย":"#bfe6c8","ยกเลิก":"#f3c2c2"}
+
+class BookingTableModel(QAbstractTableModel):
+    """
+    Model ของตาราง Booking & Payment
+    - ไม่มีคำค้น: โหลดทีละ BOOKING_PAGE_SIZE แถวผ่าน canFetchMore/fetchMore (keyset paging)
+    - มีคำค้น: โหลดผลการค้นหา (ไม่เกิน SEARCH_RESULT_LIMIT) ครั้งเดียว
+    - การเรียงส่งต่อให้ SQL (sort_col=None คือค่าเริ่มต้นของแต่ละโหมด)
+    """
+    HEADERS = ["เลขที่ตั๋ว","ลูกค้า","เที่ยวรถ","วันที่","สถานะ","จำนวนเงิน"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._keyword = ""
+        self._sort_col = None
+        self._descending = True
+        self._after = None
+        self._more = False
+
+    # ----- ข้อมูล -----
+    def reload(self, keyword: str | None = None):
+        if keyword is not None:
+            self._keyword = keyword.strip()
+        self.beginResetModel()
+        self._rows, self._after = [], None
+        if self._keyword:
+            self._rows = db_search_bookings(self._keyword, sort_col=self._sort_col, descending=self._descending)
+            self._more = False
+        else:
+            self._more = True
+        self.endResetModel()
+        if self._more:
+            self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        sort_col = 3 if self._sort_col is None else self._sort_col
+        page = db_page_bookings(sort_col, self._descending, self._after)
+        self._more = len(page) == BOOKING_PAGE_SIZE
+        if not page:
+            return
+        self._after = (page[-1][-1], page[-1][0])
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+        self._rows.extend(r[:-1] for r in page)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort_col = column if column in BOOKING_SORT_KEYS else None
+        self._descending = order == Qt.SortOrder.DescendingOrder
+        self.reload()
+
+    def booking_id(self, row: int):
+        return self._rows[row][0] if 0 <= row < len(self._rows) else None
+
+    def _row_of(self, rid: int):
+        return next((i for i, r in enumerate(self._rows) if r[0] == rid), None)
+
+    def update_booking(self, rid: int):
+        """อ่านแถวเดียวใหม่ (เช่น สถานะเปลี่ยน) ถ้าถูกลบไปแล้วเอาออกจากตาราง"""
+        row = self._row_of(rid)
+        if row is None:
+            return
+        fresh = db_get_booking_list_row(rid)
+        if fresh is None:
+            self.beginRemoveRows(QModelIndex(), row, row); del self._rows[row]; self.endRemoveRows()
+            return
+        self._rows[row] = fresh
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def insert_booking(self, rid: int):
+        """แทรกการจองใหม่ในตำแหน่งที่ถูกต้อง (ลำดับเริ่มต้น) ไม่เช่นนั้นโหลดผลใหม่"""
+        if self._keyword or self._sort_col not in (None, 3) or not self._descending:
+            self.reload(); return
+        fresh = db_get_booking_list_row(rid)
+        if fresh is None or self._row_of(rid) is not None:
+            return
+        key = (fresh[5] or "", fresh[0])
+        pos = next((i for i, r in enumerate(self._rows) if (r[5] or "", r[0]) < key), len(self._rows))
+        if pos == len(self._rows) and self._more:
+            return # อยู่ในหน้าที่ยังไม่ได้โหลด fetchMore จะดึงมาเอง
+        self.beginInsertRows(QModelIndex(), pos, pos); self._rows.insert(pos, fresh); self.endInsertRows()
+
+    # ----- QAbstractTableModel -----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        rid, tno, cust, frm, to, date, status, price, vat = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0: return tno
+            if col == 1: return cust
+            if col == 2: return f"{frm} - {to}"
+            if col == 3: return BookingAndPaymentPage._pretty(date)
+            if col == 4: return "เรียบร้อย" if status == "ยืนยัน" else status
+            if col == 5: return f"{float(price or 0) + float(vat if vat is not None else 0):,.2f}"
+        elif role == Qt.ItemDataRole.UserRole:
+            return rid
+        elif role == STATUS_ROLE:
+            return status
+        return None
+
+class StatusBadgeDelegate(QStyledItemDelegate):
+    """วาด badge สถานะในคอลัมน์ สถานะ (แทนการสร้าง QLabel ทุกแถว)"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._font = TH(20); self._font.setPixelSize(20)
+
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRectF(option.rect).adjusted(6, 5, -6, -5)
+        painter.setPen(QPen(QColor(CARD_LINE), 2))
+        painter.setBrush(QColor(STATUS_BADGE_BG.get(index.data(STATUS_ROLE), "#c7e7ff")))
+        painter.drawRoundedRect(rect, 8, 8)
+        painter.setFont(self._font); painter.setPen(QColor(INK))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, index.data(Qt.ItemDataRole.DisplayRole) or "")
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setWidth(size.width() + 28)
+        return size
+
 class BookingAndPaymentPage(QWidget):
     def __init__(self, go_detail_cb):
         super().__init__()
@@ -609,7 +809,7 @@ class BookingAndPaymentPage(QWidget):
         root = QVBoxLayout(self); root.setContentsMargins(0,0,0,0); root.setSpacing(10)
 
         wrap = QFrame()
-        wrap.setStyleSheet(f"QFrame{{border:3px solid {CARD_LINE};border-radius:10px;}} QLineEdit{{background:transparent;border:2px solid {CARD_LINE};border-radius:10px;padding:12px 14px;font-family:'FC Minimal';font-size:26px;}} QTableWidget{{background:transparent;border:2px solid {CARD_LINE};border-radius:10px;gridline-color: transparent;}} QHeaderView::section{{background:transparent;border:none;font-family:'FC Minimal';font-size:24px;font-weight:700;padding:6px;}}")
+        wrap.setStyleSheet(f"QFrame{{border:3px solid {CARD_LINE};border-radius:10px;}} QLineEdit{{background:transparent;border:2px solid {CARD_LINE};border-radius:10px;padding:12px 14px;font-family:'FC Minimal';font-size:26px;}} QTableView{{background:transparent;border:2px solid {CARD_LINE};border-radius:10px;gridline-color: transparent;}} QHeaderView::section{{background:transparent;border:none;font-family:'FC Minimal';font-size:24px;font-weight:700;padding:6px;}}")
         wl = QVBoxLayout(wrap); wl.setContentsMargins(16,16,16,16); wl.setSpacing(12)
         
         # Header ค้นหา
@@ -618,12 +818,21 @@ class BookingAndPaymentPage(QWidget):
         self.search = QLineEdit(); self.search.setPlaceholderText("ค้นหาการจอง")
         self.search.setStyleSheet("QLineEdit{border:none;}")
         shl.addWidget(self.search)
+        self.btn_export = QPushButton("พิมพ์ตั๋ว PDF")
+        self.btn_export.setFont(TH(22, QFont.Weight.Bold))
+        self.btn_export.setStyleSheet(f"QPushButton{{background:{CARD_LINE};color:white;border:none;border-radius:10px;padding:8px 16px;}}")
+        self.btn_export.clicked.connect(self._export_selected)
+        shl.addWidget(self.btn_export)
         wl.addWidget(search_wrap)
+        self._export_proc = None
         
-        # ตาราง
+        # ตาราง (QTableView + Model โหลดทีละหน้า)
         # คอลัมน์: เลขที่ตั๋ว, ลูกค้า, เที่ยวรถ, วันที่, สถานะ, จำนวนเงิน
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels(["เลขที่ตั๋ว","ลูกค้า","เที่ยวรถ","วันที่","สถานะ","จำนวนเงิน"])
+        self.model = BookingTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(4, StatusBadgeDelegate(self.table))
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         hh = self.table.horizontalHeader()
         
         # การกำหนดขนาดคอลัมน์เพื่อให้คล้ายภาพ:
@@ -633,51 +842,79 @@ class BookingAndPaymentPage(QWidget):
         hh.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents) # วันที่
         hh.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents) # สถานะ
         hh.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents) # จำนวนเงิน
+        hh.setResizeContentsPrecision(0) # วัดความกว้างจากแถวที่มองเห็นเท่านั้น
+
+        # คลิกหัวตารางเพื่อเรียง (ส่งไปเรียงใน SQL)
+        hh.setSectionsClickable(True); hh.setSortIndicatorShown(True)
+        hh.setSortIndicator(-1, Qt.SortOrder.DescendingOrder)
+        hh.sortIndicatorChanged.connect(self.model.sort)
         
-        self.table.verticalHeader().setVisible(False)
+        vh = self.table.verticalHeader()
+        vh.setVisible(False)
+        vh.setSectionResizeMode(QHeaderView.ResizeMode.Fixed); vh.setDefaultSectionSize(44)
         self.table.setFont(TH(22))
         wl.addWidget(self.table)
         
         root.addWidget(wrap)
         self.search.textChanged.connect(self.refresh)
-        self.table.cellDoubleClicked.connect(self._open_detail)
-        self.refresh()
-        
-    def _badge(self, status:str)->QWidget:
-        display_status = status
-        if status == "ยืนยัน":
-            display_status = "เรียบร้อย"
-            
-        c = {"รอดำเนินการ":"#c7e7ff","ยืนยัน":"#bfe6c8","เรียบร้อย":"#bfe6c8","ยกเลิก":"#f3c2c2"}.get(status,"#c7e7ff")
-        w = QLabel(display_status); w.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        w.setStyleSheet(f"QLabel{{background:{c};border:2px solid {CARD_LINE};border-radius:8px;padding:4px 8px;font-family:'FC Minimal';font-size:20px;}}")
-        return w
+        self.table.doubleClicked.connect(self._open_detail)
+        # ข้อมูลโหลดตอนเปิดหน้านี้ (AdminApp._nav_clicked / _back_to_booking_pay)
+        eventbus.subscribe(self._on_bus_event)
         
     def refresh(self): 
-        rows = db_search_bookings(self.search.text())
-        self.table.setRowCount(0)
-        
-        for (rid, tno, cust, frm, to, date, status, price, vat) in rows:
-            r = self.table.rowCount(); self.table.insertRow(r)
-            def item(s): x=QTableWidgetItem(s); x.setFlags(Qt.ItemFlag.ItemIsEnabled|Qt.ItemFlag.ItemIsSelectable); return x
-            
-            it = item(tno); it.setData(Qt.ItemDataRole.UserRole, rid)
-            
-            # คำนวณจำนวนเงิน
-            amount = float(price or 0) + float(vat if vat is not None else 0)
-            amount_str = f"{amount:,.2f}"
-            
-            self.table.setItem(r,0,it)
-            self.table.setItem(r,1,item(cust))
-            self.table.setItem(r,2,item(f"{frm} - {to}"))
-            self.table.setItem(r,3,item(self._pretty(date)))
-            self.table.setCellWidget(r,4,self._badge(status)) # สถานะใช้ Widget
-            self.table.setItem(r,5,item(amount_str)) # จำนวนเงิน
+        self.model.reload(self.search.text())
+
+    def _on_bus_event(self, kind: str, data: dict):
+        # หน้าถูกซ่อนอยู่: ไม่ต้องทำอะไร (เปิดหน้านี้เมื่อไรจะ refresh ใหม่ทั้งหมด)
+        if not self.isVisible():
+            return
+        if kind == "booking_status":
+            self.model.update_booking(data.get("booking_id"))
+        elif kind == "booking_created":
+            self.model.insert_booking(data.get("booking_id"))
+        elif kind == "bookings_deleted":
+            self.refresh()
             
-    def _open_detail(self, row, col):
-        it = self.table.item(row,0)
-        if not it: return
-        self.go_detail_cb(it.data(Qt.ItemDataRole.UserRole), mode="booking")
+    # ----- พิมพ์ตั๋วย้อนหลัง (ticket_export.py) -----
+    def _export_selected(self):
+        if self._export_proc is not None:
+            QMessageBox.information(self, "พิมพ์ตั๋ว", "กำลังส่งออกชุดก่อนหน้าอยู่"); return
+        ids = sorted({self.model.booking_id(ix.row()) for ix in self.table.selectionModel().selectedRows()} - {None})
+        if not ids:
+            QMessageBox.information(self, "พิมพ์ตั๋ว", "กรุณาเลือกรายการการจองที่ต้องการพิมพ์"); return
+        default = os.path.join(DB_DIR, f"tickets_{datetime.date.today():%Y%m%d}.pdf")
+        out_path, _ = QFileDialog.getSaveFileName(self, "บันทึกตั๋วและใบเสร็จ", default, "PDF Files (*.pdf)")
+        if not out_path: return
+
+        proc = QProcess(self)
+        proc.setProgram(sys.executable)
+        proc.setArguments([TICKET_EXPORT_PY, "--db", DB_ADMIN_PATH, "--ids-from", "-", "--merge", "--out", out_path])
+        proc.readyReadStandardError.connect(self._on_export_progress)
+        proc.finished.connect(lambda code, _status, path=out_path: self._on_export_finished(code, path))
+        self._export_proc, self._export_log = proc, ""
+        self.btn_export.setEnabled(False); self.btn_export.setText("กำลังส่งออก…")
+        proc.start()
+        proc.write("\n".join(map(str, ids)).encode("utf-8")); proc.closeWriteChannel()
+
+    def _on_export_progress(self):
+        text = bytes(self._export_proc.readAllStandardError()).decode("utf-8", "replace")
+        self._export_log += text
+        for line in text.splitlines():
+            if line.startswith("PROGRESS "):
+                self.btn_export.setText(f"กำลังส่งออก {line.split()[1]}")
+
+    def _on_export_finished(self, code: int, out_path: str):
+        self._export_proc = None
+        self.btn_export.setEnabled(True); self.btn_export.setText("พิมพ์ตั๋ว PDF")
+        if code == 0 and os.path.exists(out_path):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(out_path))
+        else:
+            QMessageBox.critical(self, "พิมพ์ตั๋ว", f"ส่งออกไม่สำเร็จ\n{self._export_log[-800:]}")
+
+    def _open_detail(self, index):
+        rid = self.model.booking_id(index.row())
+        if rid is None: return
+        self.go_detail_cb(rid, mode="booking")
         
     @staticmethod
     def _pretty(d):
@@ -757,41 +994,23 @@ class BookingDetailPage(QWidget):
         root.addWidget(self.bottom_wrap)
 
     def _confirm_booking(self):
-        self._update_status("ยืนยัน", "ยืนยันการชำระเงิน", "การจองถูกยืนยันเรียบร้อยแล้ว")
+        self._update_status(booking_core.STATUS_CONFIRMED, "ยืนยันการชำระเงิน", "การจองถูกยืนยันเรียบร้อยแล้ว")
         
     def _cancel_booking(self):
-        self._update_status("ยกเลิก", "ยกเลิกการจอง", "การจองถูกยกเลิกเรียบร้อยแล้ว")
+        self._update_status(booking_core.STATUS_CANCELLED, "ยกเลิกการจอง", "การจองถูกยกเลิกเรียบร้อยแล้ว")
 
     def _update_status(self, new_status:str, title:str, message:str):
         if self.row_id is None:
             QMessageBox.warning(self, title, "ไม่พบรายการจองที่จะอัปเดต"); return
 
         try:
-            with closing(db_connect_admin()) as conn_admin, conn_admin, closing(conn_admin.cursor()) as cur_admin:
-                # อัปเดตตาราง bookings ใน users.db
-                cur_admin.execute("UPDATE bookings SET status=? WHERE id=?", (new_status, self.row_id))
-                
-                # ถ้า 'ยืนยัน' ให้ค้นหา ticket_no และอัปเดต is_booked ใน passenger_bookings.db
-                if new_status == 'ยืนยัน':
-                    # ดึง ticket_no
-                    cur_admin.execute("SELECT ticket_no FROM bookings WHERE id=?", (self.row_id,))
-                    ticket_no = cur_admin.fetchone()[0]
-                    
-                    if ticket_no:
-                        with closing(db_connect_user()) as conn_user, conn_user, closing(conn_user.cursor()) as cur_user:
-                            # อัปเดตสถานะใน passenger_bookings (ตั้งเป็น is_booked = 1 อยู่แล้ว แต่ยืนยันอีกครั้งเพื่อความชัวร์)
-                            cur_user.execute("UPDATE passenger_bookings SET is_booked=1 WHERE ticket_no=?", (ticket_no,))
-                            
-                elif new_status == 'ยกเลิก':
-                    # ดึง ticket_no
-                    cur_admin.execute("SELECT ticket_no FROM bookings WHERE id=?", (self.row_id,))
-                    ticket_no = cur_admin.fetchone()[0]
-
-                    if ticket_no:
-                        with closing(db_connect_user()) as conn_user, conn_user, closing(conn_user.cursor()) as cur_user:
-                            # ลบรายการจองที่นั่งใน passenger_bookings (เพื่อให้ที่นั่งว่าง)
-                            cur_user.execute("DELETE FROM passenger_bookings WHERE ticket_no=?", (ticket_no,))
-                            
+            # อัปเดตทั้ง users.db และ passenger_bookings.db ใน transaction เดียว (ตรรกะเดียวกับ booking_core.cancel_booking)
+            with closing(db_connect_booking()) as conn, conn, closing(conn.cursor()) as cur:
+                cur.execute("BEGIN IMMEDIATE")
+                res = booking_core.apply_booking_status(cur, self.row_id, new_status)
+            date = res[1] if res else None
+
+            eventbus.publish("booking_status", booking_id=self.row_id, date=date, status=new_status)
             QMessageBox.information(self, title, message)
             self.load_row(self.row_id) # โหลดข้อมูลใหม่เพื่ออัปเดตหน้าจอ
             
@@ -824,11 +1043,8 @@ class BookingDetailPage(QWidget):
         self.cus_name.setText(f"คุณ {name}")
         self.cus_phone.setText(f"เบอร์โทร {phone or '-'}")
         self.cus_email.setText(f"Email {email or '-'}")
-        if slip and os.path.exists(slip):
-            pix = QPixmap(slip).scaled(360,210, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            self.slip_img.setPixmap(pix)
-        else:
-            self.slip_img.setPixmap(QPixmap())
+        # สลิปเป็นไฟล์ของแต่ละการจอง: เก็บแค่ในหน่วยความจำ ไม่เขียน cache ลงดิสก์
+        self.slip_img.setPixmap(assets.pixmap(slip, 360, 210, disk=False) if slip else QPixmap())
 
     @staticmethod
     def _pretty(d):
@@ -854,8 +1070,9 @@ class DashboardPage(QWidget):
         g = QGridLayout(group); g.setContentsMargins(14,14,14,14); g.setHorizontalSpacing(18); g.setVerticalSpacing(10)
         g.addWidget(self._title("สรุปยอดจองตามช่วงเวลา"), 0,0,1,1)
         selWrap = QHBoxLayout(); selWrap.setSpacing(10)
+        self.modeBox = QComboBox(); self.modeBox.addItems(list(STATS_PERIOD_MODES))
         self.dayBox = QComboBox(); self.monthBox = QComboBox(); self.yearBox = QComboBox()
-        for cb in (self.dayBox,self.monthBox,self.yearBox):
+        for cb in (self.modeBox,self.dayBox,self.monthBox,self.yearBox):
             cb.setStyleSheet("QComboBox{font-family:'FC Minimal';font-size:26px;padding:6px 10px;border:2px solid #9b7a55;border-radius:10px;}")
             cb.setMinimumHeight(48)
         self.dayBox.addItems([f"{d:02d}" for d in range(1,32)])
@@ -866,9 +1083,22 @@ class DashboardPage(QWidget):
         self.dayBox.setCurrentText(f"{today.day:02d}")
         self.monthBox.setCurrentText(f"{today.month:02d}")
         self.yearBox.setCurrentText(str(today.year))
-        selWrap.addWidget(self._title("เลือกวันที่"));      selWrap.addWidget(self.dayBox)
-        selWrap.addWidget(self._title("เลือกเดือน")); selWrap.addWidget(self.monthBox)
-        selWrap.addWidget(self._title("เลือกปี"));      selWrap.addWidget(self.yearBox)
+        # ช่วงกำหนดเอง (แสดงเมื่อเลือกโหมด กำหนดเอง)
+        self.startEdit = QDateEdit(QDate.currentDate().addDays(-6)); self.endEdit = QDateEdit(QDate.currentDate())
+        for de in (self.startEdit, self.endEdit):
+            de.setCalendarPopup(True); de.setDisplayFormat("dd/MM/yyyy"); de.setMinimumHeight(48)
+            de.setStyleSheet("QDateEdit{font-family:'FC Minimal';font-size:26px;padding:6px 10px;border:2px solid #9b7a55;border-radius:10px;}")
+        lb_day, lb_month, lb_year = self._title("เลือกวันที่"), self._title("เลือกเดือน"), self._title("เลือกปี")
+        lb_from, lb_to = self._title("ตั้งแต่"), self._title("ถึง")
+        self._day_widgets = (lb_day, self.dayBox, lb_month, self.monthBox, lb_year, self.yearBox)
+        self._custom_widgets = (lb_from, self.startEdit, lb_to, self.endEdit)
+        selWrap.addWidget(self.modeBox)
+        selWrap.addWidget(lb_day);   selWrap.addWidget(self.dayBox)
+        selWrap.addWidget(lb_month); selWrap.addWidget(self.monthBox)
+        selWrap.addWidget(lb_year);  selWrap.addWidget(self.yearBox)
+        selWrap.addWidget(lb_from);  selWrap.addWidget(self.startEdit)
+        selWrap.addWidget(lb_to);    selWrap.addWidget(self.endEdit)
+        for w in self._custom_widgets: w.hide()
         selWrap.addStretch(1)
         g.addLayout(selWrap, 0,1,1,2)
         self.pill_income = SoftPill(f"รายได้วันที่ {today.strftime('%d/%m/%Y')} (บาท)")
@@ -885,36 +1115,60 @@ class DashboardPage(QWidget):
         rowBottom.addWidget(self.emptyTrip,1)
         p.addLayout(rowBottom)
         root.addWidget(panel)
+        self.modeBox.currentIndexChanged.connect(self._refresh_stats)
         self.dayBox.currentIndexChanged.connect(self._refresh_stats)
         self.monthBox.currentIndexChanged.connect(self._refresh_stats)
         self.yearBox.currentIndexChanged.connect(self._refresh_stats)
-        self._refresh_stats()
-        self.timer=QTimer(self); self.timer.timeout.connect(self._refresh_stats)
-        self.timer.start(4000)
+        self.startEdit.dateChanged.connect(self._refresh_stats)
+        self.endEdit.dateChanged.connect(self._refresh_stats)
+        self._shown_day, self._shown_range = None, ("", "")
+        self._stale = True # โหลดตัวเลขครั้งแรกตอนหน้านี้แสดง (showEvent)
+        # อัปเดตเมื่อมี event การจอง/เส้นทางเปลี่ยน (แทนการ query ทุก 4 วินาที)
+        with startup_trace.span("admin: eventbus.subscribe"):
+            eventbus.subscribe(self._on_bus_event)
     def _title(self, t): lb = QLabel(t); lb.setFont(TH(28, QFont.Weight.Bold)); return lb
-    def _selected_date_str(self)->str:
-        d = self.dayBox.currentText()
-        m = self.monthBox.currentText()
-        y = self.yearBox.currentText()
-        return f"{y}-{m}-{d}"
+    def _on_bus_event(self, kind: str, data: dict):
+        if kind in ("booking_created", "booking_status"):
+            date = data.get("date")
+            if date and date != self._shown_day and not (self._shown_range[0] <= date <= self._shown_range[1]):
+                return # ไม่กระทบวัน/ช่วงที่แสดงอยู่
+        elif kind not in ("bookings_deleted", "routes_changed"):
+            return
+        if self.isVisible(): self._refresh_stats()
+        else: self._stale = True
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        if self._stale:
+            with startup_trace.span("admin: DashboardPage _refresh_stats"):
+                self._refresh_stats()
+    def _selected_day(self)->datetime.date:
+        y = int(self.yearBox.currentText()); m = int(self.monthBox.currentText())
+        d = min(int(self.dayBox.currentText()), calendar.monthrange(y, m)[1]) # เช่น 31/02 -> 28/02
+        return datetime.date(y, m, d)
     def _refresh_stats(self, *args):
-        ymd = self._selected_date_str()
-        stats = db_stats_for_date(ymd)
-        d_obj = QDate(int(self.yearBox.currentText()), int(self.monthBox.currentText()), int(self.dayBox.currentText()))
-        self.pill_income.layout().itemAt(0).widget().setText(f"รายได้วันที่ {d_obj.toString('dd/MM/yyyy')} (บาท)")
+        mode = STATS_PERIOD_MODES[self.modeBox.currentText()]
+        custom = mode == "custom"
+        for w in self._day_widgets: w.setVisible(not custom)
+        for w in self._custom_widgets: w.setVisible(custom)
+        day = self.startEdit.date().toPyDate() if custom else self._selected_day()
+        start, end = period_range(mode, day, self.endEdit.date().toPyDate() if custom else None)
+        self._shown_day, self._shown_range, self._stale = day.isoformat(), (start, end), False
+
+        # กล่องด้านบน: วันที่เลือก / ช่วงสรุป: ตามโหมด
+        stats = db_stats_for_date(day.isoformat())
+        period = db_stats_for_range(start, end)
+        fmt = lambda ymd: datetime.date.fromisoformat(ymd).strftime("%d/%m/%Y")
+        span = f"วันที่ {fmt(start)}" if start == end else f" {fmt(start)} – {fmt(end)}"
+        self.pill_income.lb.setText(f"รายได้{span} (บาท)")
         self.box_orders.set_value(f"{stats['orders']:,} ครั้ง")
         self.box_income.set_value(f"{stats['revenue']:,.2f} บาท")
         self.box_seats.set_value(f"ที่นั่งที่เหลือจริง {stats['seats_remaining']:,} ที่นั่ง")
-        self.pill_income.set_value(f"{stats['revenue']:,.2f} บาท")
-        self.pill_orders.set_value(f"{stats['orders']:,} ครั้ง")
-        self.pill_avg.set_value(f"{stats['avg']:,.2f} บาท")
-        top_rows = [f"{r} (จอง {c} ครั้ง)" for (r,c) in stats["top_routes"]]
-        self.topRoutes.set_rows(top_rows)
-        if stats["least_route"]:
-            r,c = stats["least_route"]
-            self.emptyTrip.set_rows([f"{r} (ใช้งานน้อยสุด {c} ครั้ง)"])
-        else:
-            self.emptyTrip.set_rows(["—"])
+        self.pill_income.set_value(f"{period['revenue']:,.2f} บาท")
+        self.pill_orders.set_value(f"{period['orders']:,} ครั้ง")
+        self.pill_avg.set_value(f"{period['avg']:,.2f} บาท")
+        self.topRoutes.set_rows([f"{r} (จอง {c} ครั้ง)" for (r,c) in period["top_routes"]])
+        least_rows = [f"{r} (ใช้งานน้อยสุด {c} ครั้ง)" for (r,c) in period["least_routes"]]
+        self.emptyTrip.set_rows(least_rows or ["—"])
 
 class UserManagementPage(QWidget):
     # (ไม่มีการเปลี่ยนแปลง)
@@ -935,7 +1189,7 @@ class UserManagementPage(QWidget):
         h_row = QHBoxLayout(); h_row.addStretch(1); h_row.addWidget(refresh_btn); h_row.addStretch(1)
         root.addLayout(h_row)
         root.addStretch(1)
-        self.load_users()
+        # รายชื่อโหลดตอนเปิดหน้านี้ (AdminApp._nav_clicked)
     def load_users(self):
         users = db_get_all_users() # ใช้ฟังก์ชันใหม่ที่เชื่อมต่อ users.db
         if not users:
@@ -951,7 +1205,8 @@ class UserManagementPage(QWidget):
 class AdminApp(QWidget):
     def __init__(self, current_user="admin"):
         super().__init__()
-        load_fonts(); db_init()
+        with startup_trace.span("admin: load_fonts"):
+            assets.load_fonts()
 
         self.setWindowTitle(f"Go with CREPE — Admin — {current_user}")
         self.resize(1366, 768)
@@ -962,9 +1217,7 @@ class AdminApp(QWidget):
         # Header
         header = QHBoxLayout(); header.setSpacing(18)
         logo = QLabel()
-        if os.path.exists(LOGO_IMG):
-            pix = QPixmap(LOGO_IMG).scaled(210,210, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            logo.setPixmap(pix)
+        logo.setPixmap(assets.pixmap(LOGO_IMG, 210, 210))
         logo.setFixedSize(230,130)
         header.addWidget(logo, alignment=Qt.AlignmentFlag.AlignLeft|Qt.AlignmentFlag.AlignTop)
 
@@ -992,24 +1245,32 @@ class AdminApp(QWidget):
         header.addStretch(1); header.addWidget(self.nav, alignment=Qt.AlignmentFlag.AlignTop)
         root.addLayout(header)
 
-        # Pages
+        # Pages — สร้างตอนเปิดครั้งแรก (self._page) ข้อมูลของแต่ละหน้าโหลดตอนหน้านั้นแสดง
         self.stack = QStackedWidget(); root.addWidget(self.stack)
-        self.p_dash      = DashboardPage()
-        self.p_tripHub   = ManageTripHubPage(self._go_add_trip, self._go_delete_trip) 
-        self.p_addTrip   = AddTripPage(self._back_to_trip_hub)
-        self.p_delTrip   = DeleteTripPage(self._back_to_trip_hub) 
-        self.p_booking_pay = BookingAndPaymentPage(self._go_detail) 
-        self.p_detail    = BookingDetailPage(self._back_to_booking_pay)
-        self.p_user      = UserManagementPage()
-
-        for p in (self.p_dash, self.p_tripHub, self.p_addTrip, self.p_delTrip, 
-                  self.p_booking_pay, self.p_detail, self.p_user):
-            self.stack.addWidget(p)
+        self._page_builders = {
+            "dash":        DashboardPage,
+            "trip_hub":    lambda: ManageTripHubPage(self._go_add_trip, self._go_delete_trip),
+            "add_trip":    lambda: AddTripPage(self._back_to_trip_hub),
+            "del_trip":    lambda: DeleteTripPage(self._back_to_trip_hub),
+            "booking_pay": lambda: BookingAndPaymentPage(self._go_detail),
+            "detail":      lambda: BookingDetailPage(self._back_to_booking_pay),
+            "user":        UserManagementPage,
+        }
+        self._pages = {}
 
         # หน้าแรก = DASHBOARD
-        self.stack.setCurrentWidget(self.p_dash)
+        self.stack.setCurrentWidget(self._page("dash"))
         self._set_active(self.b_dash)
 
+    def _page(self, name: str) -> QWidget:
+        """หน้าตามชื่อใน _page_builders (สร้าง + ใส่ใน stack ตอนเรียกครั้งแรก)"""
+        page = self._pages.get(name)
+        if page is None:
+            with startup_trace.span(f"admin: build {name} page"):
+                page = self._pages[name] = self._page_builders[name]()
+            self.stack.addWidget(page)
+        return page
+
     def _set_active(self,btn):
         for b in (self.b_dash,self.b_trip,self.b_booking_pay,self.b_user):
             b.setProperty("active","true" if b is btn else "false")
@@ -1018,48 +1279,57 @@ class AdminApp(QWidget):
     def _nav_clicked(self):
         s = self.sender()
         mapping = {
-            self.b_dash:self.p_dash,
-            self.b_trip:self.p_tripHub,
-            self.b_booking_pay:self.p_booking_pay,
-            self.b_user:self.p_user
+            self.b_dash:"dash",
+            self.b_trip:"trip_hub",
+            self.b_booking_pay:"booking_pay",
+            self.b_user:"user"
         }
-        self.stack.setCurrentWidget(mapping.get(s,self.p_dash))
+        page = self._page(mapping.get(s,"dash"))
+        self.stack.setCurrentWidget(page)
         self._set_active(s)
         if s == self.b_user:
-            self.p_user.load_users()
+            page.load_users()
         elif s == self.b_booking_pay:
-            self.p_booking_pay.refresh()
+            page.refresh()
 
     # ----- MANAGE TRIP flows -----
     def _go_add_trip(self):
-        self.stack.setCurrentWidget(self.p_addTrip)
+        self.stack.setCurrentWidget(self._page("add_trip"))
         self._set_active(self.b_trip)
     def _go_delete_trip(self):
-        self.p_delTrip.refresh_routes()
-        self.stack.setCurrentWidget(self.p_delTrip)
+        page = self._page("del_trip")
+        page.refresh_routes()
+        self.stack.setCurrentWidget(page)
         self._set_active(self.b_trip)
     def _back_to_trip_hub(self):
-        self.stack.setCurrentWidget(self.p_tripHub)
+        self.stack.setCurrentWidget(self._page("trip_hub"))
         self._set_active(self.b_trip)
 
     # ----- Booking Detail flows -----
     def _go_detail(self, row_id:int, mode:str="booking"):
-        self.p_detail.load_row(row_id, mode=mode)
-        self.stack.setCurrentWidget(self.p_detail)
+        page = self._page("detail")
+        page.load_row(row_id, mode=mode)
+        self.stack.setCurrentWidget(page)
         self._set_active(self.b_booking_pay)
 
     def _back_to_booking_pay(self):
-        self.p_booking_pay.refresh()
-        self.stack.setCurrentWidget(self.p_booking_pay)
+        page = self._page("booking_pay")
+        page.refresh()
+        self.stack.setCurrentWidget(page)
         self._set_active(self.b_booking_pay)
 
 # -------- RUN --------
 if __name__ == "__main__":
-    if not QApplication.instance():
-        app = QApplication(sys.argv)
-    else:
-        app = QApplication.instance()
+    with startup_trace.span("QApplication"):
+        if not QApplication.instance():
+            app = QApplication(sys.argv)
+        else:
+            app = QApplication.instance()
         
-    w = AdminApp()
+    with startup_trace.span("db_init"):
+        db_init()
+    with startup_trace.span("AdminApp()"):
+        w = AdminApp()
+    startup_trace.first_paint(w, "admin")
     w.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,105 @@
+# app_shell.py — Go with CREPE
+# เปิดหน้า Sign In -> Home (ลูกค้า) / Admin Console ใน process เดียว QApplication เดียว
+# - ไม่เปิด Python ใหม่ต่อ role: ไม่ต้อง import PyQt6 / ลงทะเบียนฟอนต์ / รัน migration ซ้ำทุกครั้งที่ login
+# - import home / admin ตอนว่างหลังหน้า Sign In ขึ้นแล้ว ส่วน migration ของทุกไฟล์ DB รันบน QThreadPool (หน้า Sign In ไม่ค้าง)
+#   สร้างหน้าจอของ role ตอนใช้ครั้งแรก
+# - ส่งชื่อผู้ใช้ที่ login แล้วให้หน้าจอโดยตรง (ไม่ผ่าน --user)
+#   python app_shell.py            (--profile-startup ได้เหมือน login.py / home.py / admin.py)
+# login.py / home.py / admin.py ยังรันเดี่ยวได้เหมือนเดิม
+
+import sys, time, importlib, threading
+import startup_trace   # ก่อน PyQt6 เพื่อให้ --profile-startup นับเวลา import ด้วย
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
+from PyQt6.QtWidgets import QApplication, QMessageBox
+import login
+
+# role -> (โมดูล, คลาสหน้าจอ, ฟังก์ชันเตรียม DB)
+VIEWS = {
+    "user":  ("home",  "App",      "init_db"),
+    "admin": ("admin", "AdminApp", "db_init"),
+}
+
+class Shell:
+    def __init__(self, app: QApplication):
+        self.app = app
+        self.app_font = app.font()   # AuthWindow ตั้งฟอนต์ทั้งแอปเป็น Rubik — คืนค่าเดิมก่อนเปิดหน้าจอถัดไป
+        self.auth = None
+        self.views = {}              # role -> หน้าจอที่สร้างแล้ว
+        self._ready = set()          # โมดูลที่ import + เตรียม DB แล้ว
+        self._migrated = threading.Event()   # migration บน QThreadPool จบแล้ว (สำเร็จหรือไม่ก็ตาม)
+        self._preload_job = None
+
+    def start(self):
+        with startup_trace.span("warn_missing_libs"):
+            login.warn_missing_libs(None)
+        with startup_trace.span("init_db"):
+            login.init_db(login.DB_PATH_ABS)
+        with startup_trace.span("AuthWindow()"):
+            self.auth = login.AuthWindow(on_signed_in=self.open_view)
+        startup_trace.first_paint(self.auth, "app_shell")
+        self.auth.show()
+        QTimer.singleShot(0, self._preload)
+
+    def _module(self, role: str):
+        mod_name, _, init_name = VIEWS[role]
+        mod = importlib.import_module(mod_name)
+        if mod_name not in self._ready:
+            if self._preload_job is not None and not self._migrated.is_set():
+                # login ก่อน migration บน QThreadPool เสร็จ: รอให้จบก่อน (ไม่ migrate ซ้อนกัน 2 thread)
+                QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+                try:
+                    self._migrated.wait()
+                finally:
+                    QApplication.restoreOverrideCursor()
+            # DB เป็นเวอร์ชันล่าสุดแล้ว: เหลือแค่ตั้งค่า connection ของ GUI thread (เช่น foreign_keys ของ admin)
+            getattr(mod, init_name)()
+            self._ready.add(mod_name)
+        return mod
+
+    def _db_error(self, err):
+        QMessageBox.critical(self.auth, "Database Error", f"ไม่สามารถเตรียมฐานข้อมูลได้:\n{err}")
+
+    def _preload(self):
+        """import home / admin แล้วส่ง migration ไปรันบน QThreadPool"""
+        try:
+            mods = [(importlib.import_module(mod_name), init_name) for mod_name, _, init_name in VIEWS.values()]
+        except Exception as e:
+            self._migrated.set(); self._db_error(e); return
+
+        def migrate_all():
+            try:
+                for mod, init_name in mods:
+                    getattr(mod, init_name)()
+            finally:
+                self._migrated.set()
+
+        job = login.AuthJob(migrate_all)
+        self._preload_job = job.signals   # เก็บ signals ไว้จนกว่างานจะจบ
+        job.signals.failed.connect(self._db_error)
+        QThreadPool.globalInstance().start(job)
+
+    def open_view(self, username: str, role: str):
+        if role not in VIEWS:
+            QMessageBox.critical(self.auth, "Error", f"ไม่พบระบบสำหรับ {role}"); return
+        t0 = time.perf_counter()
+        win = self.views.get(role)
+        if win is None:
+            self.app.setFont(self.app_font)
+            _, cls_name, _ = VIEWS[role]
+            try:
+                mod = self._module(role)
+            except Exception as e:
+                self._db_error(e); return
+            win = self.views[role] = getattr(mod, cls_name)(current_user=username)
+        win.show()
+        self.auth.close()
+        print(f"INFO: sign in -> {role} view in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    shell = Shell(app)
+    try:
+        shell.start()
+    except Exception as e:
+        QMessageBox.critical(None, "Database Error", f"ไม่สามารถเตรียมฐานข้อมูลได้:\n{e}"); sys.exit(1)
+    sys.exit(app.exec())
@@ -0,0 +1,124 @@
+# assets.py — Go with CREPE
+# ฟอนต์และรูปที่ใช้ร่วมกันทุกหน้าจอ (login / home / admin / ticket_pdf)
+# - load_fonts(): ลงทะเบียน Rubik + FC Minimal ครั้งเดียวต่อ process
+# - pixmap(): QPixmap ขนาดที่ต้องการ หาใน QPixmapCache -> ไฟล์ cache บนดิสก์ -> ถอดรหัส/ย่อจากต้นฉบับ แล้วเก็บไว้
+# - image(): แบบ QImage สำหรับ worker thread (ticket_pdf) ใช้ cache บนดิสก์ชุดเดียวกัน
+# key ของ cache = (พาธ, mtime, ขนาดไฟล์, ขนาดที่ต้องการ, โหมดย่อ) — แก้ไฟล์ต้นฉบับแล้ว cache เก่าจะไม่ถูกใช้อีก
+
+import os, hashlib, threading
+from PyQt6.QtCore import Qt, QStandardPaths
+from PyQt6.QtGui import QFontDatabase, QImage, QPixmap, QPixmapCache
+
+FONT_FILES = (
+    os.path.join("font", "Rubik-Regular.ttf"),   # ตัวแรก = family หลักของ UI
+    os.path.join("font", "Rubik-Bold.ttf"),
+    os.path.join("font", "FC Minimal.ttf"),
+)
+
+# ที่เก็บรูปที่ย่อแล้วบนดิสก์ (ว่าง = โฟลเดอร์ cache ของระบบ)
+ASSET_CACHE_DIR = os.environ.get("CREPE_ASSET_CACHE_DIR", "")
+# เพดาน QPixmapCache (KB) — ภาพพื้นหลังหน้า Sign In เต็มจอ 1 ขนาด ~4 MB
+PIXMAP_CACHE_KB = 64 * 1024
+
+KEEP  = Qt.AspectRatioMode.KeepAspectRatio
+COVER = Qt.AspectRatioMode.KeepAspectRatioByExpanding
+
+_lock = threading.Lock()
+_families = None
+_images = {}
+_pixmap_cache_ready = False
+
+# ---------- ฟอนต์ ----------
+def load_fonts() -> str:
+    """ลงทะเบียนฟอนต์ใน FONT_FILES (ครั้งแรกเท่านั้น) คืนชื่อ family ของ Rubik"""
+    global _families
+    with _lock:
+        if _families is None:
+            _families = {}
+            for p in FONT_FILES:
+                if os.path.exists(p):
+                    _families[p] = QFontDatabase.applicationFontFamilies(QFontDatabase.addApplicationFont(p))
+        fams = _families.get(FONT_FILES[0])
+    return fams[0] if fams else "Rubik"
+
+# ---------- รูป ----------
+def _cache_dir() -> str:
+    return ASSET_CACHE_DIR or os.path.join(
+        QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation), "GoWithCREPE", "assets")
+
+def _key(path: str, w: int, h: int, mode, crop: bool) -> str | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{w}x{h}|{mode.value}|{int(crop)}"
+
+def _disk_file(key: str) -> str:
+    return os.path.join(_cache_dir(), hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+def _save(img: QImage | QPixmap, file: str):
+    """เขียนไฟล์ชั่วคราวแล้ว rename (หลาย process เขียนพร้อมกันได้ ไม่มีใครอ่านไฟล์ครึ่ง ๆ)"""
+    try:
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        tmp = f"{file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if img.save(tmp, "PNG"):
+            os.replace(tmp, file)
+    except OSError as e:
+        print(f"WARNING: Could not write asset cache {file}: {e}")
+
+def _fit(src, w: int, h: int, mode, crop: bool):
+    """ย่อ src (QImage/QPixmap) ให้พอดี w x h ตาม mode; crop = ตัดส่วนเกินของ COVER ออกให้ได้ w x h พอดี"""
+    out = src.scaled(w, h, mode, Qt.TransformationMode.SmoothTransformation)
+    if crop and (out.width() > w or out.height() > h):
+        out = out.copy(max(0, (out.width() - w) // 2), max(0, (out.height() - h) // 2), w, h)
+    return out
+
+def pixmap(path: str, w: int = 0, h: int = 0, mode=KEEP, crop: bool = False, disk: bool = True) -> QPixmap:
+    """
+    รูป path ย่อเป็น w x h (0 = ขนาดเดิม) — ใช้ใน GUI thread เท่านั้น
+    disk=False สำหรับขนาดที่เปลี่ยนตามการลากหน้าต่าง (เก็บแค่ในหน่วยความจำ ย่อจากต้นฉบับที่ถอดรหัสไว้แล้ว)
+    ไม่พบไฟล์/เปิดไม่ได้ คืน QPixmap ว่าง
+    """
+    global _pixmap_cache_ready
+    if not _pixmap_cache_ready:
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), PIXMAP_CACHE_KB))
+        _pixmap_cache_ready = True
+    key = _key(path, w, h, mode, crop)
+    if key is None:
+        return QPixmap()
+    pm = QPixmapCache.find(key)
+    if pm is not None:
+        return pm
+    file = _disk_file(key) if disk and w > 0 and h > 0 else None
+    if file and os.path.exists(file):
+        pm = QPixmap(file)
+    else:
+        pm = QPixmap()
+    if pm.isNull():
+        src = pixmap(path, disk=False) if w > 0 and h > 0 else QPixmap(path)
+        if src.isNull():
+            return src
+        pm = _fit(src, w, h, mode, crop) if w > 0 and h > 0 else src
+        if file:
+            _save(pm, file)
+    QPixmapCache.insert(key, pm)
+    return pm
+
+def image(path: str, w: int, h: int, mode=KEEP) -> QImage:
+    """เหมือน pixmap() แต่คืน QImage และเรียกจาก thread ใดก็ได้ (เก็บไว้ในหน่วยความจำตลอดอายุ process)"""
+    key = _key(path, w, h, mode, False)
+    if key is None:
+        return QImage()
+    with _lock:
+        img = _images.get(key)
+        if img is not None:
+            return img
+        file = _disk_file(key)
+        img = QImage(file) if os.path.exists(file) else QImage()
+        if img.isNull():
+            img = QImage(path)
+            if not img.isNull():
+                img = _fit(img, w, h, mode, False)
+                _save(img, file)
+        _images[key] = img
+        return img
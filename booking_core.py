@@ -0,0 +1,485 @@
+# booking_core.py — Go with CREPE
+# ตรรกะการจองที่ไม่ใช้ Qt: เส้นทาง, ที่นั่งว่าง, ล็อกที่นั่ง, บันทึก/ยกเลิก/ค้นหาการจอง, ราคา + VAT
+# - home.py (หน้าจอ) และ booking_service.py (API ของตู้/เคาน์เตอร์) ใช้ชุดเดียวกัน
+# - วันที่เดินทางทุกฟังก์ชันเป็นข้อความ yyyy-MM-dd
+# - ตั้งพาธ DB ด้วย configure() ก่อนใช้ (home.init_db / booking_service)
+
+import json, random, sqlite3, time
+from contextlib import closing
+import db_manager
+import seat_layout
+
+DB_USER_PATH  = "passenger_bookings.db"
+DB_ADMIN_PATH = "users.db"
+
+# ล็อกที่นั่งชั่วคราวระหว่างเลือกที่นั่ง -> ชำระเงิน
+SEAT_HOLD_SECONDS = 10 * 60     # อายุการล็อก 1 ครั้ง (วินาที)
+
+# จำนวนครั้งที่สุ่มเลขตั๋วใหม่เมื่อชนกับเลขที่มีใน bookings (UNIQUE index)
+TICKET_NO_ATTEMPTS = 20
+
+VAT_RATE = 0.07
+STATUS_PENDING   = "รอดำเนินการ"
+STATUS_CONFIRMED = "ยืนยัน"
+STATUS_CANCELLED = "ยกเลิก"
+
+def configure(user_db: str, admin_db: str):
+    """ตั้งพาธ passenger_bookings.db / users.db (catalog เส้นทางจะโหลดใหม่จากไฟล์ใหม่)"""
+    global DB_USER_PATH, DB_ADMIN_PATH
+    DB_USER_PATH, DB_ADMIN_PATH = user_db, admin_db
+    ROUTE_CATALOG.reset()
+
+def price_breakdown(price_each, qty: int) -> tuple[float, float, float]:
+    """(ราคารวมก่อน VAT, VAT, ยอดสุทธิ) ปัดทศนิยม 2 ตำแหน่ง"""
+    subtotal = float(price_each) * qty
+    vat = round(subtotal * VAT_RATE, 2)
+    return subtotal, vat, round(subtotal + vat, 2)
+
+def db_connect_user():
+    """เชื่อมต่อฐานข้อมูลผู้ใช้งาน (passenger_bookings.db) — ใช้ connection ที่เปิดค้างไว้จาก db_manager"""
+    return db_manager.connect(DB_USER_PATH)
+
+def db_connect_admin():
+    """เชื่อมต่อ users.db ของ Admin (โครงสร้างตารางมาจาก migrations.ADMIN_MIGRATIONS)"""
+    return db_manager.connect(DB_ADMIN_PATH)
+
+def db_connect_booking():
+    """
+    เชื่อมต่อ passenger_bookings.db แล้ว ATTACH users.db เป็น schema 'adm'
+    ใช้สำหรับบันทึก passenger_bookings + adm.bookings ใน transaction เดียว (commit ครั้งเดียว)
+    ทั้งสองไฟล์ใช้ rollback journal (db_manager.ATTACHED_FILES) จึง atomic ข้ามไฟล์แม้ crash กลาง commit
+    """
+    return db_manager.connect(DB_USER_PATH, attach={"adm": DB_ADMIN_PATH})
+
+
+# ---------- Route DB Function (NEW) ----------
+
+def get_routes_from_admin_db() -> dict:
+    """🌟 ดึงข้อมูลเส้นทางจากตาราง ROUTES ใน USERS.DB (ที่ Admin Console บันทึก) 🌟"""
+    route_map = {}
+    try:
+        with closing(db_connect_admin()) as conn, closing(conn.cursor()) as cur:
+            cur.execute("SELECT route_from, route_to, departure_time, duration, capacity, layout FROM routes")
+            routes = cur.fetchall()
+            
+            for frm, to, dep_time, duration, capacity, layout in routes:
+                if frm == "ขอนแก่น":
+                    # ใช้ปลายทางเป็น Key หลัก
+                    route_map.setdefault(to, {}).setdefault('arrivals', []).append(dep_time)
+                    # กำหนดคุณสมบัติอื่น ๆ (ใช้ค่าแรกที่พบ)
+                    if 'price' not in route_map[to]:
+                        # NOTE: ตาราง routes ไม่มีคอลัมน์ราคาโดยตรง, ต้องกำหนดค่าเริ่มต้น
+                        route_map[to]['price'] = 100 
+                    route_map[to]['duration'] = duration
+                    route_map[to]['capacity'] = capacity
+                    # ความจุ + แบบรถของแต่ละเวลาออก -> ผังที่นั่ง (seat_layout)
+                    route_map[to].setdefault('coaches', {})[dep_time] = (capacity, layout)
+            
+            # เรียงลำดับเวลาออกรถ
+            for dest in route_map:
+                if 'arrivals' in route_map[dest]:
+                    route_map[dest]['arrivals'].sort()
+        
+    except Exception as e:
+        print(f"ERROR: Could not fetch route data from users.db/routes: {e}")
+        return {} 
+
+    return route_map
+
+def get_all_routes_from_db() -> dict:
+    """ดึงข้อมูลเส้นทางทั้งหมดจากตาราง route_info ใน passenger_bookings.db (FALLBACK เก่า)"""
+    routes = {}
+    try:
+        with db_connect_user() as con: 
+            cur = con.cursor()
+            cur.execute("SELECT province_th, price, arrivals_json FROM route_info")
+            
+            for province_th, price, arrivals_json in cur.fetchall():
+                # โค้ดเดิมใช้ arrivals_json แต่ขาด duration/capacity
+                arrivals_list = json.loads(arrivals_json) 
+                
+                routes[province_th] = {
+                    "price": price,
+                    "arrivals": arrivals_list,
+                    "duration": "N/A", # Hardcoded เพื่อให้โค้ดอื่นไม่ Error
+                    "capacity": 40
+                }
+    except Exception as e:
+        print(f"ERROR: Could not fetch route data from passenger_bookings.db/route_info: {e}")
+        return {} 
+    
+    return routes
+
+def new_ticket_no() -> str:
+    """เลขตั๋วสุ่ม 8 หลัก (หลักแรกไม่เป็น 0) — ยังไม่รับประกันว่าไม่ซ้ำ จนกว่าจะบันทึกผ่าน save_new_booking"""
+    return str(random.randint(10_000_000, 99_999_999))
+
+def _save_booking_summary(cur: sqlite3.Cursor, data: dict, seat_list: list[str], ticket_no: str) -> tuple[int, str]:
+    """
+    บันทึกสรุปการจองลงในตาราง 'adm.bookings' ของ Admin (users.db ที่ ATTACH ไว้)
+    ต้องเรียกภายใน transaction ของ db_connect_booking() คืนค่า (id ของแถวที่บันทึก, เลขตั๋วที่ได้จริง)
+    ถ้า ticket_no ชนกับที่มีอยู่ (UNIQUE index) จะสุ่มเลขใหม่แล้วลองอีก ไม่เกิน TICKET_NO_ATTEMPTS ครั้ง
+    """
+    qty = len(seat_list)
+    subtotal, vat, _ = price_breakdown(data['price_each'], qty)
+
+    customer_name = f"{data['first_name']} {data['last_name']}"
+    route_from = data['origin'].split()[0] # ดึงแค่จังหวัด "ขอนแก่น"
+    route_to = data['dest']
+    seat_str = ", ".join(seat_list)
+
+    values = [
+        ticket_no,
+        customer_name,
+        route_from,
+        route_to,
+        data['date'],
+        STATUS_PENDING,
+        data['phone'],
+        data['email'],
+        seat_str,
+        qty,
+        subtotal,
+        vat,
+        data.get('slip_path', ''),
+        data['dep_time'],
+        data['arr_time']
+    ]
+    for attempt in range(TICKET_NO_ATTEMPTS):
+        try:
+            cur.execute("""
+                INSERT INTO adm.bookings(
+                    ticket_no, customer_name, route_from, route_to, date, status,
+                    phone, email, seat, seat_count, price, vat, slip_path, dep_time, arr_time
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, values)
+            break
+        except sqlite3.IntegrityError as e:
+            # ชนแค่คำสั่งนี้ (transaction ยังอยู่) -> สุ่มเลขใหม่
+            if "ticket_no" not in str(e) or attempt == TICKET_NO_ATTEMPTS - 1:
+                raise
+            values[0] = new_ticket_no()
+    booking_id = cur.lastrowid
+    cur.executemany("INSERT INTO adm.booking_seats (booking_id, seat_code) VALUES (?, ?)",
+                    [(booking_id, s) for s in seat_list])
+    return booking_id, values[0]
+
+def get_booked_seats(travel_date: str, dep_time: str, dest: str, session_id: str | None = None) -> set[str]:
+    """
+    ดึงที่นั่งที่ไม่ว่างสำหรับเที่ยวรถและวันที่เฉพาะ (ใช้ idx_pb_trip_booked)
+    รวมที่นั่งที่ผู้ใช้อื่นล็อกค้างไว้ (ยังไม่หมดอายุ) ยกเว้นล็อกของ session_id เอง
+    """
+    with closing(db_connect_user()) as con:
+        cur = con.cursor()
+        cur.execute("""
+            SELECT seat_code FROM passenger_bookings
+            WHERE travel_date = ? AND dest = ? AND dep_time = ? AND is_booked = 1
+            UNION
+            SELECT seat_code FROM seat_holds
+            WHERE travel_date = ? AND dest = ? AND dep_time = ?
+              AND expires_at > ? AND session_id IS NOT ?
+        """, (travel_date, dest, dep_time, travel_date, dest, dep_time, time.time(), session_id))
+        return {r[0] for r in cur.fetchall()}
+
+def get_taken_counts(dates: list[str], dest: str, session_id: str | None = None) -> dict[tuple[str, str], int]:
+    """
+    จำนวนที่นั่งไม่ว่างของทุกเที่ยวไป dest ในวันที่ dates -> {(yyyy-MM-dd, dep_time): จำนวน}
+    query เดียว GROUP BY (travel_date, dep_time) นับแบบเดียวกับ get_booked_seats (จองแล้ว + ล็อกของคนอื่น)
+    """
+    dates = list(dates)
+    marks = ",".join("?" * len(dates))
+    with closing(db_connect_user()) as con:
+        cur = con.cursor()
+        cur.execute(f"""
+            SELECT travel_date, dep_time, COUNT(*) FROM (
+                SELECT travel_date, dep_time, seat_code FROM passenger_bookings
+                WHERE travel_date IN ({marks}) AND dest = ? AND is_booked = 1
+                UNION
+                SELECT travel_date, dep_time, seat_code FROM seat_holds
+                WHERE travel_date IN ({marks}) AND dest = ?
+                  AND expires_at > ? AND session_id IS NOT ?
+            ) GROUP BY travel_date, dep_time
+        """, (*dates, dest, *dates, dest, time.time(), session_id))
+        return {(d, t): n for d, t, n in cur.fetchall()}
+
+# ---------- Seat holds (ล็อกที่นั่งชั่วคราว) ----------
+
+def hold_seat(travel_date: str, dep_time: str, dest: str, seat_code: str, session_id: str) -> bool:
+    """
+    ล็อกที่นั่งให้ session_id เป็นเวลา SEAT_HOLD_SECONDS (หรือต่ออายุถ้าล็อกอยู่แล้ว)
+    คืนค่า False ถ้าที่นั่งถูกจองแล้ว หรือผู้ใช้อื่นล็อกไว้และยังไม่หมดอายุ
+    """
+    now = time.time()
+    with closing(db_connect_user()) as con, con:
+        # คำสั่งเดียว = transaction เดียว: ตรวจที่นั่งที่จองแล้ว + แย่งล็อกที่หมดอายุได้ในจังหวะเดียว
+        cur = con.execute("""
+            INSERT INTO seat_holds (travel_date, dest, dep_time, seat_code, session_id, expires_at)
+            SELECT ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM passenger_bookings
+                WHERE travel_date = ? AND dest = ? AND dep_time = ? AND seat_code = ? AND is_booked = 1
+            )
+            ON CONFLICT (travel_date, dest, dep_time, seat_code) DO UPDATE
+                SET session_id = excluded.session_id, expires_at = excluded.expires_at
+                WHERE seat_holds.session_id = excluded.session_id OR seat_holds.expires_at <= ?
+        """, (travel_date, dest, dep_time, seat_code, session_id, now + SEAT_HOLD_SECONDS,
+              travel_date, dest, dep_time, seat_code, now))
+        return cur.rowcount > 0
+
+def release_seat(travel_date: str, dep_time: str, dest: str, seat_code: str, session_id: str):
+    """ปลดล็อกที่นั่งที่ session_id ถืออยู่"""
+    with closing(db_connect_user()) as con, con:
+        con.execute("""
+            DELETE FROM seat_holds
+            WHERE travel_date = ? AND dest = ? AND dep_time = ? AND seat_code = ? AND session_id = ?
+        """, (travel_date, dest, dep_time, seat_code, session_id))
+
+def release_session_holds(session_id: str):
+    """ปลดล็อกทุกที่นั่งของ session (เมื่อเลิกจองกลางคัน / ปิดหน้าต่าง)"""
+    with closing(db_connect_user()) as con, con:
+        con.execute("DELETE FROM seat_holds WHERE session_id = ?", (session_id,))
+
+def extend_session_holds(session_id: str):
+    """ต่ออายุล็อกทั้งหมดของ session (เช่น ตอนเข้าหน้าชำระเงิน)"""
+    with closing(db_connect_user()) as con, con:
+        con.execute("UPDATE seat_holds SET expires_at = ? WHERE session_id = ?",
+                    (time.time() + SEAT_HOLD_SECONDS, session_id))
+
+def purge_expired_holds() -> int:
+    """ลบล็อกที่หมดอายุแล้ว คืนค่าจำนวนที่ถูกลบ"""
+    with closing(db_connect_user()) as con, con:
+        return con.execute("DELETE FROM seat_holds WHERE expires_at <= ?", (time.time(),)).rowcount
+
+def save_new_booking(data: dict, seat_list: list[str], ticket_no: str, session_id: str | None = None) -> tuple[int, str, list[str]]:
+    """
+    จองที่นั่งทั้งหมดใน seat_list แบบ all-or-nothing (BEGIN IMMEDIATE + executemany)
+    พร้อมบันทึกสรุปลง adm.bookings ใน transaction เดียวกัน (ทั้งสองไฟล์ commit พร้อมกันหรือไม่ commit เลย)
+    ticket_no เป็นเลขที่ต้องการ ถ้าซ้ำกับที่มีอยู่จะได้เลขใหม่แทน
+    คืนค่า (booking_id ของ adm.bookings, เลขตั๋วที่ได้จริง, ที่นั่งที่ชนกัน) — ถ้ามีที่นั่งชน จะไม่บันทึกอะไรเลยและ booking_id = -1
+    ที่นั่งที่ session อื่นล็อกค้างไว้ถือว่าชนเช่นกัน ส่วนล็อกของ session_id เองจะถูกลบเมื่อจองสำเร็จ
+    data: first_name, last_name, phone, citizen_id, email, date (yyyy-MM-dd), origin, dest, dep_time, arr_time, price_each[, slip_path]
+    """
+    trip_data = {
+        "origin": data['origin'],
+        "dest": data['dest'],
+        "dep_time": data['dep_time'],
+        "arr_time": data['arr_time'],
+        "price": data['price_each']
+    }
+    trip_info_json = json.dumps(trip_data)
+    travel_date = data['date']
+    origin = data['origin'].split()[0] # เก็บแค่จังหวัด "ขอนแก่น"
+    trip_key = (travel_date, data['dest'], data['dep_time'])
+    seats = list(dict.fromkeys(seat_list)) # ตัดที่นั่งซ้ำ แต่คงลำดับเดิม
+
+    rows = [(
+        data['first_name'],
+        data['last_name'],
+        data['phone'],
+        data['citizen_id'],
+        data['email'],
+        travel_date,
+        origin,
+        data['dest'],
+        data['dep_time'],
+        trip_info_json,
+        seat
+    ) for seat in seats]
+
+    with closing(db_connect_booking()) as con:
+        cur = con.cursor()
+        # ล็อกการเขียนตั้งแต่ต้น (ทั้งสองไฟล์) เพื่อไม่ให้ตู้อื่นแทรกจองระหว่างตรวจสอบกับบันทึก
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            marks = ",".join("?" * len(seats))
+            cur.execute(f"""
+                SELECT seat_code FROM passenger_bookings
+                WHERE travel_date = ? AND dest = ? AND dep_time = ? AND seat_code IN ({marks}) AND is_booked = 1
+                UNION
+                SELECT seat_code FROM seat_holds
+                WHERE travel_date = ? AND dest = ? AND dep_time = ? AND seat_code IN ({marks})
+                  AND expires_at > ? AND session_id IS NOT ?
+            """, (*trip_key, *seats, *trip_key, *seats, time.time(), session_id))
+            taken = {r[0] for r in cur.fetchall()}
+            conflicts = [s for s in seats if s in taken]
+            if conflicts:
+                con.rollback()
+                return -1, ticket_no, conflicts
+
+            # จองเลขตั๋วใน adm.bookings ก่อน (อาจได้เลขใหม่ถ้าชน) แล้วใช้เลขนั้นกับทุกที่นั่ง
+            booking_id, ticket_no = _save_booking_summary(cur, data, seats, ticket_no)
+            # แถวเดิมของที่นั่งนี้ที่ is_booked = 0 (ยกเลิกแล้ว) ถูกเขียนทับด้วยการจองใหม่
+            cur.executemany("""
+            INSERT INTO passenger_bookings (
+                first_name, last_name, phone, citizen_id, email, travel_date,
+                origin, dest, dep_time, trip_info_json, seat_code, ticket_no
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (travel_date, dest, dep_time, seat_code) DO UPDATE SET
+                first_name = excluded.first_name, last_name = excluded.last_name, phone = excluded.phone,
+                citizen_id = excluded.citizen_id, email = excluded.email, origin = excluded.origin,
+                trip_info_json = excluded.trip_info_json, ticket_no = excluded.ticket_no,
+                is_booked = 1, created_at = CURRENT_TIMESTAMP
+            """, [(*r, ticket_no) for r in rows])
+
+            if session_id:
+                cur.execute("DELETE FROM seat_holds WHERE session_id = ?", (session_id,))
+            con.commit()
+            return booking_id, ticket_no, []
+        except Exception:
+            con.rollback()
+            raise
+
+# ---------- Catalog เส้นทาง ----------
+
+# 1. ข้อมูล Fallback Hard-coded
+HARDCODED_ROUTES = {
+    "มหาสารคาม":{"price":70,"arrivals":["08:30","10:30","12:30"]},
+    "กาฬสินธุ์":{"price":90,"arrivals":["08:45","10:45","12:45"]},
+    "ร้อยเอ็ด":{"price":110,"arrivals":["09:15","11:15","13:15"]},
+    "อุดรธานี":{"price":100,"arrivals":["09:00","11:00","13:00"]},
+    "ชัยภูมิ":{"price":160,"arrivals":["09:30","11:30","13:30"]},
+    "หนองบัวลำภู":{"price":170,"arrivals":["09:30","11:30","13:30"]},
+    "หนองคาย":{"price":190,"arrivals":["10:00","12:00","14:00"]},
+    "ยโสธร":{"price":200,"arrivals":["10:15","12:15","14:15"]},
+    "บุรีรัมย์":{"price":250,"arrivals":["10:30","12:30","14:30"]},
+    "นครราชสีมา":{"price":220,"arrivals":["10:15","12:15","14:15"]},
+    "เลย":{"price":260,"arrivals":["11:00","13:00","15:00"]},
+    "สุรินทร์":{"price":300,"arrivals":["11:30","13:30","15:30"]},
+    "อำนาจเจริญ":{"price":350,"arrivals":["12:00","14:00","16:00"]},
+    "สกลนคร":{"price":330,"arrivals":["11:30","13:30","15:30"]},
+    "บึงกาฬ":{"price":380,"arrivals":["12:00","14:00","16:00"]},
+    "มุกดาหาร":{"price":290,"arrivals":["10:30","12:30","14:30"]},
+    "นครพนม":{"price":380,"arrivals":["11:00","13:00","15:00"]},
+    "ศรีสะเกษ":{"price":350,"arrivals":["12:00","14:00","16:00"]},
+    "อุบลราชธานี":{"price":330,"arrivals":["12:30","14:30","16:30"]},
+}
+
+# ค่าเริ่มต้น (ใช้สำหรับกรณีที่ข้อมูล DB ไม่สมบูรณ์)
+DEFAULT_PRICE   = 70
+DEFAULT_ARRIVAL = ["08:30","10:30","12:30"]
+
+# 2. Catalog เส้นทาง: โหลดเมื่อถูกใช้ครั้งแรก และโหลดใหม่เมื่อ Admin แก้ไขเส้นทาง
+class RouteCatalog:
+    """
+    รวมเส้นทางจาก route_info (passenger_bookings.db) + routes (users.db) โดยให้ routes ของ Admin มาก่อน
+    ถ้าไม่มีข้อมูลเลยใช้ HARDCODED_ROUTES
+    ตรวจการเปลี่ยนแปลงด้วย PRAGMA data_version / total_changes ก่อน แล้วจึงอ่าน catalog_version
+    """
+    def __init__(self):
+        self._routes = None
+        self._seen = {}     # ชื่อ DB -> (data_version, total_changes, catalog_version)
+        self.version = 0    # เพิ่มทุกครั้งที่โหลดใหม่ (ให้ UI รู้ว่าต้องเติมรายการใหม่)
+
+    def reset(self):
+        """ลืมข้อมูลที่โหลดไว้ (เปลี่ยนไฟล์ DB) — เรียก routes() ครั้งถัดไปจะโหลดใหม่"""
+        self._routes = None
+        self._seen.clear()
+
+    def _db_changed(self, name: str, con: sqlite3.Connection) -> bool:
+        mark = (con.execute("PRAGMA data_version").fetchone()[0], con.total_changes)
+        seen = self._seen.get(name)
+        if seen and seen[:2] == mark:
+            return False
+        try:
+            row = con.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+            ver = row[0] if row else None
+        except sqlite3.OperationalError:
+            ver = None # ยังไม่มี catalog_version: ถือว่าเปลี่ยนทุกครั้งที่ไฟล์ถูกแก้
+        self._seen[name] = mark + (ver,)
+        return seen is None or ver is None or seen[2] != ver
+
+    def _changed(self) -> bool:
+        changed = False
+        for name, connect in (("admin", db_connect_admin), ("user", db_connect_user)):
+            try:
+                changed = self._db_changed(name, connect()) or changed
+            except sqlite3.Error as e:
+                print(f"ERROR: Could not check route catalog version ({name}): {e}")
+        return changed
+
+    def _load(self):
+        merged = get_all_routes_from_db()
+        merged.update(get_routes_from_admin_db()) # admin routes เขียนทับ route_info หากปลายทางซ้ำกัน
+        self._routes = merged or HARDCODED_ROUTES.copy()
+        self.version += 1
+
+    def routes(self) -> dict:
+        if self._changed() or self._routes is None:
+            self._load()
+        return self._routes
+
+    def info(self, dest: str) -> dict:
+        return self.routes().get(dest, {"price":DEFAULT_PRICE,"arrivals":DEFAULT_ARRIVAL})
+
+    def dest_options(self) -> list[str]:
+        return [p for p in self.routes() if p != "ขอนแก่น"]
+
+ROUTE_CATALOG = RouteCatalog()
+
+def trip_seat_codes(dest: str, dep_time: str) -> list[str]:
+    """รหัสที่นั่งทั้งคันของเที่ยว (ความจุ + แบบรถจาก routes ผ่าน seat_layout)"""
+    info = ROUTE_CATALOG.info(dest)
+    capacity, layout = info.get("coaches", {}).get(dep_time, (info.get("capacity"), None))
+    return seat_layout.seat_codes(*seat_layout.normalize(capacity, layout))
+
+# ---------- ยกเลิก / ค้นหาการจอง (ด้วยเลขตั๋ว) ----------
+
+def apply_booking_status(cur: sqlite3.Cursor, booking_id: int, status: str) -> tuple[str, str] | None:
+    """
+    เปลี่ยนสถานะการจอง booking_id ใน transaction ของ cur (connection แบบ db_connect_booking: passenger_bookings + adm)
+    ใช้ร่วมกันทั้ง cancel_booking / Admin Console / booking_service ไม่ให้ตรรกะแยกกันไปคนละทาง
+    - ยกเลิก = ลบที่นั่งของตั๋วใน passenger_bookings (ที่นั่งว่างทันที), ยืนยัน = is_booked = 1
+    - daily_route_stats ปรับเองด้วย Trigger บน bookings
+    คืน (เลขตั๋ว, วันที่เดินทาง) หรือ None ถ้าไม่พบ
+    """
+    row = cur.execute("SELECT ticket_no, date FROM adm.bookings WHERE id = ?", (booking_id,)).fetchone()
+    if row is None:
+        return None
+    ticket_no, travel_date = row
+    cur.execute("UPDATE adm.bookings SET status = ? WHERE id = ?", (status, booking_id))
+    if ticket_no:
+        # จำกัดด้วยวันที่ด้วย: DB เก่าอาจมีเลขตั๋วซ้ำข้ามการจอง
+        if status == STATUS_CONFIRMED:
+            cur.execute("UPDATE passenger_bookings SET is_booked = 1 WHERE ticket_no = ? AND travel_date = ?",
+                        (ticket_no, travel_date))
+        elif status == STATUS_CANCELLED:
+            cur.execute("DELETE FROM passenger_bookings WHERE ticket_no = ? AND travel_date = ?",
+                        (ticket_no, travel_date))
+    return ticket_no, travel_date
+
+def cancel_booking(ticket_no: str) -> tuple[int, str] | None:
+    """
+    ยกเลิกการจองด้วยเลขตั๋ว (แบบเดียวกับปุ่มยกเลิกใน Admin Console ผ่าน apply_booking_status)
+    คืน (booking_id, วันที่เดินทาง) หรือ None ถ้าไม่พบ/ยกเลิกไปแล้ว
+    """
+    with closing(db_connect_booking()) as con:
+        cur = con.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            row = cur.execute("SELECT id FROM adm.bookings WHERE ticket_no = ? AND status <> ? ORDER BY id LIMIT 1",
+                              (ticket_no, STATUS_CANCELLED)).fetchone()
+            if row is None:
+                con.rollback()
+                return None
+            _, travel_date = apply_booking_status(cur, row[0], STATUS_CANCELLED)
+            con.commit()
+            return row[0], travel_date
+        except Exception:
+            con.rollback()
+            raise
+
+def lookup_booking(ticket_no: str) -> dict | None:
+    """สรุปการจองจาก adm.bookings + ที่นั่ง (booking_seats) หรือ None ถ้าไม่พบ"""
+    with closing(db_connect_admin()) as con:
+        cur = con.execute("""
+            SELECT id, ticket_no, customer_name, route_from, route_to, date, status,
+                   phone, email, seat_count, price, vat, dep_time, arr_time
+            FROM bookings WHERE ticket_no = ?
+        """, (ticket_no,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        booking = dict(zip([c[0] for c in cur.description], row))
+        booking["seats"] = [r[0] for r in con.execute(
+            "SELECT seat_code FROM booking_seats WHERE booking_id = ? ORDER BY seat_code", (booking["id"],))]
+        return booking
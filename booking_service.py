@@ -0,0 +1,348 @@
+# booking_service.py — Go with CREPE
+# API HTTP/JSON ในเครื่อง ให้หลายเคาน์เตอร์/ตู้ขายตั๋วใช้ที่เก็บการจองชุดเดียวกัน (asyncio + booking_core ไม่ใช้ Qt)
+#   python booking_service.py [--host 127.0.0.1] [--port 8765] [--user-db dataelee/passenger_bookings.db] [--admin-db users.db]
+#
+#   GET  /routes                                   ปลายทาง ราคา เวลาออก ความจุ/แบบรถ
+#   GET  /availability?dest=&date=d1,d2[&session=] ที่นั่งเหลือทุกเที่ยวในวันที่ระบุ (query เดียว)
+#   GET  /availability?dest=&date=&dep_time=       ผังที่นั่งของเที่ยว + ที่นั่งไม่ว่าง
+#   POST /hold    {date, dest, dep_time, seat, session[, release: true]}
+#   POST /book    {date, dest, dep_time, seats, session, first_name, last_name, phone, citizen_id, email[, arr_time]}
+#   POST /cancel  {ticket_no}
+#   GET  /lookup?ticket_no=
+#
+# งานเขียน (hold / book / cancel / ล้างล็อกหมดอายุ) เข้าคิวเดียว ทำทีละงานบน thread เขียนตัวเดียว
+# -> ไม่มีลูกค้าคู่ไหนแย่งล็อก SQLite กันเอง (ไม่มี busy-wait) และไม่มีทางจองที่นั่งซ้ำ
+# งานอ่านทำพร้อมกันบน thread pool (ไฟล์การจองใช้ rollback journal: ตอน commit อ่านรอได้ไม่เกิน busy timeout)
+# ROUTE_CATALOG ใช้ thread ของตัวเอง 1 ตัว (data_version นับต่อ connection = ต่อ thread ถ้าสลับ thread จะโหลดใหม่ทุกครั้ง)
+# จอง/ยกเลิกสำเร็จ -> แจ้ง booking_created / booking_status เข้า eventbus ของหน้าจอที่เปิดอยู่ (ผ่าน socket ตรง ไม่ใช้ Qt)
+
+import os, sys, json, socket, getpass, asyncio, argparse, datetime, sqlite3, tempfile, traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import booking_core
+import migrations
+
+READ_WORKERS  = 4
+WRITE_BATCH   = 64          # งานเขียนที่ทำต่อกันในการส่งไป thread เขียน 1 ครั้ง
+MAX_BODY      = 64 * 1024
+HOLD_SWEEP_S  = 30          # รอบล้างล็อกที่นั่งที่หมดอายุ
+
+# ชื่อ/ไฟล์ที่อยู่เดียวกับ eventbus.BUS_NAME / eventbus.address_file() (eventbus import PyQt6 จึงใช้ตรง ๆ ไม่ได้)
+BUS_NAME         = os.environ.get("CREPE_EVENT_BUS", f"gowithcrepe-events-{getpass.getuser()}")
+BUS_ADDRESS_FILE = os.path.join(tempfile.gettempdir(), f"{BUS_NAME}.address")
+BUS_TIMEOUT_S    = 0.2
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str, **extra):
+        super().__init__(message)
+        self.status, self.extra = status, extra
+
+def _need(d: dict, *keys) -> list:
+    missing = [k for k in keys if d.get(k) in (None, "", [])]
+    if missing:
+        raise ApiError(400, f"missing: {', '.join(missing)}")
+    return [d[k] for k in keys]
+
+def _text(d: dict, *keys) -> list[str]:
+    """ค่าที่ต้องเป็นข้อความไม่ว่าง (ชนิดอื่นตอบ 400 ไม่ปล่อยให้ไปพังใน booking_core)"""
+    values = _need(d, *keys)
+    bad = [k for k, v in zip(keys, values) if not isinstance(v, str) or not v.strip()]
+    if bad:
+        raise ApiError(400, f"must be non-empty text: {', '.join(bad)}")
+    return [v.strip() for v in values]
+
+def _opt_text(d: dict, key: str, default: str | None, allow_empty: bool = True) -> str | None:
+    """ค่าข้อความที่ไม่บังคับ (ไม่ส่ง/null = default)"""
+    v = d.get(key)
+    if v is None:
+        return default
+    if not isinstance(v, str) or not (allow_empty or v.strip()):
+        raise ApiError(400, f"must be {'text' if allow_empty else 'non-empty text'}: {key}")
+    return v.strip()
+
+def _date(s: str) -> str:
+    try:
+        return datetime.date.fromisoformat(s).isoformat()
+    except (TypeError, ValueError):
+        raise ApiError(400, f"bad date: {s!r} (yyyy-MM-dd)")
+
+def notify(kind: str, **data) -> bool:
+    """
+    ส่ง event 1 บรรทัดแบบเดียวกับ eventbus.publish ไปที่ hub แล้วปิด connection (hub ส่งต่อให้ทุกหน้าจอเอง)
+    ที่อยู่ของ hub อ่านจาก BUS_ADDRESS_FILE ที่ hub เขียนไว้ — ไม่มีไฟล์ (ไม่มีหน้าจอเปิดอยู่) = ไม่ส่ง คืน False
+    มีไฟล์แต่ส่งไม่ได้ = แจ้ง WARNING (หน้าจอที่เปิดอยู่จะไม่เห็นการจองนี้จนกว่าจะโหลดใหม่)
+    """
+    raw = (json.dumps({"type": kind, **data}, ensure_ascii=False) + "\n").encode("utf-8")
+    try:
+        with open(BUS_ADDRESS_FILE, encoding="utf-8") as f:
+            path = f.read().strip()
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        print(f"WARNING: cannot read event bus address {BUS_ADDRESS_FILE}: {e}")
+        return False
+    try:
+        if sys.platform == "win32":
+            with open(path, "wb", buffering=0) as pipe:
+                pipe.write(raw)
+        else:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.settimeout(BUS_TIMEOUT_S)
+                s.connect(path)
+                s.sendall(raw)
+        return True
+    except OSError as e:
+        print(f"WARNING: event bus hub {path} unreachable, {kind} not delivered: {e}")
+        return False
+
+def _departures(dest: str) -> list[tuple[str, int]]:
+    """[(เวลาออก, ความจุ)] ของปลายทาง"""
+    info = booking_core.ROUTE_CATALOG.info(dest)
+    return [(dep, len(booking_core.trip_seat_codes(dest, dep))) for dep in info.get("arrivals", booking_core.DEFAULT_ARRIVAL)]
+
+class BookingService:
+    def __init__(self):
+        self._reader = ThreadPoolExecutor(READ_WORKERS, thread_name_prefix="booking-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="booking-write")
+        self._catalog = ThreadPoolExecutor(1, thread_name_prefix="booking-catalog")
+        self._notify = ThreadPoolExecutor(1, thread_name_prefix="booking-notify")   # ส่งตามลำดับ ไม่ให้คำขอต้องรอ
+        self._writes = None     # asyncio.Queue ของ (fn, args, future) — สร้างใน loop ตอน serve()
+        self.routes = {
+            ("GET", "/routes"):       self.get_routes,
+            ("GET", "/availability"): self.get_availability,
+            ("POST", "/hold"):        self.post_hold,
+            ("POST", "/book"):        self.post_book,
+            ("POST", "/cancel"):      self.post_cancel,
+            ("GET", "/lookup"):       self.get_lookup,
+        }
+
+    # ---------- อ่าน / เขียน ----------
+    async def read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._reader, fn, *args)
+
+    async def catalog(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._catalog, fn, *args)
+
+    def publish(self, kind: str, **data):
+        asyncio.get_running_loop().run_in_executor(self._notify, lambda: notify(kind, **data))
+
+    async def write(self, fn, *args):
+        fut = asyncio.get_running_loop().create_future()
+        await self._writes.put((fn, args, fut))
+        return await fut
+
+    @staticmethod
+    def _run_batch(jobs):
+        """รันบน thread เขียนตัวเดียว: ทีละงาน ตามลำดับที่เข้าคิว (แต่ละงานมี transaction ของตัวเอง)"""
+        out = []
+        for fn, args, _ in jobs:
+            try:
+                out.append((True, fn(*args)))
+            except Exception as e:
+                out.append((False, e))
+        return out
+
+    async def _writer_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._writes.get()]
+            while len(jobs) < WRITE_BATCH and not self._writes.empty():
+                jobs.append(self._writes.get_nowait())
+            for (_, _, fut), (ok, res) in zip(jobs, await loop.run_in_executor(self._writer, self._run_batch, jobs)):
+                if fut.done():
+                    continue
+                if ok: fut.set_result(res)
+                else: fut.set_exception(res)
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(HOLD_SWEEP_S)
+            try:
+                await self.write(booking_core.purge_expired_holds)
+            except sqlite3.Error as e:
+                print(f"Seat hold sweep error: {e}")
+
+    # ---------- endpoints ----------
+    async def get_routes(self, q, body):
+        def load():
+            out = []
+            for dest, info in booking_core.ROUTE_CATALOG.routes().items():
+                if dest == "ขอนแก่น":
+                    continue
+                out.append({"dest": dest, "price": info.get("price", booking_core.DEFAULT_PRICE),
+                            "departures": [{"dep_time": dep, "capacity": cap} for dep, cap in _departures(dest)]})
+            return out
+        return 200, {"routes": await self.catalog(load)}
+
+    async def get_availability(self, q, body):
+        dest, dates = _need(q, "dest", "date")
+        dates = [_date(d) for d in dates.split(",")]
+        session, dep_time = q.get("session"), q.get("dep_time")
+        if dep_time:
+            seats = await self.catalog(booking_core.trip_seat_codes, dest, dep_time)
+            taken = await self.read(booking_core.get_booked_seats, dates[0], dep_time, dest, session) & set(seats)
+            return 200, {"date": dates[0], "dest": dest, "dep_time": dep_time, "seats": seats,
+                         "taken": sorted(taken), "remaining": len(seats) - len(taken)}
+        departures = await self.catalog(_departures, dest)
+        taken = await self.read(booking_core.get_taken_counts, dates, dest, session)
+        return 200, {"dest": dest, "trips": [
+            {"date": d, "dep_time": dep, "capacity": cap, "remaining": max(0, cap - taken.get((d, dep), 0))}
+            for d in dates for dep, cap in departures]}
+
+    async def post_hold(self, q, body):
+        date, dest, dep_time, seat, session = _text(body, "date", "dest", "dep_time", "seat", "session")
+        date = _date(date)
+        if body.get("release"):
+            await self.write(booking_core.release_seat, date, dep_time, dest, seat, session)
+            return 200, {"ok": True}
+        if seat not in await self.catalog(booking_core.trip_seat_codes, dest, dep_time):
+            raise ApiError(400, f"no seat {seat} on this trip")
+        if not await self.write(booking_core.hold_seat, date, dep_time, dest, seat, session):
+            raise ApiError(409, f"seat {seat} is taken", seat=seat)
+        return 200, {"ok": True, "expires_in": booking_core.SEAT_HOLD_SECONDS}
+
+    async def post_book(self, q, body):
+        date, dest, dep_time = _text(body, "date", "dest", "dep_time")
+        first, last, phone, cid, email = _text(body, "first_name", "last_name", "phone", "citizen_id", "email")
+        (seats,) = _need(body, "seats")
+        if not isinstance(seats, list) or not all(isinstance(s, str) for s in seats):
+            raise ApiError(400, "seats must be a list of seat codes")
+        origin = _opt_text(body, "origin", "ขอนแก่น", allow_empty=False)
+        arr_time = _opt_text(body, "arr_time", "")
+        session = _opt_text(body, "session", None)
+        layout = set(await self.catalog(booking_core.trip_seat_codes, dest, dep_time))
+        bad = [s for s in seats if s not in layout]
+        if bad:
+            raise ApiError(400, f"no seat {', '.join(bad)} on this trip")
+        # ราคาจาก catalog เสมอ (ไม่เชื่อราคาที่ไคลเอนต์ส่งมา)
+        price = (await self.catalog(booking_core.ROUTE_CATALOG.info, dest)).get("price", booking_core.DEFAULT_PRICE)
+        data = {"first_name": first, "last_name": last, "phone": phone, "citizen_id": cid, "email": email,
+                "date": _date(date), "origin": origin, "dest": dest, "dep_time": dep_time,
+                "arr_time": arr_time, "price_each": price}
+        booking_id, ticket_no, conflicts = await self.write(
+            booking_core.save_new_booking, data, seats, booking_core.new_ticket_no(), session)
+        if conflicts:
+            raise ApiError(409, "seats already taken", conflicts=conflicts)
+        self.publish("booking_created", booking_id=booking_id, date=data["date"],
+                     route_from=origin.split()[0], route_to=dest, dep_time=dep_time)
+        subtotal, vat, total = booking_core.price_breakdown(price, len(set(seats)))
+        return 201, {"booking_id": booking_id, "ticket_no": ticket_no, "subtotal": subtotal, "vat": vat, "total": total}
+
+    async def post_cancel(self, q, body):
+        (ticket_no,) = _need(body, "ticket_no")
+        if isinstance(ticket_no, bool) or not isinstance(ticket_no, (str, int)):
+            raise ApiError(400, "ticket_no must be text")
+        ticket_no = str(ticket_no).strip()
+        res = await self.write(booking_core.cancel_booking, ticket_no)
+        if res is None:
+            raise ApiError(404, f"no active booking {ticket_no}")
+        self.publish("booking_status", booking_id=res[0], date=res[1], status=booking_core.STATUS_CANCELLED)
+        return 200, {"ok": True, "booking_id": res[0], "date": res[1]}
+
+    async def get_lookup(self, q, body):
+        (ticket_no,) = _need(q, "ticket_no")
+        booking = await self.read(booking_core.lookup_booking, ticket_no)
+        if booking is None:
+            raise ApiError(404, f"no booking {ticket_no}")
+        return 200, booking
+
+    # ---------- HTTP ----------
+    async def _dispatch(self, method: str, target: str, raw: bytes):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            known = any(path == url.path for _, path in self.routes)
+            return (405, {"error": "method not allowed"}) if known else (404, {"error": "not found"})
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                raise ApiError(400, "body must be a JSON object")
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            return await handler(query, body)
+        except ApiError as e:
+            return e.status, {"error": str(e), **e.extra}
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"bad JSON: {e}"}
+        except sqlite3.Error as e:
+            return 500, {"error": f"database error: {e}"}
+        except Exception as e:
+            # บั๊กที่ไม่ได้คาดไว้: ยังตอบ 500 ให้ไคลเอนต์ (ไม่ตัด connection ทิ้งเงียบ ๆ) และเก็บ traceback ไว้ใน log
+            print(f"ERROR: {method} {url.path} failed: {e!r}")
+            traceback.print_exc()
+            return 500, {"error": f"internal error: {type(e).__name__}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP/1.1 แบบ keep-alive: 1 connection ส่งได้หลายคำขอต่อกัน"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, _ = line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": "body too large"}
+                    keep = False
+                else:
+                    status, payload = await self._dispatch(method, target, await reader.readexactly(length))
+                    keep = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                              f"Content-Type: application/json; charset=utf-8\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready=None):
+        self._writes = asyncio.Queue()
+        tasks = [asyncio.create_task(self._writer_loop()), asyncio.create_task(self._sweep_loop())]
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"INFO: booking service on http://{host}:{server.sockets[0].getsockname()[1]}")
+        if ready:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for t in tasks:
+                t.cancel()
+
+def main():
+    ap = argparse.ArgumentParser(description="Go with CREPE booking API (HTTP/JSON)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--user-db", default=os.path.join("dataelee", "passenger_bookings.db"))
+    ap.add_argument("--admin-db", default="users.db")
+    args = ap.parse_args()
+
+    booking_core.configure(args.user_db, args.admin_db)
+    migrations.migrate(args.user_db, migrations.PASSENGER_MIGRATIONS)
+    migrations.migrate(args.admin_db, migrations.ADMIN_MIGRATIONS)
+    migrations.apply_ticket_renumbering(args.user_db, args.admin_db)
+    try:
+        asyncio.run(BookingService().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
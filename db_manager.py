@@ -0,0 +1,107 @@
+# db_manager.py — Go with CREPE
+# ตัวจัดการการเชื่อมต่อ SQLite ที่ใช้ร่วมกันระหว่าง home.py / admin.py / login.py
+# - เปิด connection ครั้งเดียวต่อ (thread, ไฟล์ DB) แล้วใช้ซ้ำตลอดอายุโปรแกรม
+# - ตั้งค่า WAL / synchronous / busy timeout / mmap / statement cache จาก DB_SETTINGS
+# - ไฟล์ที่ ATTACH เขียนร่วมกันใน transaction เดียว (ATTACHED_FILES) ใช้ rollback journal แทน WAL
+
+import os, sqlite3, threading, atexit
+
+# ---------- การตั้งค่า (แก้ได้ที่นี่ หรือผ่าน environment variable) ----------
+DB_SETTINGS = {
+    "journal_mode":      os.environ.get("CREPE_DB_JOURNAL_MODE", "WAL"),
+    "synchronous":       os.environ.get("CREPE_DB_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout_ms":   int(os.environ.get("CREPE_DB_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size":         int(os.environ.get("CREPE_DB_MMAP_SIZE", str(64 * 1024 * 1024))),
+    "cached_statements": int(os.environ.get("CREPE_DB_CACHED_STATEMENTS", "256")),
+}
+
+# ไฟล์ (ชื่อไฟล์) ที่ booking_core / admin เขียนพร้อมกันผ่าน ATTACH ใน transaction เดียว
+# ใน WAL mode การ commit ข้ามไฟล์เป็น atomic แยกรายไฟล์ (crash กลางทางแล้วสองไฟล์ไม่ตรงกัน)
+# จึงใช้ rollback journal (มี super-journal ครอบทั้งสองไฟล์) — journal_mode เป็นค่าของไฟล์
+# ทุก connection ของไฟล์เหล่านี้ต้องใช้โหมดเดียวกัน ไม่ใช่แค่ connection ที่ ATTACH
+ATTACHED_FILES = {"passenger_bookings.db", "users.db"}
+ATTACHED_JOURNAL_MODE = os.environ.get("CREPE_DB_ATTACHED_JOURNAL_MODE", "DELETE")
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection ที่ใช้ร่วมกันภายใน thread เดียว
+    close() จะไม่ปิดจริง แค่ rollback งานที่ค้างอยู่ (เหมือนพฤติกรรมของการปิด connection)
+    """
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def _close_for_real(self):
+        sqlite3.Connection.close(self)
+
+_local = threading.local()
+_all_conns = []
+_all_lock = threading.Lock()
+
+def journal_mode_for(path: str) -> str:
+    """journal_mode ของไฟล์ path (ไฟล์ใน ATTACHED_FILES ใช้ ATTACHED_JOURNAL_MODE)"""
+    if os.path.basename(path) in ATTACHED_FILES:
+        return ATTACHED_JOURNAL_MODE
+    return DB_SETTINGS["journal_mode"]
+
+def _apply_pragmas(con, path: str, schema="main"):
+    s = DB_SETTINGS
+    con.execute(f"PRAGMA {schema}.journal_mode={journal_mode_for(path)}")
+    con.execute(f"PRAGMA {schema}.synchronous={s['synchronous']}")
+    con.execute(f"PRAGMA {schema}.mmap_size={int(s['mmap_size'])}")
+
+def _open(path: str) -> PooledConnection:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    con = sqlite3.connect(
+        path,
+        timeout=DB_SETTINGS["busy_timeout_ms"] / 1000,
+        cached_statements=DB_SETTINGS["cached_statements"],
+        factory=PooledConnection,
+    )
+    con.execute(f"PRAGMA busy_timeout={int(DB_SETTINGS['busy_timeout_ms'])}")
+    _apply_pragmas(con, path)
+    with _all_lock:
+        _all_conns.append(con)
+    return con
+
+def _ensure_attached(con, attach: dict):
+    attached = {name: file for _, name, file in con.execute("PRAGMA database_list")}
+    for alias, path in attach.items():
+        want = os.path.abspath(path)
+        if alias in attached:
+            if os.path.abspath(attached[alias] or "") == want:
+                continue
+            con.execute(f"DETACH DATABASE {alias}")
+        con.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+        _apply_pragmas(con, path, alias)
+
+def connect(path: str, attach: dict | None = None) -> sqlite3.Connection:
+    """
+    คืน connection ที่เปิดค้างไว้ของ thread ปัจจุบันสำหรับไฟล์ path (เปิดใหม่ถ้ายังไม่มี)
+    attach = {"alias": "ไฟล์.db"} จะ ATTACH ให้ (ครั้งเดียว) ก่อนคืนค่า
+    """
+    key = (os.path.abspath(path), tuple(sorted((attach or {}).items())))
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    con = conns.get(key)
+    if con is None:
+        con = conns[key] = _open(path)
+    if attach:
+        _ensure_attached(con, attach)
+    return con
+
+def close_all():
+    """ปิด connection ทั้งหมดจริง ๆ (เรียกตอนจบโปรแกรม)"""
+    with _all_lock:
+        conns, _all_conns[:] = list(_all_conns), []
+    for con in conns:
+        try:
+            con._close_for_real()
+        except sqlite3.Error:
+            pass
+    _local.__dict__.pop("conns", None)
+
+atexit.register(close_all)
@@ -0,0 +1,162 @@
+# eventbus.py — Go with CREPE
+# ช่องทาง publish/subscribe ภายในเครื่อง (QLocalServer / QLocalSocket) ระหว่าง home.py กับ admin.py
+# - โปรเซสแรกที่เปิดเป็น hub, โปรเซสถัดไปเชื่อมต่อเป็น client
+# - event เป็น JSON 1 บรรทัด: {"type": "...", ...ข้อมูล}
+# - hub เขียนที่อยู่จริงของ socket (fullServerName) ไว้ที่ address_file() ให้ booking_service (ไม่ใช้ Qt) ส่ง event เข้ามาได้
+#
+# ชนิด event ที่ใช้ในโปรแกรม
+#   booking_created  booking_id, date, route_from, route_to, dep_time
+#   booking_status   booking_id, date, status
+#   bookings_deleted route_from, route_to
+#   routes_changed   route_from, route_to
+
+import os, json, getpass, tempfile
+from PyQt6.QtCore import QObject, QTimer, QCoreApplication, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+BUS_NAME           = os.environ.get("CREPE_EVENT_BUS", f"gowithcrepe-events-{getpass.getuser()}")
+CONNECT_TIMEOUT_MS = 200    # รอเชื่อมต่อ hub ตอนเริ่ม
+RECONNECT_MS       = 500    # hub ปิดไป -> ลองเชื่อมต่อ/ขึ้นเป็น hub ใหม่หลังจากนี้
+
+def address_file(name: str = BUS_NAME) -> str:
+    """ไฟล์ที่ hub ชื่อ name เขียนที่อยู่จริงไว้ (มีไฟล์ = มี hub เปิดอยู่)"""
+    return os.path.join(tempfile.gettempdir(), f"{name}.address")
+
+class EventBus(QObject):
+    """
+    hub ส่งต่อทุก event ให้ client ทุกตัว (ยกเว้นผู้ส่ง) และส่งเข้า signal ของตัวเอง
+    ถ้า hub ปิดไป client จะเชื่อมต่อใหม่ หรือขึ้นเป็น hub แทน
+    """
+    received = pyqtSignal(str, dict)   # (ชนิด event, ข้อมูล)
+
+    def __init__(self, name: str = BUS_NAME, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self._server = None     # มีค่าเมื่อโปรเซสนี้เป็น hub
+        self._socket = None     # มีค่าเมื่อโปรเซสนี้เป็น client
+        self._clients = []
+        self._buffers = {}
+        self._start()
+
+    @property
+    def is_hub(self) -> bool:
+        return self._server is not None
+
+    # ---------- การเชื่อมต่อ ----------
+    def _try_connect(self) -> bool:
+        sock = QLocalSocket(self)
+        sock.connectToServer(self.name)
+        if not sock.waitForConnected(CONNECT_TIMEOUT_MS):
+            sock.deleteLater()
+            return False
+        self._socket = sock
+        self._buffers[sock] = b""
+        sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+        sock.disconnected.connect(self._on_hub_lost)
+        return True
+
+    def _start(self):
+        if self._try_connect():
+            return
+        server = QLocalServer(self)
+        server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        if not server.listen(self.name):
+            # อาจมีอีกโปรเซสเพิ่งขึ้นเป็น hub พร้อมกัน ลองต่ออีกครั้งก่อนล้าง socket ที่ค้าง
+            if self._try_connect():
+                server.deleteLater(); return
+            QLocalServer.removeServer(self.name)
+            if not server.listen(self.name):
+                print(f"WARNING: event bus unavailable ({server.errorString()})")
+                server.deleteLater()
+                QTimer.singleShot(RECONNECT_MS, self._start)
+                return
+        server.newConnection.connect(self._on_new_connection)
+        self._server = server
+        self._write_address(server.fullServerName())
+
+    def _write_address(self, address: str):
+        path = address_file(self.name)
+        try:
+            with open(f"{path}.{os.getpid()}", "w", encoding="utf-8") as f:
+                f.write(address)
+            os.replace(f"{path}.{os.getpid()}", path)
+        except OSError as e:
+            print(f"WARNING: could not write event bus address ({e})")
+            return
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._remove_address)
+
+    def _remove_address(self):
+        try:
+            os.remove(address_file(self.name))
+        except OSError:
+            pass
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            self._clients.append(sock)
+            self._buffers[sock] = b""
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_client_gone(s))
+
+    def _on_client_gone(self, sock):
+        if sock in self._clients:
+            self._clients.remove(sock)
+        self._buffers.pop(sock, None)
+        sock.deleteLater()
+
+    def _on_hub_lost(self):
+        sock, self._socket = self._socket, None
+        if sock is not None:
+            self._buffers.pop(sock, None)
+            sock.deleteLater()
+        QTimer.singleShot(RECONNECT_MS, self._start)
+
+    # ---------- รับ/ส่ง ----------
+    def _on_ready_read(self, sock):
+        data = self._buffers.get(sock, b"") + bytes(sock.readAll())
+        *lines, self._buffers[sock] = data.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            if self.is_hub:
+                self._broadcast(line + b"\n", skip=sock)
+            try:
+                msg = json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+            self.received.emit(str(msg.pop("type", "")), msg)
+
+    def _broadcast(self, raw: bytes, skip=None):
+        for c in self._clients:
+            if c is not skip:
+                c.write(raw)
+
+    def publish(self, kind: str, **data):
+        raw = (json.dumps({"type": kind, **data}, ensure_ascii=False) + "\n").encode("utf-8")
+        if self.is_hub:
+            self._broadcast(raw)
+        elif self._socket is not None:
+            self._socket.write(raw)
+        self.received.emit(kind, data)   # ผู้รับในโปรเซสเดียวกัน
+
+_bus = None
+
+def bus() -> EventBus:
+    """EventBus ของโปรเซสนี้ (สร้างเมื่อเรียกครั้งแรก ต้องมี QApplication แล้ว)"""
+    global _bus
+    if _bus is None:
+        _bus = EventBus(parent=QCoreApplication.instance())
+    return _bus
+
+def publish(kind: str, **data):
+    """ส่ง event (ไม่มี QApplication เช่นเรียกจากสคริปต์ = ไม่ทำอะไร)"""
+    if QCoreApplication.instance() is None:
+        return
+    bus().publish(kind, **data)
+
+def subscribe(callback):
+    """callback(kind: str, data: dict) ถูกเรียกทุกครั้งที่มี event"""
+    bus().received.connect(callback)
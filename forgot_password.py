@@ -1,8 +1,9 @@
 # forgot_password.py — Go with CREPE (PyQt6)
 # Forgot Password page: Username + Email validators, pill inputs, NEXT button
 import os, sys
+import assets
 from PyQt6.QtCore import Qt, QRegularExpression
-from PyQt6.QtGui import QFontDatabase, QFont, QPixmap, QRegularExpressionValidator
+from PyQt6.QtGui import QFont, QRegularExpressionValidator
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QLineEdit, QMessageBox,
     QHBoxLayout, QVBoxLayout, QFrame
@@ -10,18 +11,6 @@ from PyQt6.QtWidgets import (
 
 # ---------- PATHS (แก้ตามเครื่อง) ----------
 BUS_IMG   = r"C:\Users\LOQ\OneDrive - Khon Kaen University\Desktop\project python\picture\forgot.png"
-RUBIK_REG = r"C:\Users\LOQ\OneDrive - Khon Kaen University\Desktop\project python\font\Rubik-Regular.ttf"
-RUBIK_BOLD= r"C:\Users\LOQ\OneDrive - Khon Kaen University\Desktop\project python\font\Rubik-Bold.ttf"
-
-def load_rubik():
-    fam = None
-    if os.path.exists(RUBIK_REG):
-        fid = QFontDatabase.addApplicationFont(RUBIK_REG)
-        fs  = QFontDatabase.applicationFontFamilies(fid)
-        if fs: fam = fs[0]
-    if os.path.exists(RUBIK_BOLD):
-        QFontDatabase.addApplicationFont(RUBIK_BOLD)
-    return fam or "Rubik"
 
 def make_pill_lineedit(ph: str) -> QLineEdit:
     le = QLineEdit(); le.setPlaceholderText(ph)
@@ -42,7 +31,7 @@ def make_pill_lineedit(ph: str) -> QLineEdit:
 class ForgotWindow(QWidget):
     def __init__(self):
         super().__init__()
-        self.family = load_rubik()
+        self.family = assets.load_fonts()
         self.setWindowTitle("Go with CREPE — Forgot Password")
         self.resize(1366, 768)
         self.setFont(QFont(self.family, 11))
@@ -53,7 +42,7 @@ class ForgotWindow(QWidget):
         self.left = QFrame(); self.left.setStyleSheet("background:#f8f5ef;")
         lbox = QVBoxLayout(self.left); lbox.setContentsMargins(0,0,0,0)
         self.bus_lbl = QLabel(alignment=Qt.AlignmentFlag.AlignCenter)
-        self.bus_pix = QPixmap(BUS_IMG) if os.path.exists(BUS_IMG) else QPixmap()
+        self.bus_pix = assets.pixmap(BUS_IMG)
         lbox.addWidget(self.bus_lbl)
         root.addWidget(self.left, 3)
 
@@ -127,10 +116,7 @@ class ForgotWindow(QWidget):
         # ใช้ความกว้างจริงของ panel ซ้าย เพื่อสเกลภาพให้พอดี (contain)
         w = max(1, self.left.width())
         h = max(1, self.height())
-        self.bus_lbl.setPixmap(self.bus_pix.scaled(
-            w, h, Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        ))
+        self.bus_lbl.setPixmap(assets.pixmap(BUS_IMG, w, h, disk=False))
 
     def do_next(self):
         u = self.user.text().strip()
@@ -1,15 +1,19 @@
-import os, sys, re, random, sqlite3
-import json
-from contextlib import closing
-from PyQt6.QtCore import Qt, QDate, QLocale, QMarginsF, QRectF, QLineF, QUrl, QSize
+import os, sys, re, sqlite3, uuid
+import startup_trace   # ก่อน PyQt6 เพื่อให้ --profile-startup นับเวลา import ด้วย
+import assets
+import migrations
+import eventbus
+import seat_layout
+import booking_core
+import ticket_pdf
+from PyQt6.QtCore import Qt, QDate, QLocale, QUrl, QSize, QTimer, QThreadPool
 from PyQt6.QtGui import (
-    QFontDatabase, QFont, QPixmap, QPainter, QColor,
-    QPageSize, QPageLayout, QPdfWriter, QPen, QPainterPath, QIcon, QDesktopServices
+    QFont, QPixmap, QPainter, QColor, QPainterPath, QIcon, QDesktopServices
 )
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QComboBox, QDateEdit,
     QHBoxLayout, QVBoxLayout, QGridLayout, QFrame, QMessageBox, QSizePolicy,
-    QStackedWidget, QLineEdit, QSpacerItem, QFileDialog
+    QStackedWidget, QLineEdit, QFileDialog, QScrollArea
 )
 
 # ---------- CLI context ----------
@@ -27,9 +31,6 @@ CURRENT_USER = _get_arg("--user", "guest")
 # ⚠️ ตรวจสอบพาธ 4 ตำแหน่งนี้ให้ถูกต้องตามเครื่องของคุณ!
 LOGO_IMG    = r"picture\logo.png"
 QR_IMG      = r"picture\QR.png"
-RUBIK_REG   = r"font\Rubik-Regular.ttf"
-RUBIK_BOLD  = r"font\Rubik-Bold.ttf"
-FC_MINIMAL  = r"font\FC Minimal.ttf"
 # ******************************************************************************
 
 PROFILE_DIR  = os.path.join(os.path.expanduser("passenger_bookings"))
@@ -42,258 +43,46 @@ DB_USER_PATH = os.path.join(DB_DIR, "passenger_bookings.db")
 # DB ของ ADMIN (ต้องชี้ไปที่เดียวกันกับที่ Admin.py ใช้)
 DB_ADMIN_PATH = "users.db"
 
-def db_connect_user():
-    """เชื่อมต่อฐานข้อมูลผู้ใช้งาน (passenger_bookings.db)"""
-    os.makedirs(DB_DIR, exist_ok=True)
-    return sqlite3.connect(DB_USER_PATH)
-
-def _db_connect_admin():
-    # สร้างไฟล์ Admin DB ชั่วคราวหากไม่มี (เพื่อไม่ให้โค้ดส่วนนี้ Error)
-    if not os.path.exists(DB_ADMIN_PATH):
-          con = sqlite3.connect(DB_ADMIN_PATH)
-          con.execute("""
-            CREATE TABLE IF NOT EXISTS bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ticket_no TEXT, customer_name TEXT, route_from TEXT, route_to TEXT, date TEXT, status TEXT,
-                phone TEXT, email TEXT, seat TEXT, price REAL, vat REAL, slip_path TEXT, dep_time TEXT, arr_time TEXT
-            );
-          """)
-          con.commit()
-          return con
-    return sqlite3.connect(DB_ADMIN_PATH)
-
-def _check_and_add_column(con, table_name, column_name, column_type):
-    """ฟังก์ชันช่วยเหลือ: ตรวจสอบว่าคอลัมน์มีอยู่แล้วหรือไม่ หากไม่มีให้เพิ่มเข้าไป (Migration)"""
-    try:
-        cur = con.cursor()
-        # ตรวจสอบว่าคอลัมน์มีอยู่ในตารางหรือไม่
-        cur.execute(f"PRAGMA table_info({table_name})")
-        columns = [info[1] for info in cur.fetchall()]
-        
-        if column_name not in columns:
-            # เพิ่มคอลัมน์หากยังไม่มี
-            cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
-            print(f"INFO: Added column {column_name} to table {table_name}")
-            con.commit()
-            return True
-        return False
-    except sqlite3.OperationalError as e:
-        # อาจเกิดข้อผิดพลาดหากตารางไม่มีอยู่
-        print(f"WARNING: Could not check/add column {column_name}. Error: {e}")
-        return False
+# รอบการเก็บกวาดล็อกที่นั่งที่หมดอายุ (อายุล็อกอยู่ที่ booking_core.SEAT_HOLD_SECONDS)
+HOLD_SWEEP_MS     = 30 * 1000
 
 def init_db():
-    """สร้างตารางรวมสำหรับเก็บข้อมูลการจองและที่นั่ง (และอัปเดตโครงสร้างเดิม)"""
+    """รัน migration ของ passenger_bookings.db และ users.db (ครั้งเดียวตอนเริ่มโปรแกรม — ไฟล์ที่ล่าสุดแล้วจะข้ามทันที)"""
+    booking_core.configure(DB_USER_PATH, DB_ADMIN_PATH)
     try:
-        with db_connect_user() as con:
-            cur = con.cursor()
-            # 1. สร้างตาราง passenger_bookings หากยังไม่มี
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS passenger_bookings (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                
-                first_name      TEXT NOT NULL,
-                last_name       TEXT NOT NULL,
-                phone           TEXT NOT NULL,
-                citizen_id      TEXT NOT NULL,
-                email           TEXT,
-                
-                travel_date     TEXT NOT NULL,
-                trip_info_json  TEXT NOT NULL,
-                seat_code       TEXT NOT NULL,
-                is_booked       INTEGER DEFAULT 1,
-                ticket_no       TEXT,              
-                
-                created_at      TEXT DEFAULT CURRENT_TIMESTAMP,
-                
-                UNIQUE(travel_date, trip_info_json, seat_code)
-            );
-            """)
-            con.commit()
-
-            # 2. Migration: เพิ่มคอลัมน์ที่จำเป็นหากมาจาก DB เวอร์ชันเก่า
-            _check_and_add_column(con, "passenger_bookings", "ticket_no", "TEXT")
-
-            # 3. สร้างตาราง route_info (หากยังไม่ได้รันสคริปต์ import_routes.py มาก่อน)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS route_info (
-                    province_th TEXT PRIMARY KEY,
-                    price INTEGER NOT NULL,
-                    arrivals_json TEXT NOT NULL
-                );
-            """)
-            con.commit()
-
+        migrations.migrate(DB_USER_PATH, migrations.PASSENGER_MIGRATIONS)
+        # users.db มีตาราง bookings ที่ใช้ร่วมกันใน booking_core.db_connect_booking + เวอร์ชันของตาราง routes
+        migrations.migrate(DB_ADMIN_PATH, migrations.ADMIN_MIGRATIONS)
+        migrations.apply_ticket_renumbering(DB_USER_PATH, DB_ADMIN_PATH)
     except sqlite3.OperationalError as e:
         print(f"Error during DB initialization: {e}")
 
-# ---------- Route DB Function (NEW) ----------
+# ---------- การจอง (ตรรกะอยู่ใน booking_core — ตรงนี้แปลง QDate เป็น yyyy-MM-dd) ----------
 
-def get_routes_from_admin_db() -> dict:
-    """🌟 ดึงข้อมูลเส้นทางจากตาราง ROUTES ใน USERS.DB (ที่ Admin Console บันทึก) 🌟"""
-    route_map = {}
-    try:
-        with closing(_db_connect_admin()) as conn, closing(conn.cursor()) as cur:
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='routes';")
-            if not cur.fetchone(): return {} # ตาราง routes ไม่มี
+def _ymd(qdate: QDate) -> str:
+    return qdate.toString("yyyy-MM-dd")
 
-            cur.execute("SELECT route_from, route_to, departure_time, duration, capacity FROM routes")
-            routes = cur.fetchall()
-            
-            for frm, to, dep_time, duration, capacity in routes:
-                if frm == "ขอนแก่น":
-                    # ใช้ปลายทางเป็น Key หลัก
-                    route_map.setdefault(to, {}).setdefault('arrivals', []).append(dep_time)
-                    # กำหนดคุณสมบัติอื่น ๆ (ใช้ค่าแรกที่พบ)
-                    if 'price' not in route_map[to]:
-                        # NOTE: ตาราง routes ไม่มีคอลัมน์ราคาโดยตรง, ต้องกำหนดค่าเริ่มต้น
-                        route_map[to]['price'] = 100 
-                    route_map[to]['duration'] = duration
-                    route_map[to]['capacity'] = capacity
-            
-            # เรียงลำดับเวลาออกรถ
-            for dest in route_map:
-                if 'arrivals' in route_map[dest]:
-                    route_map[dest]['arrivals'].sort()
-        
-    except Exception as e:
-        print(f"ERROR: Could not fetch route data from users.db/routes: {e}")
-        return {} 
+new_ticket_no = booking_core.new_ticket_no
 
-    return route_map
+def get_booked_seats(qdate: QDate, dep_time: str, dest: str, session_id: str | None = None) -> set[str]:
+    return booking_core.get_booked_seats(_ymd(qdate), dep_time, dest, session_id)
 
-def get_all_routes_from_db() -> dict:
-    """ดึงข้อมูลเส้นทางทั้งหมดจากตาราง route_info ใน passenger_bookings.db (FALLBACK เก่า)"""
-    routes = {}
-    try:
-        with db_connect_user() as con: 
-            cur = con.cursor()
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='route_info';")
-            if not cur.fetchone(): return {}
+def get_taken_counts(dates: list[QDate], dest: str, session_id: str | None = None) -> dict[tuple[str, str], int]:
+    return booking_core.get_taken_counts([_ymd(d) for d in dates], dest, session_id)
 
-            cur.execute("SELECT province_th, price, arrivals_json FROM route_info")
-            
-            for province_th, price, arrivals_json in cur.fetchall():
-                # โค้ดเดิมใช้ arrivals_json แต่ขาด duration/capacity
-                arrivals_list = json.loads(arrivals_json) 
-                
-                routes[province_th] = {
-                    "price": price,
-                    "arrivals": arrivals_list,
-                    "duration": "N/A", # Hardcoded เพื่อให้โค้ดอื่นไม่ Error
-                    "capacity": 40
-                }
-    except Exception as e:
-        print(f"ERROR: Could not fetch route data from passenger_bookings.db/route_info: {e}")
-        return {} 
-    
-    return routes
+def hold_seat(qdate: QDate, dep_time: str, dest: str, seat_code: str, session_id: str) -> bool:
+    return booking_core.hold_seat(_ymd(qdate), dep_time, dest, seat_code, session_id)
 
-# 🚨 ฟังก์ชันนี้ถูกประกาศใน Global Scope 🚨
-def _admin_db_save_booking_summary(data: dict, seat_list: list[str], ticket_no: str):
-    """
-    บันทึกสรุปการจองลงในฐานข้อมูล 'bookings' ของ Admin (users.db) 
-    """
-    try:
-        with _db_connect_admin() as con:
-            cur = con.cursor()
-            
-            price_each = float(data['price_each'])
-            qty = len(seat_list)
-            subtotal = price_each * qty
-            vat = round(subtotal * 0.07, 2)
-            
-            customer_name = f"{data['first_name']} {data['last_name']}"
-            route_from = data['origin'].split()[0] # ดึงแค่จังหวัด "ขอนแก่น"
-            route_to = data['dest']
-            date_str = data['date'].toString("yyyy-MM-dd")
-            seat_str = ", ".join(seat_list)
-            
-            cur.execute("""
-                INSERT INTO bookings(
-                    ticket_no, customer_name, route_from, route_to, date, status,
-                    phone, email, seat, price, vat, slip_path, dep_time, arr_time
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                ticket_no,
-                customer_name,
-                route_from,
-                route_to,
-                date_str,
-                "รอดำเนินการ", 
-                data['phone'],
-                data['email'],
-                seat_str,
-                subtotal,
-                vat,
-                data.get('slip_path', ''),
-                data['dep_time'],
-                data['arr_time']
-            ))
-            con.commit()
-    except Exception as e:
-        print(f"Admin DB Save Error: {e}")
-
-# 🚨 ฟังก์ชันนี้ถูกประกาศใน Global Scope 🚨
-def get_booked_seats(qdate: QDate, dep_time: str, dest: str) -> set[str]:
-    """ดึงที่นั่งที่ถูกจองแล้วสำหรับเที่ยวรถและวันที่เฉพาะ"""
-    dstr = qdate.toString("yyyy-MM-dd")
-    
-    dest_part = f'"dest": "{dest}"' 
-    dep_time_part = f'"dep_time": "{dep_time}"' 
-    
-    with db_connect_user() as con:
-        cur = con.cursor()
-        cur.execute("""
-            SELECT seat_code FROM passenger_bookings 
-            WHERE travel_date = ? 
-            AND trip_info_json LIKE ? 
-            AND trip_info_json LIKE ? 
-            AND is_booked = 1
-        """, (
-            dstr, 
-            f'%{dest_part}%',
-            f'%{dep_time_part}%'
-        ))
-        return {r[0] for r in cur.fetchall()}
-
-# 🚨 ฟังก์ชันนี้ถูกประกาศใน Global Scope 🚨
-def save_new_booking(data: dict, seat_list: list[str], ticket_no: str):
-    """บันทึกการจองใหม่ลงในตาราง passenger_bookings"""
-    
-    trip_data = {
-        "origin": data['origin'],
-        "dest": data['dest'],
-        "dep_time": data['dep_time'],
-        "arr_time": data['arr_time'],
-        "price": data['price_each']
-    }
-    trip_info_json = json.dumps(trip_data)
-    travel_date = data['date'].toString("yyyy-MM-dd") 
-    
-    with db_connect_user() as con:
-        cur = con.cursor()
-        booking_id = None
-        for seat in seat_list:
-            cur.execute("""
-            INSERT OR IGNORE INTO passenger_bookings (
-                first_name, last_name, phone, citizen_id, email, travel_date, trip_info_json, seat_code, ticket_no
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                data['first_name'], 
-                data['last_name'], 
-                data['phone'], 
-                data['citizen_id'], 
-                data['email'], 
-                travel_date, 
-                trip_info_json, 
-                seat,
-                ticket_no
-            ))
-            if booking_id is None:
-                booking_id = cur.lastrowid
-        con.commit()
-        return booking_id if booking_id else -1
+def release_seat(qdate: QDate, dep_time: str, dest: str, seat_code: str, session_id: str):
+    booking_core.release_seat(_ymd(qdate), dep_time, dest, seat_code, session_id)
+
+release_session_holds = booking_core.release_session_holds
+extend_session_holds  = booking_core.extend_session_holds
+purge_expired_holds   = booking_core.purge_expired_holds
+
+def save_new_booking(data: dict, seat_list: list[str], ticket_no: str, session_id: str | None = None) -> tuple[int, str, list[str]]:
+    """ดู booking_core.save_new_booking (data['date'] เป็น QDate)"""
+    return booking_core.save_new_booking(dict(data, date=_ymd(data['date'])), seat_list, ticket_no, session_id)
 
 # ----------------------------------------------------
 
@@ -311,84 +100,24 @@ INK         = "#2b2b2b"
 CARD_BORDER = "#9fd0d8"
 TEXT_SOFT   = "#3a3a3a"
 
-# ---------- Route data Loading (แก้ไขส่วนนี้) ----------
-
-# 1. ข้อมูล Fallback Hard-coded
-HARDCODED_ROUTES = {
-    "มหาสารคาม":{"price":70,"arrivals":["08:30","10:30","12:30"]},
-    "กาฬสินธุ์":{"price":90,"arrivals":["08:45","10:45","12:45"]},
-    "ร้อยเอ็ด":{"price":110,"arrivals":["09:15","11:15","13:15"]},
-    "อุดรธานี":{"price":100,"arrivals":["09:00","11:00","13:00"]},
-    "ชัยภูมิ":{"price":160,"arrivals":["09:30","11:30","13:30"]},
-    "หนองบัวลำภู":{"price":170,"arrivals":["09:30","11:30","13:30"]},
-    "หนองคาย":{"price":190,"arrivals":["10:00","12:00","14:00"]},
-    "ยโสธร":{"price":200,"arrivals":["10:15","12:15","14:15"]},
-    "บุรีรัมย์":{"price":250,"arrivals":["10:30","12:30","14:30"]},
-    "นครราชสีมา":{"price":220,"arrivals":["10:15","12:15","14:15"]},
-    "เลย":{"price":260,"arrivals":["11:00","13:00","15:00"]},
-    "สุรินทร์":{"price":300,"arrivals":["11:30","13:30","15:30"]},
-    "อำนาจเจริญ":{"price":350,"arrivals":["12:00","14:00","16:00"]},
-    "สกลนคร":{"price":330,"arrivals":["11:30","13:30","15:30"]},
-    "บึงกาฬ":{"price":380,"arrivals":["12:00","14:00","16:00"]},
-    "มุกดาหาร":{"price":290,"arrivals":["10:30","12:30","14:30"]},
-    "นครพนม":{"price":380,"arrivals":["11:00","13:00","15:00"]},
-    "ศรีสะเกษ":{"price":350,"arrivals":["12:00","14:00","16:00"]},
-    "อุบลราชธานี":{"price":330,"arrivals":["12:30","14:30","16:30"]},
-}
-
-# 2. ดึงข้อมูลจาก DB ทั้งหมด
-admin_routes = get_routes_from_admin_db()
-old_routes = get_all_routes_from_db()
-
-# 3. รวมข้อมูล: ให้ Admin Routes (ใหม่) มีความสำคัญก่อน
-ROUTE_INFO = old_routes.copy()
-ROUTE_INFO.update(admin_routes) # ข้อมูลจาก admin_routes จะเขียนทับ old_routes หากมีปลายทางซ้ำกัน
-
-# 4. ใช้ Hardcoded Fallback ถ้ายังไม่มีข้อมูล
-if not ROUTE_INFO:
-    ROUTE_INFO = HARDCODED_ROUTES.copy()
-    
-# ค่าเริ่มต้น (ใช้สำหรับกรณีที่ข้อมูล DB ไม่สมบูรณ์)
-DEFAULT_PRICE   = 70
-DEFAULT_ARRIVAL = ["08:30","10:30","12:30"]
+# ---------- Route data (booking_core) ----------
+DEFAULT_PRICE   = booking_core.DEFAULT_PRICE
+DEFAULT_ARRIVAL = booking_core.DEFAULT_ARRIVAL
+ROUTE_CATALOG   = booking_core.ROUTE_CATALOG
 
-# ** ใช้ Keys จาก ROUTE_INFO ที่ถูกโหลดแล้ว **
-ISAN_PROV = list(ROUTE_INFO.keys()) + ["ขอนแก่น"]
-DEST_OPTIONS = [p for p in ISAN_PROV if p != "ขอนแก่น"]
-
-
-# ---------- Fonts ----------
-def load_fonts():
-    for p in (RUBIK_REG, RUBIK_BOLD, FC_MINIMAL):
-        if os.path.exists(p):
-            QFontDatabase.addApplicationFont(p)
-
-def T(p: QPainter, txt: str, fam: str, size_px: int, weight: int, color: str, x: int, y: int, align="left"):
-    p.setPen(QColor(color))
-    p.setFont(QFont(fam, size_px, weight))
-    
-    if align == "center":
-        fm = p.fontMetrics()
-        tw = fm.horizontalAdvance(txt)
-        x_center = x - tw / 2
-        p.drawText(int(x_center), int(y), txt)
-    elif align == "right":
-        fm = p.fontMetrics()
-        tw = fm.horizontalAdvance(txt)
-        x_right = x - tw
-        p.drawText(int(x_right), int(y), txt)
-    else:
-        p.drawText(int(x), int(y), txt)
 
 # =========================================================
 class App(QWidget):
-    def __init__(self):
+    def __init__(self, current_user: str | None = None):
         super().__init__()
-        load_fonts()
+        with startup_trace.span("home: load_fonts"):
+            assets.load_fonts()
         self.fn_en = "Rubik"
         self.fn_th = "FC Minimal"
+        # ผู้ใช้ที่ login แล้ว: app_shell ส่งมาตรง ๆ, รันเดี่ยวใช้ --user
+        self.current_user = current_user or CURRENT_USER
 
-        self.setWindowTitle(f"Go with CREPE — Home — {CURRENT_USER}")
+        self.setWindowTitle(f"Go with CREPE — Home — {self.current_user}")
         self.resize(1366, 768)
         self.setStyleSheet(f"background:{BG_MAIN}; color:{TEXT_DARK};")
 
@@ -402,18 +131,19 @@ class App(QWidget):
         self.slip_uploaded = False
         self.slip_path = ""
         self.booking_id = None 
-        self._used_ticket_numbers = set()
+        self._pdf_jobs = []   # งานสร้าง PDF ที่ยังไม่เสร็จ (เก็บ reference ของ signal ไว้)
+        self.hold_session = uuid.uuid4().hex # ตัวระบุการล็อกที่นั่งของการจองรอบนี้
         self.passenger_data = {"first_name":"", "last_name":"", "phone":"", "citizen_id":"", "email":""}
+        self.seat_buttons = {}   # เติมตอนสร้างหน้าที่นั่ง
+        self._bar_dates = []     # 4 วันบนแถบวันที่ของหน้าเที่ยวบริการ
+        self._taken_counts = {}  # (วันที่, เวลาออก) -> ที่นั่งไม่ว่าง (get_taken_counts)
 
         # ------- UI: Header -------
         root = QVBoxLayout(self); root.setContentsMargins(32,24,32,24); root.setSpacing(18)
 
         header = QHBoxLayout(); header.setSpacing(18)
         self.logo = QLabel()
-        if os.path.exists(LOGO_IMG):
-            pix = QPixmap(LOGO_IMG).scaled(210,210, Qt.AspectRatioMode.KeepAspectRatio,
-                                             Qt.TransformationMode.SmoothTransformation)
-            self.logo.setPixmap(pix)
+        self.logo.setPixmap(assets.pixmap(LOGO_IMG, 210, 210))
         self.logo.setFixedSize(230,130)
         header.addWidget(self.logo, alignment=Qt.AlignmentFlag.AlignLeft|Qt.AlignmentFlag.AlignTop)
 
@@ -450,15 +180,18 @@ class App(QWidget):
         root.addLayout(header)
 
         # ------- Pages -------
+        # สร้างแต่ละหน้าตอนเปิดครั้งแรก (self._page) — ตอนเริ่มมีแค่หน้า HOME
         self.stack = QStackedWidget(); root.addWidget(self.stack)
-        self.page_home       = self._build_home()
-        self.page_booking    = self._build_booking_page()
-        self.page_passenger = self._build_passenger_page()
-        self.page_seat      = self._build_seat_page()
-        self.page_payment    = self._build_payment_page()
-        for p in (self.page_home,self.page_booking,self.page_passenger,self.page_seat,self.page_payment):
-            self.stack.addWidget(p)
-        self.stack.setCurrentWidget(self.page_home)
+        self._page_builders = {
+            "home":      self._build_home,
+            "booking":   self._build_booking_page,
+            "passenger": self._build_passenger_page,
+            "seat":      self._build_seat_page,
+            "payment":   self._build_payment_page,
+        }
+        self._pages = {}
+        self.stack.setCurrentWidget(self._page("home"))
+        self.stack.currentChanged.connect(self._on_page_changed)
 
         # ล็อกเมนูเริ่มต้น
         self._set_nav_access("home")
@@ -468,6 +201,86 @@ class App(QWidget):
         if saved:
             self._apply_profile_pixmap(self.profile_btn, saved)
 
+        # เก็บกวาดล็อกที่นั่งที่หมดอายุเป็นระยะ
+        self.hold_sweeper = QTimer(self)
+        self.hold_sweeper.timeout.connect(self._sweep_seat_holds)
+        self.hold_sweeper.start(HOLD_SWEEP_MS)
+
+        # รับ event การจอง/ยกเลิกจากหน้าจออื่น (admin หรือเครื่องขายตั๋วอื่น)
+        with startup_trace.span("home: eventbus.subscribe"):
+            eventbus.subscribe(self._on_bus_event)
+
+    # ---------------- SEAT HOLDS ----------------
+    def _sweep_seat_holds(self):
+        try:
+            if purge_expired_holds() and self._on_page("seat"):
+                self._apply_seat_locks() # มีที่นั่งว่างกลับมา อัปเดตหน้าที่นั่ง
+        except sqlite3.Error as e:
+            print(f"Seat hold sweep error: {e}")
+
+    def _on_bus_event(self, kind: str, data: dict):
+        """มีการจอง/ยกเลิกจากที่อื่น -> อัปเดตที่นั่งที่ถูกจอง ถ้ากำลังเปิดหน้าเลือกที่นั่งอยู่"""
+        if kind in ("booking_created", "booking_status", "bookings_deleted") and self._on_page("seat"):
+            self._apply_seat_locks()
+        elif kind in ("booking_created", "booking_status", "bookings_deleted") and self._on_page("booking"):
+            self._refresh_seat_counts()
+
+    def _abandon_seat_holds(self):
+        """ยกเลิกการเลือกที่นั่งของรอบนี้ทั้งหมด และเริ่ม session ใหม่"""
+        try:
+            release_session_holds(self.hold_session)
+        except sqlite3.Error as e:
+            print(f"Seat hold release error: {e}")
+        self.hold_session = uuid.uuid4().hex
+        for code in list(self.selected_seats):
+            btn = self.seat_buttons.get(code)
+            if btn:
+                btn.blockSignals(True); btn.setChecked(False); btn.blockSignals(False)
+        self.selected_seats.clear()
+
+    def closeEvent(self, ev):
+        self._abandon_seat_holds()
+        super().closeEvent(ev)
+
+    # ---------------- ROUTES ----------------
+    def _refresh_dest_options(self):
+        """เติมรายการปลายทางใหม่เมื่อ ROUTE_CATALOG เปลี่ยน (คงปลายทางที่เลือกไว้)"""
+        options = ROUTE_CATALOG.dest_options()
+        if self._dest_version == ROUTE_CATALOG.version:
+            return
+        current = self.home_dest.currentText() if self.home_dest.currentIndex() > 0 else None
+        self.home_dest.blockSignals(True)
+        self.home_dest.clear()
+        self.home_dest.addItem("— เลือกปลายทาง —")
+        self.home_dest.addItems(options)
+        if current in options:
+            self.home_dest.setCurrentIndex(options.index(current) + 1)
+        self.home_dest.blockSignals(False)
+        self._dest_version = ROUTE_CATALOG.version
+
+    def _on_page_changed(self, _idx: int):
+        if self._on_page("home"):
+            self._refresh_dest_options()
+
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        self._on_page_changed(self.stack.currentIndex()) # โหลดข้อมูลของหน้าแรกตอนหน้าต่างขึ้นแล้ว ไม่ใช่ตอนสร้าง
+
+    # ---------------- PAGES ----------------
+    def _page(self, name: str) -> QWidget:
+        """หน้าตามชื่อใน _page_builders (สร้าง + ใส่ใน stack ตอนเรียกครั้งแรก)"""
+        page = self._pages.get(name)
+        if page is None:
+            with startup_trace.span(f"home: build {name} page"):
+                page = self._pages[name] = self._page_builders[name]()
+            self.stack.addWidget(page)
+        return page
+
+    def _on_page(self, name: str) -> bool:
+        """หน้า name กำลังแสดงอยู่หรือไม่ (ไม่สร้างหน้าที่ยังไม่เคยเปิด)"""
+        page = self._pages.get(name)
+        return page is not None and self.stack.currentWidget() is page
+
     # ---------------- NAV CONTROL ----------------
     def _style_nav(self, btn: QPushButton, active: bool):
         btn.setProperty("active", "true" if active else "false")
@@ -501,13 +314,13 @@ class App(QWidget):
         if not sender.isEnabled():
             return
         mapping = {
-            self.btn_home: self.page_home,
-            self.btn_book: self.page_booking,
-            # self.btn_sched: self.page_booking, # ❌ ลบออก
-            self.btn_pay:  self.page_payment,
-            self.btn_about: self.page_payment
+            self.btn_home: "home",
+            self.btn_book: "booking",
+            # self.btn_sched: "booking", # ❌ ลบออก
+            self.btn_pay:  "payment",
+            self.btn_about: "payment"
         }
-        self.stack.setCurrentWidget(mapping.get(sender, self.page_home))
+        self.stack.setCurrentWidget(self._page(mapping.get(sender, "home")))
         self._set_active_tab(sender)
         if sender in (self.btn_pay, self.btn_about):
             self._fill_payment_summary()
@@ -556,8 +369,8 @@ class App(QWidget):
             if getattr(self, "passenger_name", "").strip():
                 parts = self.passenger_name.strip().split()
                 initials = (parts[0][:1] + (parts[1][:1] if len(parts) >= 2 else "")).upper()
-            elif CURRENT_USER and CURRENT_USER != "guest":
-                initials = CURRENT_USER[:2].upper()
+            elif self.current_user and self.current_user != "guest":
+                initials = self.current_user[:2].upper()
             canvas = QPixmap(56, 56); canvas.fill(Qt.GlobalColor.transparent)
             p = QPainter(canvas); p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
             p.setBrush(QColor("#cfe0e6")); p.setPen(Qt.PenStyle.NoPen); p.drawEllipse(0, 0, 56, 56)
@@ -569,7 +382,7 @@ class App(QWidget):
     # ================= HOME =================
     def _build_home(self) -> QWidget:
         w = QWidget(); v = QVBoxLayout(w); v.setSpacing(22); v.setContentsMargins(0,0,0,0)
-        welcome = QLabel(f"สวัสดี {CURRENT_USER}" if CURRENT_USER != "guest" else "สวัสดีผู้เยี่ยมชม")
+        welcome = QLabel(f"สวัสดี {self.current_user}" if self.current_user != "guest" else "สวัสดีผู้เยี่ยมชม")
         welcome.setFont(QFont(self.fn_th, 22, QFont.Weight.Bold))
         v.addWidget(welcome, 0, Qt.AlignmentFlag.AlignLeft)
         box = QFrame(); box.setMaximumWidth(1180)
@@ -586,9 +399,7 @@ class App(QWidget):
         self.home_origin.setFixedSize(INPUT_W, PILL_H)
         self.home_origin.setStyleSheet(f"QLabel{{background:{PILL_BG};border-radius:{PILL_H//2}px;padding:0 16px;}}")
         self.home_dest = QComboBox()
-        self.home_dest.addItem("— เลือกปลายทาง —")
-        # ใช้ DEST_OPTIONS ที่โหลดมาจาก DB/Fallback
-        self.home_dest.addItems(DEST_OPTIONS)
+        self._dest_version = None # เติมปลายทางจาก ROUTE_CATALOG ตอนหน้านี้แสดง (_on_page_changed)
         self.home_dest.setFixedSize(INPUT_W, PILL_H)
         self.home_dest.setStyleSheet(f"""
             QComboBox {{
@@ -663,15 +474,18 @@ class App(QWidget):
         lb_time  = QLabel("—:— – —:—"); lb_time.setFont(QFont(self.fn_th,26,QFont.Weight.Black)); v.addWidget(lb_time)
         lb_ft    = QLabel("ขอนแก่น บขส.3 – —"); lb_ft.setFont(QFont(self.fn_th,20)); v.addWidget(lb_ft)
         lb_price = QLabel("ราคา — บาท"); lb_price.setFont(QFont(self.fn_th,22)); v.addWidget(lb_price)
+        lb_seats = QLabel(""); lb_seats.setFont(QFont(self.fn_th,20,QFont.Weight.Bold)); v.addWidget(lb_seats)
         v.addStretch(1)
         row = QHBoxLayout(); row.addStretch(1)
         btn = QPushButton("เลือกเที่ยวนี้"); btn.setCursor(Qt.CursorShape.PointingHandCursor)
         btn.setStyleSheet("""
             QPushButton{background:#8a663f;color:white;border:none;border-radius:12px;padding:8px 14px;font-weight:800;}
             QPushButton:hover{background:#9b7447;}
+            QPushButton:disabled{background:#c9c9c9;color:#f4f4f4;}
         """)
         btn.clicked.connect(lambda _=False, i=idx: self._select_trip(i)); row.addWidget(btn); v.addLayout(row)
-        card._lb_time = lb_time; card._lb_ft = lb_ft; card._lb_price = lb_price; card._btn = btn
+        card._lb_time = lb_time; card._lb_ft = lb_ft; card._lb_price = lb_price; card._lb_seats = lb_seats; card._btn = btn
+        card._dep = None; card._capacity = 0
         return card
 
     # ================= PASSENGER =================
@@ -740,30 +554,23 @@ class App(QWidget):
         left = QFrame(); left.setStyleSheet(f"QFrame{{background:{CARD_LT};border-radius:10px;}}")
         lf = QVBoxLayout(left); lf.setContentsMargins(16,10,16,16); lf.setSpacing(10)
         seat_title = QLabel("ที่นั่ง"); seat_title.setFont(QFont(self.fn_th,26,QFont.Weight.Bold)); lf.addWidget(seat_title)
-        grid = QGridLayout(); grid.setHorizontalSpacing(10); grid.setVerticalSpacing(8)
+        # ผังที่นั่งจัดตามเที่ยวที่เลือก (_show_seat_layout) — ปุ่ม/ป้ายแถวใช้ซ้ำจาก pool ไม่สร้างใหม่ทุกเที่ยว
+        self.seat_box = QWidget(); self.seat_box.setObjectName("seatBox")
+        self.seat_box.setStyleSheet("""
+            QWidget#seatBox{background:transparent;}
+            QPushButton{background:#ffffff;border:2px solid #86b6bf;border-radius:12px;font-weight:800;}
+            QPushButton:checked{background:#a9c5cf;color:white;border-color:#a9c5cf;}
+            QPushButton:disabled{background:#e3e3e3;color:#9b9b9b;border-color:#cfcfcf;}
+        """)
+        box_v = QVBoxLayout(self.seat_box); box_v.setContentsMargins(0,0,0,0)
+        self.seat_grid = QGridLayout(); self.seat_grid.setHorizontalSpacing(10); self.seat_grid.setVerticalSpacing(8)
+        box_v.addLayout(self.seat_grid); box_v.addStretch(1)
+        scroll = QScrollArea(); scroll.setWidget(self.seat_box); scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QFrame.Shape.NoFrame); scroll.viewport().setAutoFillBackground(False)
         self.seat_buttons = {}
-        def make_seat_btn(text:str):
-            b = QPushButton(text); b.setCheckable(True); b.setCursor(Qt.CursorShape.PointingHandCursor)
-            b.setFixedSize(56,50)
-            b.setStyleSheet("""
-                QPushButton{background:#ffffff;border:2px solid #86b6bf;border-radius:12px;font-weight:800;}
-                QPushButton:checked{background:#a9c5cf;color:white;border-color:#a9c5cf;}
-                QPushButton:disabled{background:#e3e3e3;color:#9b9b9b;border-color:#cfcfcf;}
-            """)
-            b.toggled.connect(lambda checked, s=text: self._toggle_seat(s, checked)) # Fix signal to use seat code
-            return b
-        rows = 7; AISLE_W = 40
-        for r in range(1, rows+1):
-            row_label = QLabel(str(r)); row_label.setFont(QFont(self.fn_th,18)); row_label.setFixedWidth(20)
-            row_label.setAlignment(Qt.AlignmentFlag.AlignCenter); grid.addWidget(row_label, r-1, 0)
-            for c_idx, c in enumerate(["A","B"]):
-                code = f"{r}{c}"; btn = make_seat_btn(code)
-                self.seat_buttons[code] = btn; grid.addWidget(btn, r-1, 1 + c_idx)
-            grid.addItem(QSpacerItem(AISLE_W,1, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum), r-1, 3)
-            for c_idx, c in enumerate(["C","D"]):
-                code = f"{r}{c}"; btn = make_seat_btn(code)
-                self.seat_buttons[code] = btn; grid.addWidget(btn, r-1, 4 + c_idx)
-        lf.addLayout(grid); body.addWidget(left,2)
+        self._seat_pool, self._row_labels, self._deck_labels = [], [], []
+        self._seat_layout_key = None
+        lf.addWidget(scroll, 1); body.addWidget(left,2)
         right = QFrame(); right.setStyleSheet(f"QFrame{{background:{CARD_BLUE};border-radius:10px;}}")
         rf = QVBoxLayout(right); rf.setContentsMargins(16,10,16,16); rf.setSpacing(10)
         title = QLabel("สรุปราคา"); title.setFont(QFont(self.fn_th,28,QFont.Weight.Bold)); rf.addWidget(title)
@@ -835,8 +642,7 @@ class App(QWidget):
         qr_wrap = QFrame(); qr_wrap.setStyleSheet("QFrame{background:white;border-radius:10px;}"); qr_wrap.setFixedWidth(420)
         qw = QVBoxLayout(qr_wrap); qw.setContentsMargins(10,10,10,10); qw.setSpacing(6)
         self.qr_lbl = QLabel(alignment=Qt.AlignmentFlag.AlignCenter)
-        if os.path.exists(QR_IMG):
-            self.qr_lbl.setPixmap(QPixmap(QR_IMG).scaled(300,300, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+        self.qr_lbl.setPixmap(assets.pixmap(QR_IMG, 300, 300))
         qw.addWidget(self.qr_lbl, alignment=Qt.AlignmentFlag.AlignCenter)
         acct = QLabel("ชื่อบัญชี : นางสาวภูษิตา เขื่อนแก้ว\nเลขบัญชี : 1243548140 ธนาคารกรุงไทย")
         acct.setFont(QFont(self.fn_th,20)); acct.setAlignment(Qt.AlignmentFlag.AlignHCenter)
@@ -863,6 +669,9 @@ class App(QWidget):
         self.btn_pay_next.clicked.connect(self._save_receipt_pdf)
         btn_row.addWidget(self.btn_pay_next); btn_row.addStretch(1)
         rc.addLayout(btn_row)
+        self.pdf_status = QLabel(""); self.pdf_status.setFont(QFont(self.fn_th,18)); self.pdf_status.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        self.pdf_status.setWordWrap(True)
+        rc.addWidget(self.pdf_status)
         body_center.addWidget(left, 0, Qt.AlignmentFlag.AlignTop)
         body_center.addSpacing(16)
         body_center.addWidget(right_col, 0, Qt.AlignmentFlag.AlignTop)
@@ -904,18 +713,18 @@ class App(QWidget):
 
     # ---------- Flow control ----------
     def _go_booking_from_home(self):
-        # 🚨 NOTE: ROUTE_INFO ถูกโหลดที่ __init__ แล้ว
-        if not DEST_OPTIONS:
+        if not ROUTE_CATALOG.dest_options():
              QMessageBox.warning(self, "ค้นหา", "ไม่พบเส้นทางเดินรถ กรุณาตรวจสอบฐานข้อมูล"); return
 
         if self.home_dest.currentIndex() <= 0:
             QMessageBox.warning(self, "ค้นหา", "กรุณาเลือกปลายทาง"); return
         dest = self.home_dest.currentText(); date = self.home_date.date()
+        self._abandon_seat_holds() # ค้นหาใหม่ = ทิ้งที่นั่งที่เลือกค้างไว้
         self.search_state["dest"] = dest; self.search_state["date"] = date
-        self.stack.setCurrentWidget(self.page_booking); self._set_active_tab(self.btn_book)
+        self.stack.setCurrentWidget(self._page("booking")); self._set_active_tab(self.btn_book)
         self._set_nav_access("booking")
         today = QDate.currentDate()
-        dates = [date.addDays(-1), date, date.addDays(1), date.addDays(2)]
+        dates = self._bar_dates = [date.addDays(-1), date, date.addDays(1), date.addDays(2)]
         for i, d in enumerate(dates):
             self.btn_dates[i].setText(d.toString("d/M/yyyy"))
             self.btn_dates[i].setChecked(i==1)
@@ -923,7 +732,7 @@ class App(QWidget):
         self.lb_route.setText(f"จุดขึ้นรถ ขอนแก่น บขส.3 → {dest} • {date.toString('d/M/yyyy')}")
         
         # 🌟 แก้ไข: ดึงข้อมูลเที่ยวรถที่ถูกบันทึกมาใช้
-        info = ROUTE_INFO.get(dest, {"price":DEFAULT_PRICE,"arrivals":DEFAULT_ARRIVAL})
+        info = ROUTE_CATALOG.info(dest)
         arrivals, price = info.get("arrivals", DEFAULT_ARRIVAL), info.get("price", DEFAULT_PRICE)
         
         # ใช้จำนวนเที่ยวที่ดึงมาจริง (หรือสูงสุด 3 เที่ยวตามการออกแบบ UI)
@@ -939,10 +748,21 @@ class App(QWidget):
                 card._lb_time.setText(f"{dep} – {arr}")
                 card._lb_ft.setText(f"ขอนแก่น บขส.3 – {dest}")
                 card._lb_price.setText(f"ราคา {price} บาท")
+                card._dep = dep
+                card._capacity = seat_layout.normalize(*info.get("coaches", {}).get(dep, (info.get("capacity"), None)))[0]
                 card.show()
             else:
                 card.hide() # ซ่อนการ์ดที่ไม่มีข้อมูลเที่ยว
 
+        self._refresh_seat_counts()
+
+    def _refresh_seat_counts(self):
+        """ที่นั่งไม่ว่างของทุกเที่ยวใน 4 วันบนแถบวันที่ (query เดียว) — เปลี่ยนวันใช้ค่าที่โหลดไว้ ไม่ query ใหม่"""
+        try:
+            self._taken_counts = get_taken_counts(self._bar_dates, self.search_state["dest"], self.hold_session)
+        except sqlite3.Error as e:
+            print(f"Seat count error: {e}")
+            self._taken_counts = {}
         self._update_trip_cards_enabled()
 
     def _on_date_clicked(self):
@@ -960,13 +780,18 @@ class App(QWidget):
         today = QDate.currentDate()
         sel_date = self.search_state.get("date", today)
         allow = (sel_date >= today)
+        dstr = sel_date.toString("yyyy-MM-dd")
         for card in self.cards:
-            card._btn.setEnabled(allow and card.isVisible()) # ตรวจสอบ isVisible ด้วย
+            left = max(0, card._capacity - self._taken_counts.get((dstr, card._dep), 0))
+            card._lb_seats.setText(f"เหลือ {left} ที่นั่ง" if left else "เต็มแล้ว")
+            card._lb_seats.setStyleSheet("color:#2f6f7e;" if left else "color:#c0392b;")
+            card._btn.setText("เลือกเที่ยวนี้" if left else "เต็ม")
+            card._btn.setEnabled(allow and card.isVisible() and left > 0) # ตรวจสอบ isVisible ด้วย
 
     def _select_trip(self, idx:int):
         dest = self.search_state["dest"]; date = self.search_state["date"]
-        # 🌟 แก้ไข: ดึงข้อมูลเที่ยวที่ถูกเลือกจาก ROUTE_INFO ที่ถูกโหลดแล้ว 🌟
-        info = ROUTE_INFO.get(dest, {"price":DEFAULT_PRICE,"arrivals":DEFAULT_ARRIVAL})
+        # 🌟 แก้ไข: ดึงข้อมูลเที่ยวที่ถูกเลือกจาก ROUTE_CATALOG (โหลดใหม่อัตโนมัติเมื่อเส้นทางเปลี่ยน) 🌟
+        info = ROUTE_CATALOG.info(dest)
         arrivals = info.get("arrivals", DEFAULT_ARRIVAL)
         price = info.get("price", DEFAULT_PRICE)
         
@@ -976,9 +801,11 @@ class App(QWidget):
         dep = arrivals[idx]
         arr = DEFAULT_ARRIVAL[min(idx, len(DEFAULT_ARRIVAL) - 1)] # ใช้ค่า arr_time เดิม (ถ้าไม่มี duration ใน DB)
 
-        self.trip_selected = {"dep":dep,"arr":arr,"price":price}
+        self._abandon_seat_holds() # เปลี่ยนเที่ยว = ปลดล็อกที่นั่งของเที่ยวเดิม
+        capacity, layout = info.get("coaches", {}).get(dep, (info.get("capacity"), None))
+        self.trip_selected = {"dep":dep,"arr":arr,"price":price,"capacity":capacity,"layout":layout}
         
-        self.stack.setCurrentWidget(self.page_passenger); self._set_active_tab(self.btn_book)
+        self.stack.setCurrentWidget(self._page("passenger")); self._set_active_tab(self.btn_book)
         self.r_route.setText(f"{self.search_state['origin']} – {dest}")
         thai = QLocale(QLocale.Language.Thai, QLocale.Country.Thailand)
         self.r_date.setText(thai.toString(date, "ddddที่ d MMMM yyyy"))
@@ -990,7 +817,7 @@ class App(QWidget):
         self._apply_seat_locks()
 
     def _fill_seat_summary(self):
-        if not (self.trip_selected and self.search_state["dest"]): return
+        if not (self.trip_selected and self.search_state["dest"]) or "seat" not in self._pages: return
         dest = self.search_state["dest"]; date = self.search_state["date"]
         dep, arr, price = self.trip_selected["dep"], self.trip_selected["arr"], int(self.trip_selected["price"])
         self.s_route.setText(f"{self.search_state['origin']} – {dest}")
@@ -1029,17 +856,73 @@ class App(QWidget):
         self._go_seat_page()
 
     def _go_seat_page(self):
-        self.stack.setCurrentWidget(self.page_seat); self._set_active_tab(self.btn_book)
+        self.stack.setCurrentWidget(self._page("seat")); self._set_active_tab(self.btn_book)
+        self._show_seat_layout()
         self._fill_seat_summary()
         self._apply_seat_locks()
 
-    def _apply_seat_locks(self):
+    # ---------- ผังที่นั่ง ----------
+    def _pooled(self, pool: list, i: int, make):
+        """ตัวที่ i ของ pool (สร้างเพิ่มเมื่อผังใหญ่กว่าที่เคยแสดง)"""
+        while len(pool) <= i:
+            pool.append(make())
+        return pool[i]
+
+    def _new_seat_btn(self) -> QPushButton:
+        b = QPushButton(self.seat_box); b.setCheckable(True); b.setCursor(Qt.CursorShape.PointingHandCursor)
+        b.setFixedSize(56,50)
+        b.toggled.connect(lambda checked, b=b: self._toggle_seat(b.text(), checked)) # รหัสที่นั่ง = ข้อความบนปุ่ม (เปลี่ยนตามผัง)
+        return b
+
+    def _new_row_label(self) -> QLabel:
+        lb = QLabel(self.seat_box); lb.setFont(QFont(self.fn_th,18)); lb.setFixedWidth(28)
+        lb.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        return lb
+
+    def _new_deck_label(self) -> QLabel:
+        lb = QLabel(self.seat_box); lb.setFont(QFont(self.fn_th,20,QFont.Weight.Bold))
+        return lb
+
+    def _show_seat_layout(self):
+        """จัดผังตามความจุ + แบบรถของเที่ยวที่เลือก (ผังเดียวกับที่แสดงอยู่ = ไม่ทำอะไร)"""
         if not self.trip_selected: return
+        key = seat_layout.normalize(self.trip_selected.get("capacity"), self.trip_selected.get("layout"))
+        if key == self._seat_layout_key: return
+        self._seat_layout_key = key
+        grid, AISLE_W = self.seat_grid, 40
+        self.seat_box.setUpdatesEnabled(False)
+        while grid.count(): # ถอดออกจาก grid แล้วซ่อนไว้ใช้ใหม่
+            w = grid.takeAt(0).widget()
+            if w is not None: w.hide()
+        for c in range(grid.columnCount()): grid.setColumnMinimumWidth(c, 0)
+        self.seat_buttons = {}
+        n_btn = n_row = n_deck = 0; r = 0
+        for title, rows in seat_layout.build_layout(*key):
+            if title:
+                lb = self._pooled(self._deck_labels, n_deck, self._new_deck_label); n_deck += 1
+                lb.setText(title); grid.addWidget(lb, r, 0, 1, -1); lb.show(); r += 1
+            for row_no, cells in rows:
+                lb = self._pooled(self._row_labels, n_row, self._new_row_label); n_row += 1
+                lb.setText(str(row_no)); grid.addWidget(lb, r, 0); lb.show()
+                for c, code in enumerate(cells, start=1):
+                    if code is None:
+                        grid.setColumnMinimumWidth(c, AISLE_W)
+                    elif code:
+                        b = self._pooled(self._seat_pool, n_btn, self._new_seat_btn); n_btn += 1
+                        b.blockSignals(True); b.setChecked(False); b.setEnabled(True); b.blockSignals(False)
+                        b.setText(code); grid.addWidget(b, r, c); b.show()
+                        self.seat_buttons[code] = b
+                r += 1
+        self.seat_box.setUpdatesEnabled(True)
+
+    def _apply_seat_locks(self):
+        if not (self.trip_selected and self.seat_buttons): return # ยังไม่เคยเปิดหน้าที่นั่ง: ทำตอน _go_seat_page
         
         locked = get_booked_seats(
             qdate=self.search_state["date"], 
             dep_time=self.trip_selected["dep"], 
-            dest=self.search_state["dest"]
+            dest=self.search_state["dest"],
+            session_id=self.hold_session
         )
         
         for code, btn in self.seat_buttons.items():
@@ -1055,8 +938,18 @@ class App(QWidget):
             if btn:
                 btn.blockSignals(True); btn.setChecked(False); btn.blockSignals(False)
             QMessageBox.information(self, "เลือกเกินจำนวน", f"เลือกได้ไม่เกิน {self.pax_limit} ที่นั่ง"); return
-        if checked: self.selected_seats.add(code)
-        else: self.selected_seats.discard(code)
+        trip = (self.search_state["date"], self.trip_selected["dep"], self.search_state["dest"])
+        if checked:
+            if not hold_seat(*trip, code, self.hold_session):
+                btn = self.seat_buttons.get(code)
+                if btn:
+                    btn.blockSignals(True); btn.setChecked(False); btn.blockSignals(False)
+                QMessageBox.information(self, "ที่นั่งไม่ว่าง", f"ที่นั่ง {code} ถูกเลือกโดยผู้ใช้อื่นแล้ว กรุณาเลือกที่นั่งอื่น")
+                self._apply_seat_locks(); return
+            self.selected_seats.add(code)
+        else:
+            release_seat(*trip, code, self.hold_session)
+            self.selected_seats.discard(code)
         self._refresh_seat_summary()
 
     def _refresh_seat_summary(self):
@@ -1073,8 +966,9 @@ class App(QWidget):
             QMessageBox.information(self, "ยังไม่ได้เลือกที่นั่ง", "กรุณาเลือกที่นั่งอย่างน้อย 1 ที่นั่ง"); return
         if cnt < need:
             QMessageBox.information(self, "เลือกที่นั่งไม่ครบ", f"คุณเลือกที่นั่งมา {cnt} ที่นั่ง กรุณาเลือกให้ครบ {need} ที่นั่ง"); return
+        extend_session_holds(self.hold_session) # ต่ออายุล็อกระหว่างชำระเงิน
+        self.stack.setCurrentWidget(self._page("payment")); self._set_active_tab(self.btn_pay)
         self._fill_payment_summary()
-        self.stack.setCurrentWidget(self.page_payment); self._set_active_tab(self.btn_pay)
         self._set_nav_access("payment")
 
     def _fill_payment_summary(self):
@@ -1090,10 +984,7 @@ class App(QWidget):
         seat_list = ", ".join(sorted(self.selected_seats)) if self.selected_seats else "-"
         self.p_seats.setText(f"ที่นั่ง {seat_list}")
         self.p_price_each.setText(f"ราคา {price} บาท/ที่นั่ง")
-        qty = max(1, len(self.selected_seats))
-        subtotal = float(price * qty)
-        vat = round(subtotal * 0.07, 2)
-        total = round(subtotal + vat, 2)
+        subtotal, vat, total = booking_core.price_breakdown(price, max(1, len(self.selected_seats)))
         self.p_subtotal.setText(f"{subtotal:,.2f} บาท")
         self.p_vat.setText(f"{vat:,.2f} บาท")
         self.p_total.setText(f"{total:,.2f} บาท")
@@ -1105,196 +996,8 @@ class App(QWidget):
             self.slip_uploaded = True; self.slip_path = path
             self.slip_info.setText(f"อัปโหลดแล้ว: {os.path.basename(path)}")
 
-    # ---------- PDF Drawing Functions (Revised for direct PDF) ----------
+    # ---------- ตั๋วและใบเสร็จ (วาด PDF อยู่ใน ticket_pdf.py) ----------
     
-    def _random_ticket_no(self) -> str:
-        while True:
-            num = "".join([str(random.randint(0,9)) for _ in range(8)])
-            if num[0] != "0" and num not in self._used_ticket_numbers:
-                self._used_ticket_numbers.add(num); return num
-    
-    def _draw_ticket_content(self, p:QPainter, rect:QRectF, data:dict):
-        # ฟังก์ชันวาดตั๋ว (หน้า 1) ที่ปรับให้ตรงกับรูปภาพ 'ตั๋ว.png'
-        p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        p.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
-        p.fillRect(rect, QColor("#ffffff"))
-
-        OUT = 100 
-        CARD = QRectF(rect.left()+OUT, rect.top()+OUT, rect.width()-OUT*2, rect.height()-OUT*2.2) 
-        
-        # วาดเงาและกรอบ
-        p.setPen(Qt.PenStyle.NoPen); p.setBrush(QColor(0,0,0,14))
-        p.drawRoundedRect(CARD.adjusted(2,4,2,4), 16, 16)
-        p.setBrush(QColor("#ffffff")); p.setPen(QPen(QColor(CARD_BORDER), 3))
-        p.drawRoundedRect(CARD, 16, 16)
-
-        pad = 32
-        xL_base = CARD.left() + pad + 6
-        
-        # --- HEADER (สำหรับลูกค้า + โลโก้) ---
-        y_cursor = CARD.top() + pad
-        
-        # สำหรับลูกค้า (ขวาบน)
-        T(p, "(สำหรับลูกค้า)", self.fn_th, 20, QFont.Weight.DemiBold, TEXT_SOFT, int(CARD.right()-pad-6), int(y_cursor+4), align="right")
-        
-        # โลโก้ (ขวาบน)
-        if os.path.exists(LOGO_IMG):
-            logo_width, logo_height = 50, 50
-            logo = QPixmap(LOGO_IMG).scaled(logo_width, logo_height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            p.drawPixmap(int(CARD.right()-pad-logo_width), int(y_cursor + 28), logo)
-        
-        # --- BLOCK 1: เลขที่ตั๋วและรายละเอียดผู้โดยสาร ---
-        
-        y_cursor = CARD.top() + pad + 15 # ตำแหน่งเริ่มต้นใกล้เคียงกับรูป
-        
-        # ------------------- เลขที่ตั๋ว -------------------
-        T(p, "เลขที่ตั๋ว", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y_cursor))
-        y_cursor += 30 
-        T(p, data["ticket_no"], self.fn_en, 26, QFont.Weight.Bold, TEXT_DARK, int(xL_base), int(y_cursor))
-        y_cursor += 40
-
-        # ------------------- ชื่อ -------------------
-        T(p, "ชื่อ :", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y_cursor))
-        T(p, (data["passenger_name"] or "-"), self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, int(xL_base + 60), int(y_cursor))
-        y_cursor += 36
-
-        # ------------------- เบอร์โทร -------------------
-        T(p, "เบอร์โทร :", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y_cursor))
-        T(p, (data["phone"] or "-"), self.fn_en, 22, QFont.Weight.Bold, TEXT_DARK, int(xL_base + 100), int(y_cursor))
-        y_cursor += 36
-        
-        # ------------------- ที่นั่ง -------------------
-        T(p, "ที่นั่ง :", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y_cursor))
-        T(p, (data["seat_list_text"] or "-"), self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, int(xL_base + 70), int(y_cursor))
-        y_cursor += 36
-        
-        # ------------------- ราคาต่อที่นั่ง (ว่างเปล่าตามรูป) -------------------
-        T(p, "ราคา :", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y_cursor))
-        # T(p, f"{data['price_each']} บาท/ที่นั่ง", self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, int(xL_base + 70), int(y_cursor))
-        y_cursor += 40
-
-        # --- BLOCK 2: กรอบรายละเอียดการเดินทาง ---
-        
-        box_top_y = y_cursor
-        box_height = 200
-        box = QRectF(CARD.left()+pad, box_top_y, CARD.width()-pad*2, box_height) 
-        
-        p.setPen(QPen(QColor("#2b2b2b"), 2)); p.setBrush(Qt.BrushStyle.NoBrush); p.drawRect(box)
-
-        bx_inner = int(box.left()+20)
-        by_inner = int(box.top()+28)
-        line_height = 36
-        
-        # ขึ้นรถที่
-        T(p, "ขึ้นรถที่", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner) 
-        T(p, f"ขอนแก่น เท่านั้น", self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+90, by_inner) 
-        by_inner += line_height
-        
-        # ลงรถที่
-        T(p, "ลงรถที่", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner)
-        T(p, f"  {data['dest']}", self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+90, by_inner)
-        by_inner += line_height
-        
-        # วันที่
-        T(p, "วันที่", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner)
-        T(p, f"  {data['date_full_th']}", self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+60, by_inner)
-        by_inner += line_height
-        
-        # เวลา
-        T(p, "เวลา", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner)
-        T(p, f"  {data['dep_time']}", self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+60, by_inner)
-        by_inner += line_height
-        
-        # ราคาต่อหน่วยในกรอบ
-        T(p, "ราคา", self.fn_th, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner)
-        T(p, f"  {data['price_each']} บาท/ที่นั่ง", self.fn_th, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+60, by_inner)
-        
-        y_cursor = box.bottom() + 30
-
-        # --- BLOCK 3: ขอบคุณ, Bar Code, หมายเหตุ ---
-        
-        T(p, "ขอบคุณที่ใช้บริการ", self.fn_th, 24, QFont.Weight.DemiBold, TEXT_DARK, int(CARD.center().x()), int(y_cursor), align="center")
-        y_cursor += 30
-
-        # วาด Bar Code Mockup (ส่วนที่แก้ไข)
-        bc_top = int(y_cursor); bc_left = int(CARD.left()+pad+16); bc_right = int(CARD.right()-pad-16); bc_h = 70
-        p.setPen(QPen(QColor("#444"), 1.6))
-        rng = random.Random(data["ticket_no"]); x = bc_left
-        while x < bc_right:
-            w = rng.choice([1,2,3,4])
-            # ใช้ p.drawLine(int, int, int, int)
-            p.drawLine(int(x), bc_top, int(x), bc_top + bc_h)
-            x += w + 1
-        y_cursor += bc_h + 30
-        
-        # หมายเหตุ
-        T(p, "โปรดแสดงตั๋วนี้แก่พนักงานในวันที่เดินทาง", self.fn_th, 20, QFont.Weight.Normal, TEXT_SOFT, int(CARD.center().x()), int(y_cursor), align="center")
-        
-    def _draw_invoice_content(self, p: QPainter, rect: QRectF, data: dict):
-        # ฟังก์ชันวาดใบเสร็จ (หน้า 2)
-        p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        p.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
-        p.fillRect(rect, QColor("#ffffff"))
-
-        MM_TO_PX = rect.width() / 210
-        def mm_to_px(mm_val): return mm_val * MM_TO_PX
-        
-        margin_px = mm_to_px(15) 
-        card_x = rect.left() + margin_px
-        card_y = rect.top() + mm_to_px(15)
-        card = QRectF(card_x, card_y, rect.width() - 2*margin_px, rect.height() - 2*mm_to_px(15))
-        
-        header_h = mm_to_px(20)
-        header = QRectF(card.left(), card.top(), card.width(), header_h) 
-        p.setBrush(QColor(CARD_BLUE)); p.setPen(Qt.PenStyle.NoPen); p.drawRoundedRect(header, 18, 18)
-        
-        T(p, "ใบยืนยันการรับเงิน", self.fn_th, 30, QFont.Weight.Bold, "#000", int(header.center().x()), int(header.center().y() + mm_to_px(3)), align="center")
-        
-        T(p, f"วันที่ทำรายการ {data['date_long_th']}", self.fn_th, 20, QFont.Weight.Normal, BROWN, int(card.right() - mm_to_px(5)), int(header.center().y() + mm_to_px(3)), align="right")
-
-        y_cursor = header.bottom() + mm_to_px(10)
-
-        # --- Address Block ---
-        bx, by = int(card.left() + mm_to_px(1)), int(y_cursor)
-        
-        T(p, "GO WITH CREPE COMPANY", self.fn_en, 16, QFont.Weight.Bold, "#000", bx, by)
-        by += mm_to_px(4); T(p, "Baan Suksabai Park Co., Ltd. (Building B)", self.fn_en, 12, QFont.Weight.Normal, "#000", bx, by)
-        by += mm_to_px(4); T(p, "775 Moo 12, Sila Subdistrict,", self.fn_en, 12, QFont.Weight.Normal, "#000", bx, by)
-        by += mm_to_px(4); T(p, "Mueang District, Khon Kaen Province 40000,", self.fn_en, 12, QFont.Weight.Normal, "#000", bx, by)
-        by += mm_to_px(4); T(p, "Thailand", self.fn_en, 12, QFont.Weight.Normal, "#000", bx, by)
-        by += mm_to_px(4); T(p, "Tax ID: 0486739765823", self.fn_en, 12, QFont.Weight.Normal, "#000", bx, by)
-        
-        y_cursor = by + mm_to_px(10)
-
-        # --- Summary Table (Placeholder) ---
-        row_h = mm_to_px(8.5)
-        
-        # Header Row
-        T(p, "Description", self.fn_en, 12, QFont.Weight.Bold, "#000", int(card.left() + mm_to_px(10)), int(y_cursor + mm_to_px(3)))
-        T(p, "Amount(THB)", self.fn_en, 12, QFont.Weight.Bold, "#000", int(card.right() - mm_to_px(30)), int(y_cursor + mm_to_px(3)), align="right")
-        
-        y_cursor += row_h
-        p.setPen(QPen(QColor("#d9d9d9"), 1)); p.drawLine(card.left(), y_cursor, card.right(), y_cursor)
-        
-        y_cursor += row_h
-        T(p, f"Payment of : Bus Ticket No. {data['ticket_no']} ({data['qty']} seats)", self.fn_en, 12, QFont.Weight.Bold, "#000", int(card.left() + mm_to_px(10)), int(y_cursor + mm_to_px(3)))
-        y_cursor += row_h
-        
-        # Financial Summary
-        y_cursor += mm_to_px(20)
-        p.setPen(QPen(QColor("#b9d4db"), 2)); p.drawRect(card.right() - mm_to_px(70), y_cursor, mm_to_px(70), row_h * 3.5)
-        
-        T(p, "Subtotal:", self.fn_th, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(65)), int(y_cursor + mm_to_px(6)))
-        T(p, f"{data['subtotal']:,.2f}", self.fn_en, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(5)), int(y_cursor + mm_to_px(6)), align="right")
-        
-        y_cursor += row_h
-        T(p, "VAT 7%:", self.fn_th, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(65)), int(y_cursor + mm_to_px(6)))
-        T(p, f"{data['vat']:,.2f}", self.fn_en, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(5)), int(y_cursor + mm_to_px(6)), align="right")
-        
-        y_cursor += row_h
-        T(p, "TOTAL:", self.fn_th, 18, QFont.Weight.Black, BROWN, int(card.right() - mm_to_px(65)), int(y_cursor + mm_to_px(8)))
-        T(p, f"{data['grand_total']:,.2f}", self.fn_th, 18, QFont.Weight.Black, BROWN, int(card.right() - mm_to_px(5)), int(y_cursor + mm_to_px(8)), align="right")
-        
     def _save_receipt_pdf(self):
         
         if not self.slip_uploaded:
@@ -1304,8 +1007,8 @@ class App(QWidget):
         
         # --- 1. เตรียมข้อมูลทั้งหมด (Data Payload) ---
         try:
-            # 1.1 สร้างเลขที่ตั๋ว
-            ticket_no = self._random_ticket_no()
+            # 1.1 เลขที่ตั๋ว (ตัวเลือก — เลขจริงได้ตอนบันทึก DB ถ้าชนจะได้เลขใหม่)
+            ticket_no = new_ticket_no()
             
             # 1.2 ตรวจสอบว่าที่นั่งถูกจองไปก่อนหน้าหรือไม่
             seats_to_book = sorted(list(self.selected_seats))
@@ -1317,7 +1020,8 @@ class App(QWidget):
             locked_seats = get_booked_seats(
                 qdate=self.search_state["date"], 
                 dep_time=self.trip_selected["dep"], 
-                dest=self.search_state["dest"]
+                dest=self.search_state["dest"],
+                session_id=self.hold_session
             )
             booked_before = set(seats_to_book).intersection(locked_seats)
             if booked_before:
@@ -1326,9 +1030,7 @@ class App(QWidget):
 
             price = int(self.trip_selected["price"])
             qty = max(1, len(seats_to_book))
-            subtotal = float(price * qty)
-            vat = round(subtotal * 0.07, 2)
-            total = round(subtotal + vat, 2)
+            subtotal, vat, total = booking_core.price_breakdown(price, qty)
             
             date = self.search_state["date"]
             thai = QLocale(QLocale.Language.Thai, QLocale.Country.Thailand)
@@ -1372,38 +1074,47 @@ class App(QWidget):
                                                          "PDF Files (*.pdf)")
             if not out_path: return
 
-            # *** บันทึกข้อมูลการจองลง DB ***
-            save_new_booking(data_payload, seats_to_book, ticket_no)
-            _admin_db_save_booking_summary(data_payload, seats_to_book, ticket_no)
-
-            # --- สร้าง PDF ---
-            writer = QPdfWriter(out_path)
-            writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
-            writer.setResolution(300)
-            writer.setPageMargins(QMarginsF(12, 12, 12, 12), QPageLayout.Unit.Millimeter)
-
-            p = QPainter()
-            if not p.begin(writer): raise RuntimeError("ไม่สามารถเริ่มเขียน PDF ได้")
-
-            page_rect = QRectF(0, 0, writer.width(), writer.height())
-
-            # หน้า 1: ตั๋ว (Ticket) - ใช้ฟังก์ชันที่ปรับปรุงแล้ว
-            self._draw_ticket_content(p, page_rect, data_payload)
-
-            writer.newPage()
-
-            # หน้า 2: ใบเสร็จ (Invoice)
-            self._draw_invoice_content(p, page_rect, data_payload)
-
-            p.end()
-
-            # --- ล็อกที่นั่งและเปิดไฟล์ ---
+            # *** บันทึกข้อมูลการจองลง DB ทั้งสองไฟล์ใน transaction เดียว (ถ้าชนแม้ที่เดียวจะไม่บันทึกเลย) ***
+            booking_id, saved_no, conflicts = save_new_booking(data_payload, seats_to_book, ticket_no, self.hold_session)
+            if conflicts:
+                QMessageBox.warning(self, "ที่นั่งถูกจองแล้ว", f"ที่นั่ง {', '.join(conflicts)} ถูกจองไปก่อนหน้า กรุณาเลือกที่นั่งใหม่")
+                self._go_seat_page(); return
+            if saved_no != ticket_no: # เลขตั๋วชนใน DB -> ใช้เลขที่บันทึกจริงทั้งในไฟล์และชื่อไฟล์
+                folder, name = os.path.split(out_path)
+                out_path = os.path.join(folder, name.replace(ticket_no, saved_no))
+                ticket_no = data_payload["ticket_no"] = saved_no
+            self.hold_session = uuid.uuid4().hex # การจองถัดไปใช้ session ใหม่
+            eventbus.publish("booking_created", booking_id=booking_id, date=date.toString("yyyy-MM-dd"),
+                             route_from=data_payload["origin"].split()[0], route_to=data_payload["dest"],
+                             dep_time=data_payload["dep_time"])
+
+            # --- ล็อกที่นั่ง แล้วสร้าง PDF บน worker thread (ลูกค้าคนถัดไปจองต่อได้ทันที) ---
             self._apply_seat_locks()
-            QMessageBox.information(self, "บันทึกสำเร็จ", f"ไฟล์ถูกบันทึกที่:\n{out_path}")
-            QDesktopServices.openUrl(QUrl.fromLocalFile(out_path))
+            self._start_pdf_job(out_path, dict(data_payload, date=data_payload["date_short"]))
+            QMessageBox.information(self, "บันทึกสำเร็จ", f"บันทึกการจองเลขที่ {ticket_no} แล้ว\nกำลังสร้างไฟล์ตั๋วและใบเสร็จ")
 
         except Exception as e:
-            QMessageBox.critical(self, "บันทึกไม่สำเร็จ", f"เกิดข้อผิดพลาดระหว่างสร้างไฟล์/บันทึก DB:\n{e}")
+            QMessageBox.critical(self, "บันทึกไม่สำเร็จ", f"เกิดข้อผิดพลาดระหว่างบันทึก DB:\n{e}")
+
+    def _start_pdf_job(self, out_path: str, data: dict):
+        job = ticket_pdf.TicketPdfJob(out_path, data)
+        sig = job.signals
+        self._pdf_jobs.append(sig)
+        name = os.path.basename(out_path)
+        sig.progress.connect(lambda pct, msg: self.pdf_status.setText(f"{name}: {msg} ({pct}%)"))
+        sig.finished.connect(lambda path, s=sig: self._on_pdf_finished(s, path))
+        sig.failed.connect(lambda err, s=sig, path=out_path: self._on_pdf_failed(s, path, err))
+        QThreadPool.globalInstance().start(job)
+
+    def _on_pdf_finished(self, sig, path: str):
+        if sig in self._pdf_jobs: self._pdf_jobs.remove(sig)
+        self.pdf_status.setText(f"ไฟล์ถูกบันทึกที่: {path}")
+        QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+
+    def _on_pdf_failed(self, sig, path: str, err: str):
+        if sig in self._pdf_jobs: self._pdf_jobs.remove(sig)
+        self.pdf_status.setText("")
+        QMessageBox.critical(self, "สร้างไฟล์ไม่สำเร็จ", f"บันทึกการจองแล้ว แต่สร้างไฟล์ไม่สำเร็จ:\n{path}\n{err}")
 
     def _update_total(self):
         if not self.trip_selected:
@@ -1416,8 +1127,12 @@ class App(QWidget):
 
 # ---------------- run ----------------
 if __name__ == "__main__":
-    init_db()  
-    app = QApplication(sys.argv)
-    w = App()
+    with startup_trace.span("init_db"):
+        init_db()
+    with startup_trace.span("QApplication"):
+        app = QApplication(sys.argv)
+    with startup_trace.span("App()"):
+        w = App()
+    startup_trace.first_paint(w, "home")
     w.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -5,12 +5,14 @@
 # - เซฟอวาตาร์วงกลมเป็น ./profiles/<username>.png
 
 import os, sys, re, sqlite3
+import startup_trace   # ก่อน PyQt6 เพื่อให้ --profile-startup นับเวลา import ด้วย
+import assets
+import db_manager
+import migrations
 
 
 BUS_SIGNIN = r"picture\sign innn.png"
 BUS_SIGNUP = r"picture\sign up.png"
-RUBIK_REG  = r"font\Rubik-Regular.ttf"
-RUBIK_BOLD = r"font\Rubik-Bold.ttf"
 HOME_PY    = r"code\home.py"
 ADMIN_PY   = r"code\admin.py"
 
@@ -23,10 +25,16 @@ DB_PATH_ABS = os.path.join(os.path.expanduser("~"), "Documents", "GoWithCREPE",
 AVATAR_DIR = os.path.join(APP_DIR, "profiles")
 os.makedirs(AVATAR_DIR, exist_ok=True) 
 
+# ความแรงของ bcrypt (log2 จำนวนรอบ, 4–31) — เปลี่ยนแล้วรหัสเดิมจะถูก hash ใหม่เองตอน login สำเร็จ
+BCRYPT_ROUNDS = int(os.environ.get("CREPE_BCRYPT_ROUNDS", "12"))
+
 # ---------- PyQt6 ----------
-from PyQt6.QtCore import Qt, QRegularExpression, QTimer, QProcess, QRectF, QPointF
+from PyQt6.QtCore import (
+    Qt, QRegularExpression, QTimer, QProcess, QRectF, QPointF,
+    QObject, QRunnable, QThreadPool, pyqtSignal
+)
 from PyQt6.QtGui import (
-    QFontDatabase, QFont, QPixmap, QRegularExpressionValidator,
+    QFont, QPixmap, QRegularExpressionValidator,
     QPainter, QBrush, QColor, QPen, QPainterPath, QCursor
 )
 from PyQt6.QtWidgets import (
@@ -58,24 +66,12 @@ def warn_missing_libs(parent=None):
         QMessageBox.warning(parent, "Missing libraries",
             "ยังไม่ได้ติดตั้ง:\n- " + "\n- ".join(miss) + "\n\npip install " + " ".join(miss))
 
-def load_rubik():
-    fam = None
-    try:
-        if os.path.exists(RUBIK_REG):
-            fid = QFontDatabase.addApplicationFont(RUBIK_REG)
-            fams = QFontDatabase.applicationFontFamilies(fid); fam = fams[0] if fams else None
-        if os.path.exists(RUBIK_BOLD):
-            QFontDatabase.addApplicationFont(RUBIK_BOLD)
-    except Exception:
-        pass
-    return fam or "Rubik"
-
 def is_valid_password(p: str) -> bool:
     return len(p) >= 9 and any(ch.isupper() for ch in p)
 
 def hash_password(plain: str) -> tuple[str, str]:
     if bcrypt is None: return plain, ""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(BCRYPT_ROUNDS)
     return bcrypt.hashpw(plain.encode("utf-8"), salt).decode("utf-8"), salt.decode("utf-8")
 
 def check_password(plain: str, pw_hash: str) -> bool:
@@ -83,25 +79,21 @@ def check_password(plain: str, pw_hash: str) -> bool:
     try:    return bcrypt.checkpw(plain.encode("utf-8"), pw_hash.encode("utf-8"))
     except: return plain == pw_hash
 
+def needs_rehash(pw_hash: str) -> bool:
+    """True ถ้า hash ไม่ใช่ bcrypt (รหัสเก่าที่เก็บตอนไม่มี bcrypt) หรือใช้จำนวนรอบไม่ตรงกับ BCRYPT_ROUNDS"""
+    if bcrypt is None: return False
+    parts = (pw_hash or "").split("$")   # "$2b$12$<salt+hash>"
+    if len(parts) != 4 or not parts[2].isdigit(): return True
+    return int(parts[2]) != BCRYPT_ROUNDS
+
 # ---------- DB (เชื่อมต่อและสร้างตาราง users) ----------
-def db_connect(db_path:str): return sqlite3.connect(db_path)
+def db_connect(db_path:str): return db_manager.connect(db_path)
 
 def init_db(db_path:str):
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    """เรียกครั้งเดียวตอนเริ่มโปรแกรม: migration ตาราง users (migrations.AUTH_MIGRATIONS) + บัญชี admin เริ่มต้น"""
+    migrations.migrate(db_path, migrations.AUTH_MIGRATIONS)
     conn = db_connect(db_path); c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS users(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username    TEXT UNIQUE,
-            email       TEXT UNIQUE,
-            pw_hash     TEXT,
-            pw_salt     TEXT,
-            role        TEXT DEFAULT 'user',
-            image_path  TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    # สร้าง Admin default ถ้ายังไม่มี
+    # สร้าง Admin default ถ้ายังไม่มี (hash ด้วย bcrypt จึงทำที่นี่ ไม่ใช่ใน migrations)
     c.execute("SELECT COUNT(*) FROM users WHERE role='admin'")
     if c.fetchone()[0] == 0:
         pw_hash, pw_salt = hash_password("Admin1234")
@@ -112,18 +104,31 @@ def init_db(db_path:str):
 
 def load_user_for_login(login_name: str):
     # ใช้ DB_PATH_ABS แทน DB_PATH_REL เพื่อให้ชี้ไปที่ไฟล์ DB ที่ถูกต้อง
-    try:
-        init_db(DB_PATH_ABS) # ตรวจสอบและสร้าง DB อีกครั้งก่อนใช้
-        conn = db_connect(DB_PATH_ABS); c = conn.cursor()
-        c.execute("""SELECT id, username, email, pw_hash, pw_salt, role, image_path
-                      FROM users WHERE username=? OR email=?""", (login_name, login_name))
-        row = c.fetchone(); conn.close(); return row
-    except Exception as e:
-        QMessageBox.critical(None, "DB Error", f"ไม่สามารถโหลดผู้ใช้ได้: {e}"); return None
+    # เรียกจาก worker thread ได้ (ไม่แตะ UI) — ข้อผิดพลาดของ DB ส่งต่อให้ผู้เรียก
+    conn = db_connect(DB_PATH_ABS); c = conn.cursor()
+    c.execute("""SELECT id, username, email, pw_hash, pw_salt, role, image_path
+                  FROM users WHERE username=? OR email=?""", (login_name, login_name))
+    row = c.fetchone(); conn.close(); return row
+
+def authenticate(login_name: str, password: str):
+    """
+    ตรวจ Username/Email + รหัสผ่าน (ใช้เวลาตาม BCRYPT_ROUNDS — ให้เรียกผ่าน AuthJob)
+    คืน (ผล, row): "ok" | "no_user" | "bad_password" — ถ้าผ่านและ hash ใช้รอบไม่ตรงค่าปัจจุบันจะ hash ใหม่ให้
+    """
+    row = load_user_for_login(login_name)
+    if not row: return "no_user", None
+    uid, _, _, pw_hash, _, _, _ = row
+    if not check_password(password, pw_hash): return "bad_password", None
+    if needs_rehash(pw_hash):
+        new_hash, new_salt = hash_password(password)
+        conn = db_connect(DB_PATH_ABS)
+        conn.execute("UPDATE users SET pw_hash=?, pw_salt=? WHERE id=? AND pw_hash=?",
+                     (new_hash, new_salt, uid, pw_hash))
+        conn.commit(); conn.close()
+    return "ok", row
 
 def register_user(username: str, email: str, password: str, image_path: str|None):
     try:
-        init_db(DB_PATH_ABS) # ตรวจสอบและสร้าง DB อีกครั้งก่อนใช้
         conn = db_connect(DB_PATH_ABS); c = conn.cursor()
         pw_hash, pw_salt = hash_password(password)
         c.execute("""INSERT INTO users(username,email,pw_hash,pw_salt,role,image_path)
@@ -140,6 +145,55 @@ def register_user(username: str, email: str, password: str, image_path: str|None
         if 'conn' in locals() and conn: conn.close()
     return ok, msg
 
+class AuthSignals(QObject):
+    finished = pyqtSignal(object)   # ค่าที่ฟังก์ชันคืน
+    failed   = pyqtSignal(str)      # ข้อความผิดพลาด
+
+class AuthJob(QRunnable):
+    """
+    รัน authenticate / register_user บน QThreadPool (bcrypt ช้าโดยตั้งใจ ไม่ให้หน้าจอค้าง)
+    ผลลัพธ์ส่งกลับ GUI thread ผ่าน signal
+    """
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn, self.args = fn, args
+        self.signals = AuthSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+def start_auth_job(page: QWidget, busy_widgets, busy_button: QPushButton, busy_text: str,
+                   fn, args: tuple, on_done):
+    """เริ่ม AuthJob พร้อมสถานะกำลังทำงาน (ปิดปุ่ม/ช่องกรอก + เคอร์เซอร์รอ) แล้วคืนสภาพเมื่อเสร็จ"""
+    if getattr(page, "_auth_job", None) is not None: return   # กดซ้ำระหว่างรอ
+    job = AuthJob(fn, *args)
+    page._auth_job = job.signals
+    old_text = busy_button.text()
+    for w in busy_widgets: w.setEnabled(False)
+    busy_button.setText(busy_text)
+    QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+
+    def _restore():
+        page._auth_job = None
+        QApplication.restoreOverrideCursor()
+        busy_button.setText(old_text)
+        for w in busy_widgets: w.setEnabled(True)
+
+    def _finished(result):
+        _restore(); on_done(result)
+
+    def _failed(err):
+        _restore(); QMessageBox.critical(page, "DB Error", f"ติดต่อฐานข้อมูลไม่สำเร็จ: {err}")
+
+    job.signals.finished.connect(_finished)
+    job.signals.failed.connect(_failed)
+    QThreadPool.globalInstance().start(job)
+
 # =========================================================
 #   CROP UI — free-move with Qt6-safe wheelEvent (ตัดทอนเพื่อความกระชับ)
 # =========================================================
@@ -374,24 +428,23 @@ def make_eye_button(for_lineedit: QLineEdit) -> QPushButton:
 # =========================================================
 #   Pages (Sign In / Sign Up) (ตัดทอนเพื่อความกระชับ)
 # =========================================================
-def build_signin_page(family: str):
+def build_signin_page(family: str, on_signed_in=None):
+    """on_signed_in(username, role): ให้ app_shell เปิดหน้าจอต่อใน process เดียวกัน — None = เปิด home.py/admin.py เป็น process ใหม่"""
     page = QFrame()
     root = QHBoxLayout(page); root.setContentsMargins(0,0,0,0); root.setSpacing(0)
 
     left = QFrame(); left.setStyleSheet("background:#f8f5ef;")
     lbox = QVBoxLayout(left); lbox.setContentsMargins(0,0,0,0)
     bus_lbl = QLabel(alignment=Qt.AlignmentFlag.AlignCenter)
-    bus_src = QPixmap(BUS_SIGNIN) if os.path.exists(BUS_SIGNIN) else QPixmap()
+    bus_src = assets.pixmap(BUS_SIGNIN)
     if not bus_src.isNull(): bus_lbl.setPixmap(bus_src)
     lbox.addWidget(bus_lbl); root.addWidget(left, 3)
 
     def _left_resize(ev):
         if not bus_src.isNull():
             w, h = max(1,left.width()), max(1,left.height())
-            scaled = bus_src.scaled(w, h, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                                            Qt.TransformationMode.SmoothTransformation)
-            x = max(0,(scaled.width()-w)//2); y=max(0,(scaled.height()-h)//2)
-            bus_lbl.setPixmap(scaled.copy(x,y,w,h))
+            # เต็มกรอบแล้วตัดส่วนเกิน — ขนาดเปลี่ยนตามการลากหน้าต่าง จึงเก็บแค่ในหน่วยความจำ
+            bus_lbl.setPixmap(assets.pixmap(BUS_SIGNIN, w, h, assets.COVER, crop=True, disk=False))
         QFrame.resizeEvent(left, ev)
     left.resizeEvent = _left_resize
 
@@ -448,14 +501,20 @@ def build_signin_page(family: str):
         if not QRegularExpression(r"^[\x20-\x7E]+$").match(p).hasMatch():
             QMessageBox.warning(page,"Sign in","รหัสผ่านรับเฉพาะอักขระภาษาอังกฤษ/ตัวเลข (ASCII)"); return
         
-        row = load_user_for_login(u)
+        # ตรวจรหัสผ่าน (bcrypt) บน worker thread แล้วทำต่อใน _signin_done
+        start_auth_job(page, (user, pwd, btn_signin, btn_signin_bottom), btn_signin_bottom, "CHECKING…",
+                       authenticate, (u, p), _signin_done)
+
+    def _signin_done(result):
+        status, row = result
+        if status == "no_user": QMessageBox.warning(page,"Sign in","ไม่พบบัญชีนี้"); return
+        if status == "bad_password": QMessageBox.warning(page,"Sign in","รหัสผ่านไม่ถูกต้อง"); return
         
-        if not row: QMessageBox.warning(page,"Sign in","ไม่พบบัญชีนี้"); return
-        
-        _, uname, _, pw_hash, _, role, _ = row
-        
-        if not check_password(p, pw_hash): QMessageBox.warning(page,"Sign in","รหัสผ่านไม่ถูกต้อง"); return
+        _, uname, _, _, _, role, _ = row
         
+        if on_signed_in is not None:
+            on_signed_in(uname, role); return
+
         # เปิด Admin.py ถ้าเป็น Admin
         if role == 'admin' and os.path.exists(ADMIN_PY):
              _open_next(ADMIN_PY, uname)
@@ -484,7 +543,7 @@ def build_signup_page(family: str):
 
     left = QFrame(); left.setStyleSheet("background:#f8f5ef;")
     lbox = QVBoxLayout(left); lbox.setContentsMargins(0,0,0,0)
-    bus_pix = QPixmap(BUS_SIGNUP) if os.path.exists(BUS_SIGNUP) else QPixmap()
+    bus_pix = assets.pixmap(BUS_SIGNUP)
     bus_lbl = QLabel(alignment=Qt.AlignmentFlag.AlignCenter)
     if not bus_pix.isNull(): bus_lbl.setPixmap(bus_pix)
     lbox.addWidget(bus_lbl); root.addWidget(left, 3)
@@ -492,8 +551,7 @@ def build_signup_page(family: str):
     def _l_resize(ev):
         if not bus_pix.isNull():
             w, h = max(1,left.width()), max(1,left.height())
-            bus_lbl.setPixmap(bus_pix.scaled(w, h, Qt.AspectRatioMode.KeepAspectRatio,
-                                             Qt.TransformationMode.SmoothTransformation))
+            bus_lbl.setPixmap(assets.pixmap(BUS_SIGNUP, w, h, disk=False))
         QFrame.resizeEvent(left, ev)
     left.resizeEvent = _l_resize
 
@@ -503,7 +561,7 @@ def build_signup_page(family: str):
     tabs = QHBoxLayout(); tabs.setSpacing(24)
     btn_si = QPushButton("SIGN IN"); btn_su = QPushButton("SIGN UP")
     for b in (btn_si, btn_su):
-        b.setCursor(Qt.CursorShape.PointingHandCursor); b.setFont(QFont(load_rubik(), 22, int(QFont.Weight.Bold)))
+        b.setCursor(Qt.CursorShape.PointingHandCursor); b.setFont(QFont(assets.load_fonts(), 22, int(QFont.Weight.Bold)))
         b.setFixedHeight(60); b.setMinimumWidth(220)
     style_tab_inactive(btn_si); style_tab_active(btn_su)
     tabs.addWidget(btn_si); tabs.addWidget(btn_su); tabs.addStretch(1)
@@ -586,7 +644,12 @@ def build_signup_page(family: str):
             try: os.replace(page._profile_path, prof_out)
             except: prof_out = page._profile_path
 
-        ok, msg = register_user(u, e, p, prof_out)
+        # hash รหัสผ่าน + บันทึก บน worker thread
+        start_auth_job(page, (inp_username, inp_email, inp_password, btn_upload, btn_signup), btn_signup, "SAVING…",
+                       register_user, (u, e, p, prof_out), _signup_done)
+
+    def _signup_done(result):
+        ok, msg = result
         QMessageBox.information(page, "Sign Up", msg)
         if ok: page.parent().parent().switch_to("signin")
 
@@ -607,14 +670,14 @@ def build_signup_page(family: str):
 #   Main Window (ตัดทอนเพื่อความกระชับ)
 # =========================================================
 class AuthWindow(QWidget):
-    def __init__(self):
+    def __init__(self, on_signed_in=None):
         super().__init__()
         self.setWindowTitle("Go with CREPE — Authentication"); self.resize(1366, 768)
-        self.family = load_rubik(); QApplication.instance().setFont(QFont(self.family, 11))
+        self.family = assets.load_fonts(); QApplication.instance().setFont(QFont(self.family, 11))
 
         root = QHBoxLayout(self); root.setContentsMargins(0,0,0,0); root.setSpacing(0)
         self.stack = QStackedWidget()
-        self.page_signin = build_signin_page(self.family)
+        self.page_signin = build_signin_page(self.family, on_signed_in)
         self.page_signup = build_signup_page(self.family)
         self.stack.addWidget(self.page_signin); self.stack.addWidget(self.page_signup)
         root.addWidget(self.stack)
@@ -638,16 +701,19 @@ class AuthWindow(QWidget):
 #   Run
 # =========================================================
 if __name__ == "__main__":
-    if not QApplication.instance():
-        app = QApplication(sys.argv)
-    else:
-        app = QApplication.instance()
+    with startup_trace.span("QApplication"):
+        if not QApplication.instance():
+            app = QApplication(sys.argv)
+        else:
+            app = QApplication.instance()
         
     app.setQuitOnLastWindowClosed(False)
-    warn_missing_libs(None)
+    with startup_trace.span("warn_missing_libs"):
+        warn_missing_libs(None)
     try:
         # Initial DB setup for users table and admin account
-        init_db(DB_PATH_ABS)
+        with startup_trace.span("init_db"):
+            init_db(DB_PATH_ABS)
     except Exception as e:
         QMessageBox.critical(None, "Database Error", f"ไม่สามารถเตรียมฐานข้อมูลได้:\n{e}"); sys.exit(1)
 
@@ -656,5 +722,8 @@ if __name__ == "__main__":
     if not os.path.exists(ADMIN_PY):
         QMessageBox.warning(None, "Path Warning", "ไม่พบไฟล์ปลายทางสำหรับ Admin:\n" + ADMIN_PY)
 
-    win = AuthWindow(); win.show()
+    with startup_trace.span("AuthWindow()"):
+        win = AuthWindow()
+    startup_trace.first_paint(win, "login")
+    win.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,560 @@
+# migrations.py — Go with CREPE
+# โครงสร้างฐานข้อมูลทุกไฟล์รวมไว้ที่เดียว เป็นรายการขั้น migration ต่อไฟล์ (ลำดับในรายการ = เลข PRAGMA user_version)
+# - PASSENGER_MIGRATIONS : passenger_bookings.db (home.py / admin.py)
+# - ADMIN_MIGRATIONS     : users.db (admin.py / home.py / ticket_export.py)
+# - AUTH_MIGRATIONS      : ฐานข้อมูลบัญชีผู้ใช้ของ login.py
+# - เรียก migrate() ครั้งเดียวตอนเริ่มโปรแกรม ไฟล์ที่เป็นเวอร์ชันล่าสุดแล้วอ่านแค่ user_version แล้วจบ
+# - แต่ละขั้นรันใน transaction ของตัวเอง (BEGIN IMMEDIATE) พร้อมเลื่อน user_version — สำเร็จทั้งขั้นหรือไม่เปลี่ยนเลย
+# - DB เก่าก่อนมีระบบนี้ (user_version = 0) ขั้นแรก ๆ จึงตรวจตาราง/คอลัมน์ที่มีอยู่ก่อนสร้าง
+# ห้ามแก้ลำดับ/ลบขั้นที่ปล่อยไปแล้ว — เปลี่ยนโครงสร้างใหม่ให้เพิ่มขั้นต่อท้ายรายการ
+
+import os, random, sqlite3
+import db_manager
+
+def _script(con, sql: str):
+    """รันหลายคำสั่งใน transaction ปัจจุบัน (executescript จะ COMMIT ให้เองก่อน จึงใช้ในขั้น migration ไม่ได้)"""
+    buf = ""
+    for line in sql.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            con.execute(buf); buf = ""
+    if buf.strip():
+        con.execute(buf)
+
+def _columns(con, table: str) -> list[str]:
+    return [info[1] for info in con.execute(f"PRAGMA table_info({table})")]
+
+def _has_table(con, name: str) -> bool:
+    return con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone() is not None
+
+# เลขเวอร์ชันของข้อมูลเส้นทาง (มีในทั้ง 2 ไฟล์ DB) — Trigger เพิ่มค่าทุกครั้งที่ตารางเส้นทางถูกแก้ไข
+CATALOG_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0);
+"""
+
+def _catalog_triggers_ddl(table: str) -> str:
+    return "".join(f"""
+CREATE TRIGGER IF NOT EXISTS trg_{table}_{ev.lower()}_catalog AFTER {ev} ON {table}
+BEGIN UPDATE catalog_version SET version = version + 1 WHERE id = 1; END;
+""" for ev in ("INSERT", "UPDATE", "DELETE"))
+
+# =====================================================================
+#   passenger_bookings.db
+# =====================================================================
+
+# โครงสร้างตาราง passenger_bookings: เก็บ origin/dest/dep_time เป็นคอลัมน์จริง (ใช้ Index ได้)
+PASSENGER_BOOKINGS_DDL = """
+CREATE TABLE IF NOT EXISTS passenger_bookings (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    first_name      TEXT NOT NULL,
+    last_name       TEXT NOT NULL,
+    phone           TEXT NOT NULL,
+    citizen_id      TEXT NOT NULL,
+    email           TEXT,
+
+    travel_date     TEXT NOT NULL,     -- yyyy-MM-dd
+    origin          TEXT NOT NULL,     -- จังหวัดต้นทาง เช่น 'ขอนแก่น'
+    dest            TEXT NOT NULL,     -- จังหวัดปลายทาง
+    dep_time        TEXT NOT NULL,     -- เวลาออก เช่น '09:00'
+    trip_info_json  TEXT NOT NULL,     -- ข้อมูลเที่ยวรถเต็ม (arr_time, price) สำหรับแสดงผล
+    seat_code       TEXT NOT NULL,
+    is_booked       INTEGER DEFAULT 1,
+    ticket_no       TEXT,
+
+    created_at      TEXT DEFAULT CURRENT_TIMESTAMP,
+
+    -- 1 ที่นั่ง ต่อ 1 เที่ยวรถ (วันที่ + ปลายทาง + เวลาออก)
+    UNIQUE(travel_date, dest, dep_time, seat_code)
+);
+"""
+
+# Index แบบ partial เฉพาะแถวที่จองแล้ว และครอบคลุม seat_code/is_booked (COVERING INDEX ไม่ต้องอ่านตารางจริง)
+PASSENGER_BOOKINGS_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_pb_trip_booked
+    ON passenger_bookings(travel_date, dest, dep_time, seat_code, is_booked)
+    WHERE is_booked = 1;
+CREATE INDEX IF NOT EXISTS idx_pb_ticket_no ON passenger_bookings(ticket_no);
+"""
+
+# ตารางล็อกที่นั่งชั่วคราว (1 แถว ต่อ 1 ที่นั่งที่ถูกเลือกค้างไว้)
+SEAT_HOLDS_DDL = """
+CREATE TABLE IF NOT EXISTS seat_holds (
+    travel_date     TEXT NOT NULL,
+    dest            TEXT NOT NULL,
+    dep_time        TEXT NOT NULL,
+    seat_code       TEXT NOT NULL,
+    session_id      TEXT NOT NULL,     -- ตัวระบุการจองของหน้าจอที่ถือที่นั่งอยู่
+    expires_at      REAL NOT NULL,     -- เวลา unix (วินาที) ที่ล็อกหมดอายุ
+    PRIMARY KEY (travel_date, dest, dep_time, seat_code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_seat_holds_session ON seat_holds(session_id);
+CREATE INDEX IF NOT EXISTS idx_seat_holds_expires ON seat_holds(expires_at);
+"""
+
+def _p1_passenger_bookings(con):
+    """ตาราง passenger_bookings — DB รุ่นเก่า: เพิ่ม ticket_no และย้าย trip_info_json (LIKE) ไปเป็นคอลัมน์ origin/dest/dep_time"""
+    cols = _columns(con, "passenger_bookings")
+    if not cols:
+        _script(con, PASSENGER_BOOKINGS_DDL); return
+    if "ticket_no" not in cols:
+        con.execute("ALTER TABLE passenger_bookings ADD COLUMN ticket_no TEXT")
+    if "dest" in cols:
+        return
+    # สร้างตารางใหม่เพื่อลบ UNIQUE(travel_date, trip_info_json, seat_code) เดิมออก
+    # ต้นทางในตารางใหม่เก็บเฉพาะชื่อจังหวัด (ตรงกับ bookings.route_from ของ Admin)
+    con.execute("ALTER TABLE passenger_bookings RENAME TO passenger_bookings_old")
+    _script(con, PASSENGER_BOOKINGS_DDL)
+    copied = con.execute("""
+        INSERT OR IGNORE INTO passenger_bookings (
+            id, first_name, last_name, phone, citizen_id, email,
+            travel_date, origin, dest, dep_time, trip_info_json,
+            seat_code, is_booked, ticket_no, created_at
+        )
+        SELECT id, first_name, last_name, phone, citizen_id, email,
+               travel_date,
+               CASE WHEN instr(o, ' ') > 0 THEN substr(o, 1, instr(o, ' ') - 1) ELSE o END,
+               d, t, trip_info_json,
+               seat_code, is_booked, ticket_no, created_at
+        FROM (
+            SELECT *,
+                   COALESCE(json_extract(trip_info_json, '$.origin'), '')   AS o,
+                   COALESCE(json_extract(trip_info_json, '$.dest'), '')     AS d,
+                   COALESCE(json_extract(trip_info_json, '$.dep_time'), '') AS t
+            FROM passenger_bookings_old
+        )
+        ORDER BY id
+    """).rowcount
+    # แถวที่ชนกันด้วย key ใหม่ (ต่างกันแค่ trip_info_json หรือไม่มี dest/dep_time) ห้ามหายเงียบ ๆ: เก็บไว้ตรวจเอง
+    total = con.execute("SELECT COUNT(*) FROM passenger_bookings_old").fetchone()[0]
+    if copied != total:
+        con.execute("""
+            CREATE TABLE passenger_bookings_conflicts AS
+            SELECT * FROM passenger_bookings_old
+            WHERE id NOT IN (SELECT id FROM passenger_bookings)
+        """)
+        print(f"WARNING: {total - copied} legacy passenger_bookings rows collide on (travel_date, dest, dep_time, seat_code)"
+              " — kept in passenger_bookings_conflicts")
+    con.execute("DROP TABLE passenger_bookings_old")
+
+def _p2_passenger_indexes(con):
+    """Index ค้นหาที่นั่งที่จองแล้วต่อเที่ยว + ค้นหาตามเลขตั๋ว"""
+    _script(con, PASSENGER_BOOKINGS_INDEXES)
+
+def _p3_seat_holds(con):
+    """ตารางล็อกที่นั่งชั่วคราว seat_holds"""
+    _script(con, SEAT_HOLDS_DDL)
+
+def _p4_route_info(con):
+    """ตาราง route_info (เส้นทางสำรองจาก import_routes.py) + catalog_version และ Trigger"""
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS route_info (
+            province_th TEXT PRIMARY KEY,
+            price INTEGER NOT NULL,
+            arrivals_json TEXT NOT NULL
+        )
+    """)
+    _script(con, CATALOG_VERSION_DDL + _catalog_triggers_ddl("route_info"))
+
+PASSENGER_MIGRATIONS = [
+    _p1_passenger_bookings,
+    _p2_passenger_indexes,
+    _p3_seat_holds,
+    _p4_route_info,
+]
+
+# =====================================================================
+#   users.db
+# =====================================================================
+
+def _a1_core_tables(con):
+    """
+    ตาราง users, bookings (สรุปการจองที่ home.py บันทึก), payments และ routes
+    bookings ที่ home.py รุ่นเก่าสร้างไว้ก่อน (ไม่มี user_id/created_at) ได้คอลัมน์ที่ขาดเพิ่ม — ALTER เพิ่ม default แบบฟังก์ชันไม่ได้ จึงเป็นค่าว่าง
+    """
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'user',
+        phone TEXT,
+        email TEXT,
+        created_at TEXT DEFAULT (DATE('now'))
+    )
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticket_no TEXT UNIQUE NOT NULL,
+        user_id INTEGER,
+        customer_name TEXT NOT NULL,
+        route_from TEXT NOT NULL,
+        route_to TEXT NOT NULL,
+        date TEXT NOT NULL,          -- YYYY-MM-DD
+        status TEXT NOT NULL,        -- รอดำเนินการ/ยืนยัน/เรียบร้อย/ยกเลิก
+        phone TEXT,
+        email TEXT,
+        seat TEXT,
+        seat_count INTEGER NOT NULL DEFAULT 0,
+        price REAL,
+        vat REAL,
+        slip_path TEXT,
+        dep_time TEXT,
+        arr_time TEXT,
+        created_at TEXT DEFAULT (DATETIME('now')),
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE SET NULL
+    )
+    """)
+    cols = _columns(con, "bookings")
+    if "user_id" not in cols:
+        con.execute("ALTER TABLE bookings ADD COLUMN user_id INTEGER REFERENCES users(id) ON DELETE SET NULL")
+    if "created_at" not in cols:
+        con.execute("ALTER TABLE bookings ADD COLUMN created_at TEXT")
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        booking_id INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        method TEXT,
+        paid_at TEXT DEFAULT (DATETIME('now')),
+        note TEXT,
+        FOREIGN KEY(booking_id) REFERENCES bookings(id) ON DELETE CASCADE
+    )
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS routes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        route_from TEXT NOT NULL,
+        route_to TEXT NOT NULL,
+        departure_time TEXT NOT NULL, -- เช่น '07:00'
+        duration TEXT,                -- เช่น '4:00 ชม.'
+        capacity INTEGER NOT NULL DEFAULT 40,
+        UNIQUE(route_from, route_to, departure_time) -- ไม่ให้มีเที่ยวซ้ำกัน
+    )
+    """)
+
+# ที่นั่งของแต่ละการจอง 1 แถวต่อ 1 ที่นั่ง (bookings.seat เดิมยังเก็บข้อความไว้แสดงผล)
+BOOKING_SEATS_DDL = """
+CREATE TABLE IF NOT EXISTS booking_seats (
+    booking_id  INTEGER NOT NULL REFERENCES bookings(id) ON DELETE CASCADE,
+    seat_code   TEXT NOT NULL,
+    PRIMARY KEY (booking_id, seat_code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_booking_seats_seat ON booking_seats(seat_code);
+CREATE TRIGGER IF NOT EXISTS trg_bookings_seats_ad AFTER DELETE ON bookings BEGIN
+    DELETE FROM booking_seats WHERE booking_id = old.id;
+END;
+"""
+
+def _a2_booking_seats(con):
+    """bookings.seat_count + ตาราง booking_seats — DB เก่า backfill จากข้อความ seat ("A1, A2") เดิม"""
+    backfill = "seat_count" not in _columns(con, "bookings")
+    if backfill:
+        con.execute("ALTER TABLE bookings ADD COLUMN seat_count INTEGER NOT NULL DEFAULT 0")
+    _script(con, BOOKING_SEATS_DDL)
+    if not backfill:
+        return
+    con.execute("""
+        INSERT OR IGNORE INTO booking_seats (booking_id, seat_code)
+        WITH RECURSIVE split(booking_id, part, rest) AS (
+            SELECT id, '', COALESCE(seat, '') || ',' FROM bookings
+            UNION ALL
+            SELECT booking_id, trim(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+            FROM split WHERE rest <> ''
+        )
+        SELECT booking_id, part FROM split WHERE part <> ''
+    """)
+    con.execute("UPDATE bookings SET seat_count = (SELECT COUNT(*) FROM booking_seats WHERE booking_id = bookings.id)")
+
+# เลขตั๋วที่ถูกเปลี่ยนตอนสร้าง UNIQUE index (DB เก่ามีเลขซ้ำ) — applied = 0 คือยังไม่ได้แก้ใน passenger_bookings.db
+TICKET_RENUMBERED_DDL = """
+CREATE TABLE IF NOT EXISTS ticket_no_renumbered (
+    booking_id    INTEGER PRIMARY KEY,
+    old_ticket_no TEXT NOT NULL,
+    new_ticket_no TEXT NOT NULL,
+    applied       INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def _renumber_duplicate_tickets(con) -> int:
+    """เลขตั๋วซ้ำใน bookings: id ต่ำสุดได้เลขเดิม ที่เหลือได้เลขสุ่มใหม่ (บันทึกลง ticket_no_renumbered) คืนจำนวนที่เปลี่ยน"""
+    dups = con.execute("""
+        SELECT id, ticket_no FROM (
+            SELECT id, ticket_no, ROW_NUMBER() OVER (PARTITION BY ticket_no ORDER BY id) AS n
+            FROM bookings WHERE ticket_no IS NOT NULL
+        ) WHERE n > 1 ORDER BY id
+    """).fetchall()
+    if not dups:
+        return 0
+    _script(con, TICKET_RENUMBERED_DDL)
+    used = {t for (t,) in con.execute("SELECT DISTINCT ticket_no FROM bookings WHERE ticket_no IS NOT NULL")}
+    for booking_id, old in dups:
+        new = str(random.randint(10_000_000, 99_999_999))   # รูปแบบเดียวกับ booking_core.new_ticket_no
+        while new in used:
+            new = str(random.randint(10_000_000, 99_999_999))
+        used.add(new)
+        con.execute("UPDATE bookings SET ticket_no = ? WHERE id = ?", (new, booking_id))
+        con.execute("INSERT OR REPLACE INTO ticket_no_renumbered (booking_id, old_ticket_no, new_ticket_no) VALUES (?, ?, ?)",
+                    (booking_id, old, new))
+    print(f"WARNING: bookings.ticket_no had duplicates; renumbered {len(dups)} booking(s) (see ticket_no_renumbered)")
+    return len(dups)
+
+def _a3_ticket_no_unique(con):
+    """UNIQUE index ของ bookings.ticket_no (กันเลขตั๋วซ้ำตอนสุ่ม) — DB เก่าที่มีเลขซ้ำ จะเปลี่ยนเลขของรายการที่ซ้ำก่อน"""
+    for _, name, unique, *_ in con.execute("PRAGMA index_list(bookings)"):
+        cols = [r[2] for r in con.execute(f"PRAGMA index_info('{name}')")]
+        if unique and cols == ["ticket_no"]:
+            return
+    _renumber_duplicate_tickets(con)
+    con.execute("DROP INDEX IF EXISTS idx_bookings_ticket_no_dup")
+    con.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_ticket_no ON bookings(ticket_no)")
+
+# ดัชนีค้นหาแบบ Full-text ของ bookings (FTS5, rowid = bookings.id) ซิงก์ด้วย Trigger
+# categories รวม M* เพื่อไม่ให้สระ/วรรณยุกต์ไทยตัดคำกลางคำ, prefix ช่วยให้ค้นหาแบบพิมพ์ไปเรื่อย ๆ เร็วขึ้น
+BOOKINGS_FTS_DDL = """
+CREATE VIRTUAL TABLE bookings_fts USING fts5(
+    ticket_no, customer_name, route, date, status,
+    tokenize = "unicode61 categories 'L* N* Co M*'",
+    prefix = '1 2 3'
+);
+"""
+BOOKINGS_FTS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_bookings_fts_ai AFTER INSERT ON bookings BEGIN
+    INSERT INTO bookings_fts(rowid, ticket_no, customer_name, route, date, status)
+    VALUES (new.id, new.ticket_no, new.customer_name, new.route_from || ' - ' || new.route_to, new.date, new.status);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bookings_fts_ad AFTER DELETE ON bookings BEGIN
+    DELETE FROM bookings_fts WHERE rowid = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bookings_fts_au
+AFTER UPDATE OF ticket_no, customer_name, route_from, route_to, date, status ON bookings BEGIN
+    DELETE FROM bookings_fts WHERE rowid = old.id;
+    INSERT INTO bookings_fts(rowid, ticket_no, customer_name, route, date, status)
+    VALUES (new.id, new.ticket_no, new.customer_name, new.route_from || ' - ' || new.route_to, new.date, new.status);
+END;
+"""
+
+def _a4_bookings_fts(con):
+    """bookings_fts + Trigger และ backfill ข้อมูลเดิม (ข้ามถ้า SQLite ไม่มี FTS5 — หน้าค้นหาใช้ LIKE แทน)"""
+    if not _has_table(con, "bookings_fts"):
+        try:
+            con.execute(BOOKINGS_FTS_DDL)
+        except sqlite3.OperationalError as e:
+            print(f"WARNING: FTS5 not available, booking search falls back to LIKE ({e})")
+            return
+        con.execute("""
+        INSERT INTO bookings_fts(rowid, ticket_no, customer_name, route, date, status)
+        SELECT id, ticket_no, customer_name, route_from || ' - ' || route_to, date, status FROM bookings
+        """)
+    _script(con, BOOKINGS_FTS_TRIGGERS)
+
+# ตารางสรุปรายวันต่อเที่ยว (ไม่นับสถานะ ยกเลิก) สำหรับ Dashboard — Trigger บน bookings อัปเดตให้ทุกครั้ง
+_STATS_SEATS = "COALESCE({r}.seat_count, 0)"
+_STATS_REVENUE = "COALESCE({r}.price, 0) + COALESCE({r}.vat, {r}.price * 0.07, 0)"
+_STATS_KEY = "COALESCE({r}.date, ''), COALESCE({r}.route_from, ''), COALESCE({r}.route_to, ''), COALESCE({r}.dep_time, '')"
+_STATS_MATCH = ("date = COALESCE({r}.date, '') AND route_from = COALESCE({r}.route_from, '') "
+                "AND route_to = COALESCE({r}.route_to, '') AND dep_time = COALESCE({r}.dep_time, '')")
+
+DAILY_ROUTE_STATS_DDL = """
+CREATE TABLE daily_route_stats (
+    date        TEXT NOT NULL,
+    route_from  TEXT NOT NULL,
+    route_to    TEXT NOT NULL,
+    dep_time    TEXT NOT NULL,
+    orders      INTEGER NOT NULL DEFAULT 0,
+    seats       INTEGER NOT NULL DEFAULT 0,
+    revenue     REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (date, route_from, route_to, dep_time)
+) WITHOUT ROWID;
+"""
+
+def _stats_add_sql(r: str) -> str:
+    return f"""
+    INSERT INTO daily_route_stats (date, route_from, route_to, dep_time, orders, seats, revenue)
+    VALUES ({_STATS_KEY.format(r=r)}, 1, {_STATS_SEATS.format(r=r)}, {_STATS_REVENUE.format(r=r)})
+    ON CONFLICT (date, route_from, route_to, dep_time) DO UPDATE SET
+        orders = orders + excluded.orders, seats = seats + excluded.seats, revenue = revenue + excluded.revenue;"""
+
+def _stats_sub_sql(r: str) -> str:
+    return f"""
+    UPDATE daily_route_stats SET
+        orders = orders - 1, seats = seats - ({_STATS_SEATS.format(r=r)}), revenue = revenue - ({_STATS_REVENUE.format(r=r)})
+    WHERE {_STATS_MATCH.format(r=r)};
+    DELETE FROM daily_route_stats WHERE {_STATS_MATCH.format(r=r)} AND orders <= 0;"""
+
+DAILY_ROUTE_STATS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_bookings_stats_ai AFTER INSERT ON bookings
+    WHEN new.status <> 'ยกเลิก' BEGIN {_stats_add_sql("new")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_bookings_stats_ad AFTER DELETE ON bookings
+    WHEN old.status <> 'ยกเลิก' BEGIN {_stats_sub_sql("old")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_bookings_stats_au_old
+    AFTER UPDATE OF date, route_from, route_to, dep_time, status, seat_count, price, vat ON bookings
+    WHEN old.status <> 'ยกเลิก' BEGIN {_stats_sub_sql("old")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_bookings_stats_au_new
+    AFTER UPDATE OF date, route_from, route_to, dep_time, status, seat_count, price, vat ON bookings
+    WHEN new.status <> 'ยกเลิก' BEGIN {_stats_add_sql("new")} END""",
+]
+
+def _a5_daily_route_stats(con):
+    """daily_route_stats + Trigger และ backfill จาก bookings เดิม"""
+    if _has_table(con, "daily_route_stats"):
+        # Trigger รุ่นก่อนนับที่นั่งจากข้อความ seat: สร้างใหม่ให้ใช้ seat_count
+        row = con.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND name='trg_bookings_stats_ai'").fetchone()
+        if row and "seat_count" not in row[0]:
+            for name in ("ai", "ad", "au_old", "au_new"):
+                con.execute(f"DROP TRIGGER IF EXISTS trg_bookings_stats_{name}")
+    else:
+        con.execute(DAILY_ROUTE_STATS_DDL)
+        con.execute(f"""
+        INSERT INTO daily_route_stats (date, route_from, route_to, dep_time, orders, seats, revenue)
+        SELECT {_STATS_KEY.format(r="b")}, COUNT(*), SUM({_STATS_SEATS.format(r="b")}), SUM({_STATS_REVENUE.format(r="b")})
+        FROM bookings b WHERE b.status <> 'ยกเลิก'
+        GROUP BY 1, 2, 3, 4
+        """)
+    for stmt in DAILY_ROUTE_STATS_TRIGGERS:
+        con.execute(stmt)
+
+def _a6_bookings_list_index(con):
+    """ลำดับเริ่มต้นของตาราง Booking & Payment (วันที่ใหม่ -> เก่า) อ่านตาม index ได้ทันที"""
+    con.execute("CREATE INDEX IF NOT EXISTS idx_bookings_list_date ON bookings(COALESCE(date, ''), id)")
+
+def _a7_routes_catalog_version(con):
+    """catalog_version + Trigger บน routes: หน้าลูกค้า (booking_core.RouteCatalog) ใช้ตรวจว่าต้องโหลดเส้นทางใหม่หรือไม่"""
+    _script(con, CATALOG_VERSION_DDL + _catalog_triggers_ddl("routes"))
+
+def _a8_seed_admin(con):
+    """บัญชี admin เริ่มต้นของ Admin Console"""
+    if con.execute("SELECT COUNT(*) FROM users WHERE username='admin'").fetchone()[0] == 0:
+        con.execute(
+            "INSERT INTO users(username, password_hash, role, email) VALUES(?,?,?,?)",
+            ("admin", "Admin1234 (replace with hash)", "admin", "admin@example.com")
+        )
+
+def _a9_routes_layout(con):
+    """routes.layout = แบบรถของเที่ยว (ชื่อใน seat_layout.TEMPLATES) ใช้สร้างผังที่นั่งคู่กับ capacity"""
+    if "layout" not in _columns(con, "routes"):
+        con.execute("ALTER TABLE routes ADD COLUMN layout TEXT NOT NULL DEFAULT '2+2'")
+
+# index ของคอลัมน์อื่นในตาราง Booking & Payment — นิพจน์ต้องตรงกับ admin.BOOKING_SORT_KEYS ทุกตัวอักษร (ไม่มี "b.")
+# ไม่เช่นนั้น SQLite จะ SCAN + TEMP B-TREE ทุกครั้งที่ fetchMore
+BOOKINGS_SORT_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_bookings_list_ticket ON bookings(COALESCE(ticket_no, ''), id);
+CREATE INDEX IF NOT EXISTS idx_bookings_list_name   ON bookings(COALESCE(customer_name, ''), id);
+CREATE INDEX IF NOT EXISTS idx_bookings_list_route  ON bookings(COALESCE(route_from, '') || ' - ' || COALESCE(route_to, ''), id);
+CREATE INDEX IF NOT EXISTS idx_bookings_list_status ON bookings(COALESCE(status, ''), id);
+CREATE INDEX IF NOT EXISTS idx_bookings_list_total  ON bookings(COALESCE(price, 0) + COALESCE(vat, 0), id);
+"""
+
+def _a10_ticket_no_unique_renumber(con):
+    """DB ที่ผ่าน a3 รุ่นก่อน (มีเลขซ้ำแล้วได้ index ธรรมดา idx_bookings_ticket_no_dup): เปลี่ยนเลขที่ซ้ำแล้วสร้าง UNIQUE index"""
+    _a3_ticket_no_unique(con)
+
+def _a11_bookings_sort_indexes(con):
+    """เรียงตาราง Booking & Payment ตามคอลัมน์ไหนก็อ่านตาม index (คู่กับ idx_bookings_list_date ของ a6)"""
+    _script(con, BOOKINGS_SORT_INDEXES)
+
+ADMIN_MIGRATIONS = [
+    _a1_core_tables,
+    _a2_booking_seats,
+    _a3_ticket_no_unique,
+    _a4_bookings_fts,
+    _a5_daily_route_stats,
+    _a6_bookings_list_index,
+    _a7_routes_catalog_version,
+    _a8_seed_admin,
+    _a9_routes_layout,
+    _a10_ticket_no_unique_renumber,
+    _a11_bookings_sort_indexes,
+]
+
+# =====================================================================
+#   ฐานข้อมูลบัญชีผู้ใช้ (login.py)
+# =====================================================================
+
+def _u1_users(con):
+    """ตาราง users ของหน้า Sign In / Sign Up (รหัสผ่านเป็น bcrypt)"""
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS users(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username    TEXT UNIQUE,
+            email       TEXT UNIQUE,
+            pw_hash     TEXT,
+            pw_salt     TEXT,
+            role        TEXT DEFAULT 'user',
+            image_path  TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+AUTH_MIGRATIONS = [
+    _u1_users,
+]
+
+# =====================================================================
+#   Runner
+# =====================================================================
+def apply_ticket_renumbering(user_db: str, admin_db: str) -> int:
+    """
+    ใช้เลขตั๋วใหม่จาก users.db (ticket_no_renumbered) กับที่นั่งใน passenger_bookings.db — เรียกหลัง migrate ทั้งสองไฟล์
+    จับคู่ที่นั่งกับการจองด้วยเลขตั๋วเดิม + เที่ยวรถ + ที่นั่งใน booking_seats (เลขเดิมอาจซ้ำกันในวันเดียวกัน)
+    คืนจำนวนแถวใน passenger_bookings ที่เปลี่ยน (ไม่มีงานค้าง = 0 ทันที)
+    """
+    con = db_manager.connect(user_db, attach={"adm": admin_db})
+    if con.execute("SELECT 1 FROM adm.sqlite_master WHERE type='table' AND name='ticket_no_renumbered'").fetchone() is None:
+        return 0
+    if con.execute("SELECT 1 FROM adm.ticket_no_renumbered WHERE applied = 0 LIMIT 1").fetchone() is None:
+        return 0
+    match = """
+        FROM adm.ticket_no_renumbered r
+        JOIN adm.bookings b ON b.id = r.booking_id
+        JOIN adm.booking_seats s ON s.booking_id = r.booking_id
+        WHERE r.applied = 0 AND r.old_ticket_no = p.ticket_no AND b.date = p.travel_date
+          AND b.route_to = p.dest AND b.dep_time = p.dep_time AND s.seat_code = p.seat_code
+    """
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        changed = con.execute(f"""
+            UPDATE passenger_bookings AS p SET ticket_no = (SELECT r.new_ticket_no {match} LIMIT 1)
+            WHERE EXISTS (SELECT 1 {match})
+        """).rowcount
+        con.execute("UPDATE adm.ticket_no_renumbered SET applied = 1 WHERE applied = 0")
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    print(f"INFO: renumbered {changed} passenger_bookings row(s) to match bookings.ticket_no")
+    return changed
+
+def _user_version(con) -> int:
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(path: str, steps: list) -> int:
+    """
+    รันขั้นใน steps ที่ไฟล์ path ยังไม่มี (ตาม PRAGMA user_version) ทีละขั้น คืนเวอร์ชันหลังรัน
+    ถือล็อกเขียน (BEGIN IMMEDIATE) ระหว่างแต่ละขั้น และอ่านเวอร์ชันซ้ำหลังได้ล็อก — หลาย process เริ่มพร้อมกันได้
+    """
+    con = db_manager.connect(path)
+    target = len(steps)
+    version = _user_version(con)
+    if version >= target:
+        return version
+    while True:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            version = _user_version(con)
+            if version >= target:
+                con.rollback()
+                return version
+            step = steps[version]
+            step(con)
+            con.execute(f"PRAGMA user_version = {version + 1}")
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        print(f"INFO: {os.path.basename(path)} migrated to v{version + 1} ({step.__name__.lstrip('_')})")
@@ -0,0 +1,65 @@
+# seat_layout.py — Go with CREPE
+# ผังที่นั่งของรถแต่ละเที่ยว คำนวณจากความจุ (routes.capacity) + แบบรถ (routes.layout)
+# - รหัสที่นั่ง = เลขแถว + ตัวอักษรคอลัมน์ ("1A", "12D") เหมือนผังเดิม การจองเก่ายังตรงกับที่นั่งเดิม
+# - รถ 2 ชั้น นับแถวต่อเนื่องจากชั้นล่างขึ้นชั้นบน รหัสจึงไม่ซ้ำกันทั้งคัน
+# - ไม่ใช้ Qt: ใช้ได้ทั้งหน้าจอ (home.py) และฝั่ง admin / สคริปต์
+
+from functools import lru_cache
+
+DEFAULT_TEMPLATE = "2+2"
+DEFAULT_CAPACITY = 40    # ค่าเริ่มต้นเดียวกับ routes.capacity
+MAX_CAPACITY     = 80
+
+# แบบรถ -> ชั้น (ชื่อชั้น, คอลัมน์ซ้ายไปขวา "|" = ทางเดิน, จำนวนที่นั่งสูงสุดของชั้น / None = ที่เหลือทั้งหมด)
+TEMPLATES = {
+    "2+2":           (("", "AB|CD", None),),
+    "2+1":           (("", "AB|C", None),),
+    "double-decker": (("ชั้นล่าง", "AB|C", 12), ("ชั้นบน", "AB|CD", None)),
+}
+TEMPLATE_NAMES = {
+    "2+2":           "รถ 2+2 (มาตรฐาน)",
+    "2+1":           "รถ 2+1 (VIP)",
+    "double-decker": "รถ 2 ชั้น",
+}
+
+def normalize(capacity, template) -> tuple[int, str]:
+    """ค่าจาก DB -> (ความจุ, แบบรถ) ที่ใช้ได้แน่นอน (ค่าว่าง/ผิด ใช้ค่าเริ่มต้น)"""
+    try:
+        capacity = int(capacity)
+    except (TypeError, ValueError):
+        capacity = DEFAULT_CAPACITY
+    if capacity <= 0:
+        capacity = DEFAULT_CAPACITY
+    return min(capacity, MAX_CAPACITY), (template if template in TEMPLATES else DEFAULT_TEMPLATE)
+
+@lru_cache(maxsize=64)
+def build_layout(capacity: int = DEFAULT_CAPACITY, template: str = DEFAULT_TEMPLATE) -> tuple:
+    """
+    ผังที่นั่ง ((ชื่อชั้น, แถว...), ...) แต่ละแถว = (เลขแถว, ช่องซ้ายไปขวา)
+    ช่อง = รหัสที่นั่ง, None = ทางเดิน, "" = ไม่มีที่นั่ง (แถวสุดท้ายที่ไม่เต็ม)
+    """
+    capacity, template = normalize(capacity, template)
+    decks, left, row_no = [], capacity, 0
+    for title, pattern, limit in TEMPLATES[template]:
+        if left <= 0:
+            break
+        seats = left if limit is None else min(limit, left)
+        left -= seats
+        rows = []
+        while seats > 0:
+            row_no += 1
+            cells = []
+            for ch in pattern:
+                if ch == "|":
+                    cells.append(None)
+                elif seats > 0:
+                    cells.append(f"{row_no}{ch}"); seats -= 1
+                else:
+                    cells.append("")
+            rows.append((row_no, tuple(cells)))
+        decks.append((title, tuple(rows)))
+    return tuple(decks)
+
+def seat_codes(capacity: int = DEFAULT_CAPACITY, template: str = DEFAULT_TEMPLATE) -> list[str]:
+    """รหัสที่นั่งทั้งคันตามลำดับในผัง"""
+    return [c for _, rows in build_layout(capacity, template) for _, cells in rows for c in cells if c]
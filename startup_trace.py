@@ -0,0 +1,171 @@
+# startup_trace.py — Go with CREPE
+# จับเวลาช่วงเปิดโปรแกรม ตั้งแต่ process เริ่ม จนหน้าต่างแรกวาดเสร็จ (เปิดด้วย --profile-startup เท่านั้น)
+#   python home.py --profile-startup                  -> startup_trace_home_<วันเวลา>.json
+#   python admin.py --profile-startup=admin.json      -> admin.json
+#   python login.py --profile-startup --profile-startup-exit   (เขียนไฟล์แล้วปิดโปรแกรม สำหรับวัดเทียบแต่ละ release)
+# ไฟล์เป็น Chrome trace format: เปิดดูใน chrome://tracing หรือ https://ui.perfetto.dev
+# - span("ชื่อ") ครอบช่วงที่อยากรู้เวลา, first_paint(หน้าต่าง) ปิดการจับเวลาเมื่อหน้าต่างวาดครั้งแรก
+# - เวลา import ทุกโมดูลที่ใช้นาน >= IMPORT_MIN_MS ถูกบันทึกให้เอง (ต้อง import ไฟล์นี้ก่อน PyQt6)
+# ไม่ใส่ flag = ทุกฟังก์ชันในนี้ไม่ทำอะไร
+
+import os, sys, json, time, threading, builtins
+from contextlib import contextmanager
+
+FLAG      = "--profile-startup"
+EXIT_FLAG = "--profile-startup-exit"
+IMPORT_MIN_MS = 1.0     # import ที่เร็วกว่านี้ไม่บันทึก (ไม่ให้ trace รก)
+
+def _out_arg():
+    for a in sys.argv[1:]:
+        if a == FLAG:
+            return ""
+        if a.startswith(FLAG + "="):
+            return a.split("=", 1)[1]
+    return None
+
+OUT_PATH = _out_arg()
+ENABLED  = OUT_PATH is not None
+EXIT_AFTER = ENABLED and EXIT_FLAG in sys.argv
+
+def _process_age() -> tuple[float, bool]:
+    """(วินาทีตั้งแต่ process เริ่มถึงตอนนี้, รู้เวลาเริ่มจริงไหม) — ไม่รู้ = นับจากตอน import ไฟล์นี้"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/stat") as f:
+                start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+            with open("/proc/uptime") as f:
+                uptime = float(f.read().split()[0])
+            return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK")), True
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            k32 = ctypes.windll.kernel32
+            created, ex, kern, user, now = (wintypes.FILETIME() for _ in range(5))
+            if k32.GetProcessTimes(k32.GetCurrentProcess(), ctypes.byref(created), ctypes.byref(ex),
+                                   ctypes.byref(kern), ctypes.byref(user)):
+                k32.GetSystemTimeAsFileTime(ctypes.byref(now))
+                ft = lambda t: (t.dwHighDateTime << 32) | t.dwLowDateTime   # หน่วย 100 ns
+                return max(0.0, (ft(now) - ft(created)) / 1e7), True
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return 0.0, False
+
+_t0 = time.perf_counter()
+_age0, _exact_start = _process_age() if ENABLED else (0.0, False)
+_events = []
+_done = False
+_real_import = builtins.__import__
+
+def _us(t: float) -> int:
+    """perf_counter -> ไมโครวินาทีนับจาก process เริ่ม"""
+    return int((t - _t0 + _age0) * 1e6)
+
+def _add(name: str, start: float, dur: float, cat: str, **args):
+    ev = {"name": name, "cat": cat, "ph": "X", "ts": _us(start), "dur": int(dur * 1e6),
+          "pid": os.getpid(), "tid": threading.get_ident()}
+    if args:
+        ev["args"] = args
+    _events.append(ev)
+
+def mark(name: str, **args):
+    """จุดเวลาเดียว (instant event)"""
+    if ENABLED and not _done:
+        ev = {"name": name, "cat": "startup", "ph": "i", "s": "p", "ts": _us(time.perf_counter()),
+              "pid": os.getpid(), "tid": threading.get_ident()}
+        if args:
+            ev["args"] = args
+        _events.append(ev)
+
+@contextmanager
+def span(name: str, cat: str = "startup", **args):
+    """with span("init_db"): ... — บันทึกช่วงเวลาเป็น 1 แถบใน trace"""
+    if not ENABLED or _done:
+        yield
+        return
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add(name, t, time.perf_counter() - t, cat, **args)
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules or _done:
+        return _real_import(name, globals, locals, fromlist, level)
+    t = time.perf_counter()
+    try:
+        return _real_import(name, globals, locals, fromlist, level)
+    finally:
+        d = time.perf_counter() - t
+        if d * 1000 >= IMPORT_MIN_MS:
+            _add(f"import {name}", t, d, "import")
+
+if ENABLED:
+    builtins.__import__ = _timed_import
+    if _age0:
+        # ช่วงก่อนถึงโค้ดของเรา: เริ่มตัวแปลภาษา + import ที่อยู่ก่อนไฟล์นี้
+        _events.append({"name": "interpreter start", "cat": "startup", "ph": "X", "ts": 0, "dur": int(_age0 * 1e6),
+                        "pid": os.getpid(), "tid": threading.get_ident()})
+
+def _default_path(entry: str) -> str:
+    return f"startup_trace_{entry}_{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+def finish(entry: str) -> str | None:
+    """ปิดการจับเวลา เขียนไฟล์ trace คืนพาธไฟล์ (เรียกซ้ำ/ไม่ได้เปิด flag = ไม่ทำอะไร)"""
+    global _done
+    if not ENABLED or _done:
+        return None
+    now = time.perf_counter()
+    _events.append({"name": f"{entry}: process start -> first paint", "cat": "startup", "ph": "X", "ts": 0,
+                    "dur": _us(now), "pid": os.getpid(), "tid": threading.get_ident()})
+    _done = True
+    builtins.__import__ = _real_import
+
+    first_paint_ms = _us(now) / 1000
+    path = OUT_PATH or _default_path(entry)
+    trace = {
+        "traceEvents": [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": entry}}] + _events,
+        "displayTimeUnit": "ms",
+        "otherData": {
+            "entry": entry,
+            "first_paint_ms": round(first_paint_ms, 1),
+            "process_start": "exact" if _exact_start else "approx (นับจาก import startup_trace)",
+            "python": sys.version.split()[0],
+            "argv": sys.argv,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+    }
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False, indent=1)
+    except OSError as e:
+        print(f"WARNING: Could not write startup trace {path}: {e}")
+        return None
+
+    print(f"INFO: startup trace -> {path} (first paint {first_paint_ms:.0f} ms)")
+    for ev in sorted((e for e in _events if e.get("cat") == "startup" and e["ph"] == "X"), key=lambda e: e["ts"]):
+        print(f"  {ev['ts'] / 1000:8.1f} ms  {ev['dur'] / 1000:8.1f} ms  {ev['name']}")
+    return path
+
+def first_paint(win, entry: str):
+    """เรียก finish(entry) หลังหน้าต่าง win วาดครั้งแรกเสร็จ"""
+    if not ENABLED or _done:
+        return
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    class _Watch(QObject):
+        def eventFilter(self, obj, ev):
+            if ev.type() == QEvent.Type.Show:
+                mark(f"{entry}: window shown")
+            elif ev.type() == QEvent.Type.Paint:
+                obj.removeEventFilter(self)
+                QTimer.singleShot(0, _paint_done)   # หลังวาดลูก ๆ ทั้งหน้าต่างเสร็จในรอบเดียวกัน
+            return False
+
+    def _paint_done():
+        finish(entry)
+        if EXIT_AFTER:
+            QApplication.instance().quit()
+
+    win._startup_watch = _Watch(win)
+    win.installEventFilter(win._startup_watch)
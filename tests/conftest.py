@@ -0,0 +1,42 @@
+# conftest.py — Go with CREPE
+# ให้ import โมดูลของโปรเจกต์ (ไฟล์ระดับบนสุด) ได้ + DB ชั่วคราวต่อ test
+# test ทดสอบชั้น SQLite (migrations / booking_core / seat_layout) ไม่สร้างหน้าจอ
+# ฟังก์ชัน db_* ของ admin.py ต้อง import PyQt6 (ไม่มีให้ข้าม test) แต่ไม่ต้องมี QApplication
+
+import os, sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import booking_core
+import migrations
+
+TRIP = ("2026-02-01", "09:00", "อุดรธานี")   # (วันที่, เวลาออก, ปลายทาง) ลำดับเดียวกับ get_booked_seats / hold_seat
+
+def booking_data(**extra) -> dict:
+    """ข้อมูลการจองตามรูปแบบของ booking_core.save_new_booking"""
+    data = {
+        "first_name": "สมชาย", "last_name": "ใจดี", "phone": "0812345678", "citizen_id": "1234567890123",
+        "email": "a@example.com", "date": TRIP[0], "origin": "ขอนแก่น", "dest": TRIP[2], "dep_time": TRIP[1],
+        "arr_time": "11:00", "price_each": 100,
+    }
+    data.update(extra)
+    return data
+
+@pytest.fixture
+def dbs(tmp_path):
+    """passenger_bookings.db + users.db ใหม่ที่ migrate แล้ว และตั้งให้ booking_core ใช้ คืน (user_db, admin_db)"""
+    user_db, admin_db = str(tmp_path / "passenger_bookings.db"), str(tmp_path / "users.db")
+    migrations.migrate(user_db, migrations.PASSENGER_MIGRATIONS)
+    migrations.migrate(admin_db, migrations.ADMIN_MIGRATIONS)
+    booking_core.configure(user_db, admin_db)
+    return user_db, admin_db
+
+@pytest.fixture
+def admin_mod(dbs, monkeypatch):
+    """โมดูล admin ที่ชี้ไปยัง DB ชั่วคราวของ dbs"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    admin = pytest.importorskip("admin")
+    monkeypatch.setattr(admin, "DB_USER_PATH", dbs[0])
+    monkeypatch.setattr(admin, "DB_ADMIN_PATH", dbs[1])
+    return admin
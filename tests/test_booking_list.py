@@ -0,0 +1,31 @@
+# test_booking_list.py — ตาราง Booking & Payment: แบ่งหน้าแบบ keyset และทุกคอลัมน์เรียงตาม index
+
+import pytest
+
+@pytest.mark.parametrize("col", range(6))
+def test_every_sort_key_reads_an_index(admin_mod, col):
+    key = admin_mod.BOOKING_SORT_KEYS[col]
+    con = admin_mod.db_connect_admin()
+    for cmp, direction in (("<", "DESC"), (">", "ASC")):
+        plan = " ".join(r[3] for r in con.execute(f"""
+            EXPLAIN QUERY PLAN SELECT b.id, {key} AS sort_key FROM bookings b
+            WHERE {key} {cmp}= ?2 AND ({key} {cmp} ?2 OR b.id {cmp} ?3)
+            ORDER BY sort_key {direction}, b.id {direction} LIMIT ?1""", (50, "", 0)))
+        assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, plan
+
+def test_keyset_pages_cover_every_row_once(admin_mod):
+    con = admin_mod.db_connect_admin()
+    with con:
+        con.executemany("INSERT INTO bookings (ticket_no, customer_name, route_from, route_to, date, status, price, vat)"
+                        " VALUES (?, ?, 'ขอนแก่น', 'อุดรธานี', ?, 'ยืนยัน', ?, NULL)",
+                        [(str(10000000 + i), f"n{i % 4}", f"2026-01-{i % 3 + 1:02d}", i % 3 * 100)
+                         for i in range(23)])
+    for col in range(6):
+        seen, after = [], None
+        while True:
+            page = admin_mod.db_page_bookings(col, descending=col % 2 == 0, after=after, limit=5)
+            if not page:
+                break
+            seen += [r[0] for r in page]
+            after = (page[-1][-1], page[-1][0])
+        assert sorted(seen) == list(range(1, 24)), col
@@ -0,0 +1,86 @@
+# test_booking_service.py — ตรวจข้อมูลคำขอ (400), ข้อผิดพลาดที่ไม่คาดไว้ (500) และการแจ้ง eventbus
+
+import sys, json, socket, asyncio, sqlite3
+import pytest
+import booking_service
+from booking_service import ApiError, BookingService
+
+BOOK = {"date": "2026-02-01", "dest": "อุดรธานี", "dep_time": "09:00", "seats": ["1A"], "first_name": "ก",
+        "last_name": "ข", "phone": "0812345678", "citizen_id": "1234567890123", "email": "a@example.com"}
+
+def test_text_requires_non_empty_strings():
+    assert booking_service._text({"a": " x ", "b": "y"}, "a", "b") == ["x", "y"]
+    for bad in ({"a": None}, {"a": ""}, {}):
+        with pytest.raises(ApiError, match="missing: a"):
+            booking_service._text(bad, "a")
+    for bad in (5, ["x"], "   "):
+        with pytest.raises(ApiError, match="non-empty text: a"):
+            booking_service._text({"a": bad}, "a")
+
+def test_opt_text_defaults_and_types():
+    assert booking_service._opt_text({}, "k", "d") == "d"
+    assert booking_service._opt_text({"k": None}, "k", None) is None
+    assert booking_service._opt_text({"k": ""}, "k", "d") == ""
+    with pytest.raises(ApiError, match="must be non-empty text: k"):
+        booking_service._opt_text({"k": " "}, "k", "d", allow_empty=False)
+    with pytest.raises(ApiError, match="must be text: k"):
+        booking_service._opt_text({"k": 1}, "k", "d")
+
+def _call(method, target, body=b"", service=None):
+    raw = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    return asyncio.run((service or BookingService())._dispatch(method, target, raw))
+
+@pytest.mark.parametrize("method, target, body, status, error", [
+    ("POST", "/book", b"{", 400, "bad JSON"),
+    ("POST", "/book", b"[1]", 400, "body must be a JSON object"),
+    ("POST", "/book", {**BOOK, "phone": ""}, 400, "missing: phone"),
+    ("POST", "/book", {**BOOK, "first_name": 7}, 400, "non-empty text: first_name"),
+    ("POST", "/book", {**BOOK, "seats": "1A"}, 400, "seats must be a list"),
+    ("POST", "/book", {**BOOK, "origin": ""}, 400, "non-empty text: origin"),
+    ("POST", "/book", {**BOOK, "arr_time": 11}, 400, "must be text: arr_time"),
+    ("POST", "/hold", {**BOOK, "seat": ["1A"], "session": "s"}, 400, "non-empty text: seat"),
+    ("POST", "/cancel", {"ticket_no": True}, 400, "ticket_no must be text"),
+    ("GET", "/availability?dest=x&date=01-02-2026", b"", 400, "bad date"),
+    ("GET", "/book", b"", 405, "method not allowed"),
+    ("GET", "/nope", b"", 404, "not found"),
+])
+def test_bad_requests(method, target, body, status, error):
+    code, payload = _call(method, target, body)
+    assert code == status and error in payload["error"]
+
+def test_unknown_seat_is_rejected(dbs):
+    code, payload = _call("POST", "/book", {**BOOK, "seats": ["1A", "99Z"]})
+    assert (code, payload["error"]) == (400, "no seat 99Z on this trip")
+
+def test_unexpected_errors_answer_500(monkeypatch, capsys):
+    service = BookingService()
+    async def boom(q, body):
+        raise KeyError("x")
+    async def db_down(q, body):
+        raise sqlite3.OperationalError("disk I/O error")
+    service.routes[("GET", "/routes")] = boom
+    assert _call("GET", "/routes", service=service) == (500, {"error": "internal error: KeyError"})
+    assert "ERROR: GET /routes failed" in capsys.readouterr().out
+    service.routes[("GET", "/routes")] = db_down
+    assert _call("GET", "/routes", service=service) == (500, {"error": "database error: disk I/O error"})
+
+def test_notify_without_hub_is_silent(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(booking_service, "BUS_ADDRESS_FILE", str(tmp_path / "bus.address"))
+    assert booking_service.notify("booking_created", booking_id=1) is False
+    assert capsys.readouterr().out == ""
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix socket")
+def test_notify_sends_to_hub_and_warns_when_unreachable(tmp_path, monkeypatch, capsys):
+    address, sock_path = tmp_path / "bus.address", str(tmp_path / "hub.sock")
+    monkeypatch.setattr(booking_service, "BUS_ADDRESS_FILE", str(address))
+    address.write_text(sock_path, encoding="utf-8")
+    assert booking_service.notify("booking_status", booking_id=1) is False     # ไฟล์ค้างจาก hub ที่ปิดไปแล้ว
+    assert "WARNING: event bus hub" in capsys.readouterr().out
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hub:
+        hub.bind(sock_path); hub.listen(1)
+        assert booking_service.notify("booking_status", booking_id=1, status="ยกเลิก") is True
+        conn, _ = hub.accept()
+        with conn:
+            line = conn.makefile(encoding="utf-8").readline()
+    assert json.loads(line) == {"type": "booking_status", "booking_id": 1, "status": "ยกเลิก"}
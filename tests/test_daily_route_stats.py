@@ -0,0 +1,47 @@
+# test_daily_route_stats.py — Trigger ของ daily_route_stats บน bookings (เพิ่ม / แก้ / สลับสถานะยกเลิก / ลบ)
+
+import pytest
+import db_manager
+import migrations
+
+@pytest.fixture
+def con(tmp_path):
+    path = str(tmp_path / "users.db")
+    migrations.migrate(path, migrations.ADMIN_MIGRATIONS)
+    return db_manager.connect(path)
+
+def _book(con, date="2026-02-01", seats=2, price=200.0, vat=14.0, status="รอดำเนินการ") -> int:
+    with con:
+        return con.execute("""INSERT INTO bookings (ticket_no, customer_name, route_from, route_to, date, status,
+                                                    seat_count, price, vat, dep_time)
+                              VALUES (abs(random()) % 100000000, 'ก', 'ขอนแก่น', 'อุดรธานี', ?, ?, ?, ?, ?, '09:00')""",
+                           (date, status, seats, price, vat)).lastrowid
+
+def _set(con, booking_id, **cols):
+    with con:
+        con.execute(f"UPDATE bookings SET {', '.join(f'{c} = ?' for c in cols)} WHERE id = ?", (*cols.values(), booking_id))
+
+def _stats(con):
+    return con.execute("SELECT date, orders, seats, ROUND(revenue, 2) FROM daily_route_stats ORDER BY date").fetchall()
+
+def test_insert_adds_and_delete_subtracts(con):
+    first = _book(con)
+    _book(con, seats=1, price=100.0, vat=None)            # vat ว่าง = price * 7%
+    _book(con, status="ยกเลิก")                           # การจองที่ยกเลิกไม่นับ
+    assert _stats(con) == [("2026-02-01", 2, 3, 321.0)]
+    with con:
+        con.execute("DELETE FROM bookings WHERE id = ?", (first,))
+    assert _stats(con) == [("2026-02-01", 1, 1, 107.0)]
+
+def test_status_flip_to_cancelled_and_back(con):
+    booking_id = _book(con)
+    _set(con, booking_id, status="ยกเลิก")
+    assert _stats(con) == []                              # แถวที่เหลือ 0 การจองถูกลบ
+    _set(con, booking_id, status="ยืนยัน")
+    assert _stats(con) == [("2026-02-01", 1, 2, 214.0)]
+
+def test_update_moves_totals_between_rows(con):
+    booking_id = _book(con)
+    _book(con, date="2026-02-02", seats=1, price=100.0, vat=7.0)
+    _set(con, booking_id, date="2026-02-02", seat_count=3, price=300.0, vat=21.0)
+    assert _stats(con) == [("2026-02-02", 2, 4, 428.0)]
@@ -0,0 +1,45 @@
+# test_dashboard_stats.py — สรุปยอดตามช่วงเวลา: period_range + db_stats_for_range
+
+import datetime
+import pytest
+
+D = datetime.date
+
+@pytest.mark.parametrize("mode, day, end, expected", [
+    ("day",     D(2026, 2, 18), None,            ("2026-02-18", "2026-02-18")),
+    ("week",    D(2026, 2, 18), None,            ("2026-02-16", "2026-02-22")),   # จันทร์ - อาทิตย์
+    ("week",    D(2025, 12, 31), None,           ("2025-12-29", "2026-01-04")),   # คร่อมปี
+    ("month",   D(2024, 2, 10), None,            ("2024-02-01", "2024-02-29")),   # ปีอธิกสุรทิน
+    ("quarter", D(2026, 11, 5), None,            ("2026-10-01", "2026-12-31")),
+    ("year",    D(2026, 6, 1), None,             ("2026-01-01", "2026-12-31")),
+    ("custom",  D(2026, 3, 9), D(2026, 3, 1),    ("2026-03-01", "2026-03-09")),   # สลับวันให้เอง
+    ("custom",  D(2026, 3, 9), None,             ("2026-03-09", "2026-03-09")),
+])
+def test_period_range(admin_mod, mode, day, end, expected):
+    assert admin_mod.period_range(mode, day, end) == expected
+
+def _book(admin, to, date, price, status="ยืนยัน"):
+    with admin.db_connect_admin() as con:
+        con.execute("""INSERT INTO bookings (ticket_no, customer_name, route_from, route_to, date, status,
+                                             seat_count, price, vat, dep_time)
+                       VALUES (abs(random()) % 100000000, 'ก', 'ขอนแก่น', ?, ?, ?, 1, ?, 0, '09:00')""",
+                    (to, date, status, price))
+
+def test_stats_for_range(admin_mod):
+    for to in ("อุดรธานี", "เลย", "หนองคาย"):
+        admin_mod.db_add_route("ขอนแก่น", to, "09:00", "2 ชม.", 40)
+    _book(admin_mod, "อุดรธานี", "2026-02-01", 100)
+    _book(admin_mod, "อุดรธานี", "2026-02-10", 100)
+    _book(admin_mod, "เลย", "2026-02-28", 300)
+    _book(admin_mod, "เลย", "2026-03-01", 999)                  # นอกช่วง
+    _book(admin_mod, "หนองคาย", "2026-02-05", 999, "ยกเลิก")    # ยกเลิกไม่นับ
+
+    stats = admin_mod.db_stats_for_range("2026-02-01", "2026-02-28", top_n=2)
+    assert (stats["orders"], stats["revenue"], stats["avg"]) == (3, 500.0, 500 / 3)
+    assert stats["top_routes"] == [("ขอนแก่น → อุดรธานี", 2), ("ขอนแก่น → เลย", 1)]
+    # เส้นทางที่ไม่มีการจองในช่วงนี้นับเป็น 0
+    assert stats["least_routes"] == [("ขอนแก่น → หนองคาย", 0), ("ขอนแก่น → เลย", 1)]
+
+def test_stats_for_empty_range(admin_mod):
+    stats = admin_mod.db_stats_for_range("2030-01-01", "2030-12-31")
+    assert (stats["orders"], stats["revenue"], stats["avg"], stats["top_routes"]) == (0, 0.0, 0.0, [])
@@ -0,0 +1,12 @@
+# test_db_manager.py — journal_mode ของไฟล์ที่เขียนร่วมกันผ่าน ATTACH
+
+import booking_core
+import db_manager
+
+def test_attached_booking_files_use_rollback_journal(dbs, tmp_path):
+    con = booking_core.db_connect_booking()
+    assert con.execute("PRAGMA main.journal_mode").fetchone()[0] == "delete"
+    assert con.execute("PRAGMA adm.journal_mode").fetchone()[0] == "delete"
+    # connection อื่นของไฟล์เดียวกันต้องไม่สลับไฟล์กลับเป็น WAL
+    assert booking_core.db_connect_admin().execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert db_manager.connect(str(tmp_path / "other.db")).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
@@ -0,0 +1,73 @@
+# test_migrations.py — migrations.migrate: รันซ้ำได้ และ backfill จาก DB รุ่นก่อนมีระบบ migration
+
+import sqlite3
+import pytest
+import db_manager
+import migrations
+
+def _schema(path: str) -> list:
+    con = db_manager.connect(path)
+    return con.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+
+def _legacy(path: str, ddl: str, rows_sql: str, rows: list):
+    """สร้าง DB แบบที่โปรแกรมรุ่นเก่าสร้างไว้ (user_version = 0)"""
+    with sqlite3.connect(path) as con:
+        con.execute(ddl)
+        con.executemany(rows_sql, rows)
+    con.close()
+
+def test_migrate_fresh_db_is_idempotent(tmp_path):
+    for name, steps in (("p.db", migrations.PASSENGER_MIGRATIONS), ("u.db", migrations.ADMIN_MIGRATIONS),
+                        ("auth.db", migrations.AUTH_MIGRATIONS)):
+        path = str(tmp_path / name)
+        assert migrations.migrate(path, steps) == len(steps)
+        before = _schema(path)
+        con = db_manager.connect(path)
+        changes = con.total_changes
+        assert migrations.migrate(path, steps) == len(steps)
+        assert _schema(path) == before
+        assert con.total_changes == changes
+
+def test_failed_step_rolls_back_and_keeps_version(tmp_path):
+    path = str(tmp_path / "x.db")
+    def _s1(con):
+        con.execute("CREATE TABLE a (x)")
+    def _s2(con):
+        con.execute("CREATE TABLE b (x)")
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        migrations.migrate(path, [_s1, _s2])
+    con = db_manager.connect(path)
+    assert con.execute("PRAGMA user_version").fetchone() == (1,)
+    assert [r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")] == ["a"]
+
+LEGACY_BOOKINGS_DDL = """
+CREATE TABLE bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, ticket_no TEXT UNIQUE NOT NULL, user_id INTEGER,
+    customer_name TEXT NOT NULL, route_from TEXT NOT NULL, route_to TEXT NOT NULL, date TEXT NOT NULL,
+    status TEXT NOT NULL, phone TEXT, email TEXT, seat TEXT, price REAL, vat REAL, slip_path TEXT,
+    dep_time TEXT, arr_time TEXT, created_at TEXT DEFAULT (DATETIME('now'))
+)"""
+
+def test_admin_legacy_backfill(tmp_path):
+    path = str(tmp_path / "u.db")
+    rows = [
+        ("11111111", "ก", "ขอนแก่น", "อุดรธานี", "2025-01-01", "รอดำเนินการ", "A1, A2", 200, 14, "09:00"),
+        ("22222222", "ข", "ขอนแก่น", "อุดรธานี", "2025-01-01", "ยืนยัน", "B1", 100, None, "09:00"),
+        ("33333333", "ค", "ขอนแก่น", "อุดรธานี", "2025-01-01", "ยกเลิก", "C1,C2,C3", 300, 21, "09:00"),
+    ]
+    _legacy(path, LEGACY_BOOKINGS_DDL,
+            "INSERT INTO bookings (ticket_no, customer_name, route_from, route_to, date, status, seat, price, vat, dep_time)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    assert migrations.migrate(path, migrations.ADMIN_MIGRATIONS) == len(migrations.ADMIN_MIGRATIONS)
+    con = db_manager.connect(path)
+    # ที่นั่งจากข้อความ seat -> booking_seats + seat_count
+    assert con.execute("SELECT id, seat_count FROM bookings ORDER BY id").fetchall() == [(1, 2), (2, 1), (3, 3)]
+    assert con.execute("SELECT booking_id, seat_code FROM booking_seats ORDER BY booking_id, seat_code").fetchall() == [
+        (1, "A1"), (1, "A2"), (2, "B1"), (3, "C1"), (3, "C2"), (3, "C3")]
+    # สรุปรายวันไม่นับการจองที่ยกเลิก (vat ว่าง = price * 7%)
+    assert con.execute("SELECT orders, seats, revenue FROM daily_route_stats").fetchall() == [(2, 3, 214 + 107)]
+    assert con.execute("SELECT version FROM catalog_version").fetchone() == (0,)
+    if migrations._has_table(con, "bookings_fts"):
+        assert con.execute("SELECT rowid FROM bookings_fts WHERE bookings_fts MATCH '2222*'").fetchall() == [(2,)]
@@ -0,0 +1,24 @@
+# test_save_booking.py — booking_core.save_new_booking: จองหลายที่นั่งแบบ all-or-nothing
+
+import booking_core
+from conftest import TRIP, booking_data
+
+def _counts():
+    user, admin = booking_core.db_connect_user(), booking_core.db_connect_admin()
+    return (user.execute("SELECT COUNT(*) FROM passenger_bookings").fetchone()[0],
+            admin.execute("SELECT COUNT(*) FROM bookings").fetchone()[0],
+            admin.execute("SELECT COUNT(*) FROM booking_seats").fetchone()[0])
+
+def test_all_seats_are_booked_together(dbs):
+    _, ticket_no, conflicts = booking_core.save_new_booking(booking_data(), ["1A", "1B", "1A"], "12345678")
+    assert (conflicts, ticket_no) == ([], "12345678")
+    assert booking_core.get_booked_seats(*TRIP) == {"1A", "1B"}
+    assert _counts() == (2, 1, 2)
+
+def test_conflict_writes_nothing_and_reports_seats(dbs):
+    booking_core.save_new_booking(booking_data(), ["1A", "2B"], "11111111")
+    before = _counts()
+    booking_id, _, conflicts = booking_core.save_new_booking(booking_data(first_name="อื่น"), ["2A", "1A", "2B"], "22222222")
+    assert (booking_id, conflicts) == (-1, ["1A", "2B"])
+    assert _counts() == before
+    assert booking_core.get_booked_seats(*TRIP) == {"1A", "2B"}
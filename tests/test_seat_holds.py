@@ -0,0 +1,60 @@
+# test_seat_holds.py — ล็อกที่นั่งชั่วคราว (hold_seat): แย่งกัน, ต่ออายุ, หมดอายุ
+
+import types
+import pytest
+import booking_core
+from conftest import TRIP, booking_data
+
+@pytest.fixture
+def clock(monkeypatch):
+    """นาฬิกาของ booking_core ที่เลื่อนเองได้ (clock[0] = วินาที unix)"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(booking_core, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def test_hold_blocks_other_sessions_until_expiry(dbs, clock):
+    assert booking_core.hold_seat(*TRIP, "1A", "a")
+    assert not booking_core.hold_seat(*TRIP, "1A", "b")
+    assert booking_core.get_booked_seats(*TRIP, "b") == {"1A"}
+    assert booking_core.get_booked_seats(*TRIP, "a") == set()   # ล็อกของตัวเองไม่นับว่าไม่ว่าง
+
+    clock[0] += booking_core.SEAT_HOLD_SECONDS - 1
+    assert not booking_core.hold_seat(*TRIP, "1A", "b")
+    clock[0] += 1
+    assert booking_core.get_booked_seats(*TRIP, "b") == set()
+    assert booking_core.hold_seat(*TRIP, "1A", "b")             # ล็อกที่หมดอายุถูกแย่งได้
+    assert not booking_core.hold_seat(*TRIP, "1A", "a")
+
+def test_same_session_renews_hold(dbs, clock):
+    assert booking_core.hold_seat(*TRIP, "1A", "a")
+    clock[0] += booking_core.SEAT_HOLD_SECONDS - 1
+    assert booking_core.hold_seat(*TRIP, "1A", "a")
+    clock[0] += booking_core.SEAT_HOLD_SECONDS - 1
+    assert not booking_core.hold_seat(*TRIP, "1A", "b")
+
+def test_purge_and_release(dbs, clock):
+    assert booking_core.hold_seat(*TRIP, "1A", "a")
+    assert booking_core.hold_seat(*TRIP, "1B", "a")
+    assert booking_core.hold_seat(*TRIP, "1C", "b")
+    booking_core.release_seat(*TRIP, "1B", "a")
+    assert booking_core.get_booked_seats(*TRIP) == {"1A", "1C"}
+    assert booking_core.purge_expired_holds() == 0
+    clock[0] += booking_core.SEAT_HOLD_SECONDS
+    assert booking_core.purge_expired_holds() == 2
+
+def test_booking_respects_other_holds_and_clears_own(dbs):
+    assert booking_core.hold_seat(*TRIP, "3A", "a")
+    assert booking_core.hold_seat(*TRIP, "3B", "b")
+    assert booking_core.save_new_booking(booking_data(), ["3A", "3B"], "33333333", "a")[2] == ["3B"]
+    assert booking_core.save_new_booking(booking_data(), ["3A"], "33333333", "a")[2] == []
+    held = booking_core.db_connect_user().execute("SELECT session_id FROM seat_holds").fetchall()
+    assert held == [("b",)]
+
+def test_only_booked_rows_block_holds_and_sales(dbs):
+    booking_core.save_new_booking(booking_data(), ["2A", "2B"], "12345678")
+    assert not booking_core.hold_seat(*TRIP, "2A", "a")
+    con = booking_core.db_connect_user()
+    con.execute("UPDATE passenger_bookings SET is_booked = 0 WHERE seat_code = '2B'"); con.commit()
+    assert booking_core.hold_seat(*TRIP, "2B", "a")
+    assert booking_core.save_new_booking(booking_data(first_name="ใหม่"), ["2B"], "66666666", "a")[2] == []
+    assert con.execute("SELECT first_name, is_booked FROM passenger_bookings WHERE seat_code = '2B'").fetchall() == [("ใหม่", 1)]
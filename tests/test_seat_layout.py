@@ -0,0 +1,36 @@
+# test_seat_layout.py — ผังที่นั่งจากความจุ + แบบรถ
+
+import pytest
+import seat_layout
+
+@pytest.mark.parametrize("capacity, template, expected", [
+    (40, "2+2", (40, "2+2")),
+    ("30", "2+1", (30, "2+1")),
+    (None, None, (seat_layout.DEFAULT_CAPACITY, seat_layout.DEFAULT_TEMPLATE)),
+    ("abc", "3+3", (seat_layout.DEFAULT_CAPACITY, seat_layout.DEFAULT_TEMPLATE)),
+    (0, "2+2", (seat_layout.DEFAULT_CAPACITY, "2+2")),
+    (-5, "2+2", (seat_layout.DEFAULT_CAPACITY, "2+2")),
+    (500, "double-decker", (seat_layout.MAX_CAPACITY, "double-decker")),
+])
+def test_normalize(capacity, template, expected):
+    assert seat_layout.normalize(capacity, template) == expected
+
+@pytest.mark.parametrize("template", sorted(seat_layout.TEMPLATES))
+@pytest.mark.parametrize("capacity", [1, 7, 28, 40, 60])
+def test_seat_codes_match_capacity_and_are_unique(capacity, template):
+    codes = seat_layout.seat_codes(capacity, template)
+    assert len(codes) == capacity and len(set(codes)) == capacity
+
+def test_2x2_keeps_the_original_seat_codes():
+    assert seat_layout.seat_codes(28, "2+2")[:5] == ["1A", "1B", "1C", "1D", "2A"]
+    (_, rows), = seat_layout.build_layout(30, "2+2")
+    assert rows[0] == (1, ("1A", "1B", None, "1C", "1D"))
+    assert rows[-1] == (8, ("8A", "8B", None, "", ""))       # แถวสุดท้ายไม่เต็ม
+
+def test_double_decker_lower_deck_is_capped():
+    lower, upper = seat_layout.build_layout(40, "double-decker")
+    lower_seats = [c for _, cells in lower[1] for c in cells if c]
+    upper_rows = [n for n, _ in upper[1]]
+    assert (lower[0], upper[0]) == ("ชั้นล่าง", "ชั้นบน")
+    assert len(lower_seats) == 12 and upper_rows[0] == lower[1][-1][0] + 1   # เลขแถวต่อจากชั้นล่าง
+    assert [d[0] for d in seat_layout.build_layout(10, "double-decker")] == ["ชั้นล่าง"]   # ไม่เกิน 12 ที่ ใช้ชั้นล่างชั้นเดียว
@@ -0,0 +1,77 @@
+# test_ticket_no.py — เลขตั๋วไม่ซ้ำ: UNIQUE index บน bookings.ticket_no + เปลี่ยนเลขที่ซ้ำใน DB เก่า
+
+import sqlite3
+import pytest
+import booking_core
+import migrations
+from conftest import TRIP, booking_data
+
+def _ticket_numbers():
+    con = booking_core.db_connect_booking()
+    return (sorted(r[0] for r in con.execute("SELECT ticket_no FROM adm.bookings")),
+            sorted(r[0] for r in con.execute("SELECT ticket_no FROM passenger_bookings")))
+
+def test_taken_ticket_no_is_redrawn_for_both_files(dbs, monkeypatch):
+    booking_core.save_new_booking(booking_data(), ["1A"], "44444444")
+    drawn = iter(["44444444", "55555555"])                 # สุ่มครั้งแรกชนอีก ครั้งที่สองว่าง
+    monkeypatch.setattr(booking_core, "new_ticket_no", lambda: next(drawn))
+    _, ticket_no, conflicts = booking_core.save_new_booking(booking_data(), ["1B"], "44444444")
+    assert (ticket_no, conflicts) == ("55555555", [])
+    assert _ticket_numbers() == (["44444444", "55555555"], ["44444444", "55555555"])
+
+def test_retry_gives_up_without_writing(dbs, monkeypatch):
+    booking_core.save_new_booking(booking_data(), ["1A"], "44444444")
+    calls = []
+    monkeypatch.setattr(booking_core, "new_ticket_no", lambda: calls.append(1) or "44444444")
+    with pytest.raises(sqlite3.IntegrityError):
+        booking_core.save_new_booking(booking_data(), ["1B"], "44444444")
+    assert len(calls) == booking_core.TICKET_NO_ATTEMPTS - 1
+    assert _ticket_numbers() == (["44444444"], ["44444444"])
+    assert booking_core.get_booked_seats(*TRIP) == {"1A"}
+
+# bookings รุ่นเก่าของ home.py: ticket_no ไม่มี UNIQUE
+LEGACY_BOOKINGS_DDL = """
+CREATE TABLE bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, ticket_no TEXT, customer_name TEXT NOT NULL,
+    route_from TEXT NOT NULL, route_to TEXT NOT NULL, date TEXT NOT NULL, status TEXT NOT NULL,
+    phone TEXT, email TEXT, seat TEXT, price REAL, vat REAL, slip_path TEXT, dep_time TEXT, arr_time TEXT
+)"""
+
+def test_legacy_duplicate_tickets_are_renumbered_in_both_files(tmp_path):
+    user_db, admin_db = str(tmp_path / "passenger_bookings.db"), str(tmp_path / "users.db")
+    trips = [("2026-02-01", "1A"), ("2026-02-01", "1B"), ("2026-02-02", "1A")]   # เลขตั๋วเดียวกันทั้งสามการจอง
+    with sqlite3.connect(admin_db) as con:
+        con.execute(LEGACY_BOOKINGS_DDL)
+        con.executemany("INSERT INTO bookings (ticket_no, customer_name, route_from, route_to, date, status, seat, price, vat, dep_time)"
+                        " VALUES ('11111111', 'ก', 'ขอนแก่น', 'อุดรธานี', ?, 'รอดำเนินการ', ?, 100, 7, '09:00')", trips)
+    con.close()
+    # สภาพ DB ที่ผ่าน a3 รุ่นก่อน: เลขซ้ำ + index ธรรมดา
+    migrations.migrate(admin_db, migrations.ADMIN_MIGRATIONS[:2])
+    with sqlite3.connect(admin_db) as con:
+        con.execute("CREATE INDEX idx_bookings_ticket_no_dup ON bookings(ticket_no)")
+        con.execute("PRAGMA user_version = 3")
+    con.close()
+    migrations.migrate(user_db, migrations.PASSENGER_MIGRATIONS)
+    booking_core.configure(user_db, admin_db)
+    con = booking_core.db_connect_booking()
+    with con:
+        con.executemany("INSERT INTO passenger_bookings (first_name, last_name, phone, citizen_id, travel_date, origin, dest,"
+                        " dep_time, trip_info_json, seat_code, ticket_no)"
+                        " VALUES ('ก', 'ข', '0', '1', ?, 'ขอนแก่น', 'อุดรธานี', '09:00', '{}', ?, '11111111')", trips)
+
+    migrations.migrate(admin_db, migrations.ADMIN_MIGRATIONS)
+    assert migrations.apply_ticket_renumbering(user_db, admin_db) == 2
+    assert migrations.apply_ticket_renumbering(user_db, admin_db) == 0
+
+    tickets = dict(con.execute("SELECT id, ticket_no FROM adm.bookings"))
+    assert tickets[1] == "11111111" and len(set(tickets.values())) == 3
+    seats = con.execute("""SELECT b.id, p.ticket_no FROM passenger_bookings p
+                           JOIN adm.booking_seats s ON s.seat_code = p.seat_code
+                           JOIN adm.bookings b ON b.id = s.booking_id AND b.date = p.travel_date""").fetchall()
+    assert sorted(seats) == sorted(tickets.items())
+    index = {name: unique for _, name, unique, *_ in con.execute("PRAGMA adm.index_list(bookings)")}
+    assert index.get("idx_bookings_ticket_no") == 1 and "idx_bookings_ticket_no_dup" not in index
+
+    # ยกเลิกการจองที่ได้เลขเดิมไม่ลบที่นั่งของการจองที่ถูกเปลี่ยนเลข
+    assert booking_core.cancel_booking("11111111") == (1, "2026-02-01")
+    assert booking_core.get_booked_seats("2026-02-01", "09:00", "อุดรธานี") == {"1B"}
@@ -0,0 +1,45 @@
+# test_trip_key.py — passenger_bookings: คอลัมน์ origin/dest/dep_time แทน LIKE บน trip_info_json
+
+import json, sqlite3
+import db_manager
+import migrations
+
+LEGACY_PASSENGER_DDL = """
+CREATE TABLE passenger_bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL, last_name TEXT NOT NULL, phone TEXT NOT NULL, citizen_id TEXT NOT NULL, email TEXT,
+    travel_date TEXT NOT NULL, trip_info_json TEXT NOT NULL, seat_code TEXT NOT NULL,
+    is_booked INTEGER DEFAULT 1, ticket_no TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(travel_date, trip_info_json, seat_code)
+)"""
+
+def test_passenger_legacy_backfill_keeps_colliding_rows(tmp_path):
+    path = str(tmp_path / "p.db")
+    trip = lambda **k: json.dumps(k, ensure_ascii=False)
+    rows = [
+        ("2025-01-01", trip(origin="ขอนแก่น (บขส.3)", dest="อุดรธานี", dep_time="09:00", arr_time="11:00"), "1A"),
+        ("2025-01-01", trip(origin="ขอนแก่น", dest="อุดรธานี", dep_time="09:00", arr_time="11:05"), "1A"),  # ชน key ใหม่
+        ("2025-01-01", trip(origin="ขอนแก่น", dest="อุดรธานี", dep_time="09:00"), "1B"),
+        ("2025-01-01", trip(price=70), "2A"),    # ไม่มี dest/dep_time
+        ("2025-01-01", trip(price=80), "2A"),    # ไม่มี dest/dep_time + ชนกับแถวบน
+    ]
+    with sqlite3.connect(path) as con:
+        con.execute(LEGACY_PASSENGER_DDL)
+        con.executemany("INSERT INTO passenger_bookings (first_name, last_name, phone, citizen_id, travel_date,"
+                        " trip_info_json, seat_code) VALUES ('a', 'b', '0', '1', ?, ?, ?)", rows)
+    con.close()
+
+    assert migrations.migrate(path, migrations.PASSENGER_MIGRATIONS) == len(migrations.PASSENGER_MIGRATIONS)
+    con = db_manager.connect(path)
+    kept = con.execute("SELECT id, origin, dest, dep_time, seat_code FROM passenger_bookings ORDER BY id").fetchall()
+    assert kept == [(1, "ขอนแก่น", "อุดรธานี", "09:00", "1A"), (3, "ขอนแก่น", "อุดรธานี", "09:00", "1B"), (4, "", "", "", "2A")]
+    lost = [r[0] for r in con.execute("SELECT id FROM passenger_bookings_conflicts ORDER BY id")]
+    assert lost == [2, 5]   # ไม่มีแถวไหนหายเงียบ ๆ: kept + conflicts = ทุกแถวเดิม
+
+def test_seat_lookup_reads_covering_partial_index(tmp_path):
+    path = str(tmp_path / "p.db")
+    migrations.migrate(path, migrations.PASSENGER_MIGRATIONS)
+    plan = " ".join(r[3] for r in db_manager.connect(path).execute("""
+        EXPLAIN QUERY PLAN SELECT seat_code FROM passenger_bookings
+        WHERE travel_date = ? AND dest = ? AND dep_time = ? AND is_booked = 1""", ("2026-02-01", "อุดรธานี", "09:00")))
+    assert "COVERING INDEX idx_pb_trip_booked" in plan, plan
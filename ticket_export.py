@@ -0,0 +1,205 @@
+# ticket_export.py — Go with CREPE
+# พิมพ์ตั๋ว + ใบเสร็จย้อนหลังจากตาราง bookings (users.db) แบบไม่เปิดหน้าจอ
+# - เลือกตามเลขที่ตั๋ว / id การจอง / วันที่ / เที่ยวรถ (ปลายทาง + เวลาออก)
+# - แบ่งงานเป็นชุด ส่งให้ process pool วาดด้วย Qt แบบ offscreen
+# - ได้ไฟล์ PDF รวมไฟล์เดียว (--merge) หรือแยก 1 ไฟล์ต่อ 1 ตั๋ว
+#
+# ตัวอย่าง
+#   python ticket_export.py --date 2025-11-02 --merge --out day.pdf
+#   python ticket_export.py --date 2025-11-02 --dest อุดรธานี --dep 09:00 --out tickets\
+#   python ticket_export.py --ticket 51234567 67654321 --out tickets\
+#   python ticket_export.py --ids-from - --merge --out selected.pdf   (id การจองทีละบรรทัดจาก stdin)
+
+import os, sys, json, time, math, argparse, tempfile, shutil, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import assets
+import db_manager
+import migrations
+
+try:
+    from pypdf import PdfWriter   # ใช้รวมไฟล์ที่แต่ละ process วาดไว้ (ไม่มีก็ได้)
+except ImportError:
+    PdfWriter = None
+
+DB_ADMIN_PATH = "users.db"
+
+CHUNK_SIZE  = 100     # จำนวนการจองต่อ 1 งานที่ส่งให้ process ลูก
+MAX_WORKERS = os.cpu_count() or 1
+
+EXPORT_SQL = """
+SELECT b.id, b.ticket_no, b.customer_name, b.phone, b.route_to, b.date, b.dep_time,
+       b.seat_count, b.price, b.vat,
+       COALESCE((SELECT group_concat(seat_code, ', ')
+                 FROM (SELECT seat_code FROM booking_seats s WHERE s.booking_id = b.id ORDER BY seat_code)),
+                b.seat) AS seats
+FROM bookings b
+WHERE {where}
+ORDER BY COALESCE(b.date, ''), b.dep_time, b.route_to, b.id
+"""
+
+# ---------- เลือกข้อมูล ----------
+def select_bookings(db_path: str = DB_ADMIN_PATH, tickets=None, ids=None, date=None, dest=None, dep=None) -> list[tuple]:
+    """คืนแถวการจองตามเงื่อนไข (เงื่อนไขที่ให้มาทั้งหมดต้องตรง)"""
+    where, params = [], []
+    if tickets:
+        where.append("b.ticket_no IN (SELECT value FROM json_each(?))"); params.append(json.dumps(list(tickets)))
+    if ids:
+        where.append("b.id IN (SELECT value FROM json_each(?))"); params.append(json.dumps([int(i) for i in ids]))
+    if date:
+        where.append("COALESCE(b.date, '') = ?"); params.append(date)
+    if dest:
+        where.append("b.route_to = ?"); params.append(dest)
+    if dep:
+        where.append("b.dep_time = ?"); params.append(dep)
+    if not where:
+        raise ValueError("ต้องระบุอย่างน้อย 1 เงื่อนไข (--ticket / --ids-from / --date / --dest / --dep)")
+    con = db_manager.connect(db_path)
+    return con.execute(EXPORT_SQL.format(where=" AND ".join(where)), params).fetchall()
+
+def booking_payload(row: tuple) -> dict:
+    """แปลงแถวจาก bookings เป็นข้อมูลสำหรับ ticket_pdf (รูปแบบเดียวกับ home._save_receipt_pdf)"""
+    from PyQt6.QtCore import QDate, QLocale
+    rid, ticket_no, customer, phone, dest, date, dep_time, seat_count, price, vat, seats = row
+    qty = int(seat_count or 0) or max(1, len([s for s in (seats or "").split(",") if s.strip()]))
+    subtotal = float(price or 0)
+    vat = float(vat or 0)
+    qdate = QDate.fromString(date or "", "yyyy-MM-dd")
+    thai = QLocale(QLocale.Language.Thai, QLocale.Country.Thailand)
+    return {
+        "booking_id": rid,
+        "ticket_no": ticket_no or str(rid),
+        "passenger_name": customer or "",
+        "phone": phone or "",
+        "seat_list_text": seats or "",
+        "qty": qty,
+        "price_each": int(round(subtotal / qty)) if qty else 0,
+        "dest": dest or "",
+        "dep_time": dep_time or "",
+        "date_full_th": thai.toString(qdate, "วันddddที่ d MMMM yyyy") if qdate.isValid() else (date or ""),
+        "date_long_th": thai.toString(qdate, "d MMM yyyy") if qdate.isValid() else (date or ""),
+        "subtotal": subtotal,
+        "vat": vat,
+        "grand_total": round(subtotal + vat, 2),
+    }
+
+def file_name_for(data: dict) -> str:
+    """ชื่อไฟล์แยกต่อการจอง — ใส่ booking_id ด้วย (DB เก่าอาจมีเลขตั๋วซ้ำ ไฟล์จะได้ไม่ทับกัน)"""
+    return f"receipt_{data['ticket_no']}_{data['booking_id']}.pdf"
+
+# ---------- งานใน process ลูก ----------
+_app = None
+
+def _worker_init():
+    """เตรียม Qt แบบ offscreen + ลงทะเบียนฟอนต์ (ครั้งเดียวต่อ process)"""
+    global _app
+    if _app is not None:
+        return
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication([sys.argv[0]])
+    assets.load_fonts()
+
+def _render_chunk(rows: list[tuple], out_path: str | None, out_dir: str | None) -> int:
+    """วาดชุดการจอง: out_path = รวมเป็นไฟล์เดียว, out_dir = แยกไฟล์ละตั๋ว คืนจำนวนที่วาด"""
+    _worker_init()
+    import ticket_pdf
+    items = [booking_payload(r) for r in rows]
+    if out_path:
+        ticket_pdf.render_batch(out_path, items)
+    else:
+        for data in items:
+            ticket_pdf.render_pdf(os.path.join(out_dir, file_name_for(data)), data)
+    return len(items)
+
+# ---------- ส่งออก ----------
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+def _run_pool(jobs: list[tuple], workers: int, progress):
+    """jobs = [(rows, out_path, out_dir)] รันใน process pool (workers=1 รันในตัวเอง)"""
+    done = 0
+    total = sum(len(j[0]) for j in jobs)
+    if workers <= 1:
+        for job in jobs:
+            done += _render_chunk(*job); progress(done, total)
+        return
+    # spawn: process ลูกเริ่มใหม่ทุกครั้ง ไม่ fork สถานะ Qt ของ process แม่
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_worker_init) as ex:
+        futures = [ex.submit(_render_chunk, *job) for job in jobs]
+        for fut in as_completed(futures):
+            done += fut.result(); progress(done, total)
+
+def export(rows: list[tuple], out: str, merge: bool, workers: int = MAX_WORKERS, progress=None) -> list[str]:
+    """วาดการจองทั้งหมดใน rows คืนรายชื่อไฟล์ที่ได้"""
+    progress = progress or (lambda done, total: None)
+    if not rows:
+        return []
+    workers = max(1, min(workers, math.ceil(len(rows) / CHUNK_SIZE)))
+
+    if not merge:
+        os.makedirs(out, exist_ok=True)
+        _run_pool([(c, None, out) for c in _chunks(rows, CHUNK_SIZE)], workers, progress)
+        return [os.path.join(out, file_name_for({"ticket_no": r[1] or str(r[0]), "booking_id": r[0]})) for r in rows]
+
+    folder = os.path.dirname(os.path.abspath(out))
+    os.makedirs(folder, exist_ok=True)
+    if workers <= 1 or PdfWriter is None:
+        # ไม่มี pypdf ให้รวมไฟล์ -> วาดทั้งหมดในไฟล์เดียวใน process นี้
+        _run_pool([(rows, out, None)], 1, progress)
+        return [out]
+
+    tmp = tempfile.mkdtemp(prefix="ticket_export_", dir=folder)
+    try:
+        parts = [os.path.join(tmp, f"part_{i:05d}.pdf") for i in range(math.ceil(len(rows) / CHUNK_SIZE))]
+        _run_pool([(c, parts[i], None) for i, c in enumerate(_chunks(rows, CHUNK_SIZE))], workers, progress)
+        merged = PdfWriter()
+        for part in parts:
+            merged.append(part)
+        with open(out, "wb") as f:
+            merged.write(f)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return [out]
+
+# ---------- CLI ----------
+def _read_ids(src: str) -> list[int]:
+    if src == "-":
+        text = sys.stdin.read()
+    else:
+        with open(src, encoding="utf-8") as f:
+            text = f.read()
+    return [int(x) for x in text.split() if x.isdigit()]
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ส่งออกตั๋ว + ใบเสร็จเป็น PDF จากตาราง bookings")
+    ap.add_argument("--db", default=DB_ADMIN_PATH, help="ไฟล์ users.db")
+    ap.add_argument("--ticket", nargs="+", help="เลขที่ตั๋ว (หลายค่าได้)")
+    ap.add_argument("--ids-from", metavar="FILE", help="ไฟล์ id การจองทีละบรรทัด ('-' = stdin)")
+    ap.add_argument("--date", help="วันที่เดินทาง yyyy-MM-dd")
+    ap.add_argument("--dest", help="ปลายทาง")
+    ap.add_argument("--dep", help="เวลาออก เช่น 09:00")
+    ap.add_argument("--out", required=True, help="ไฟล์ .pdf (--merge) หรือโฟลเดอร์ปลายทาง")
+    ap.add_argument("--merge", action="store_true", help="รวมทุกตั๋วเป็นไฟล์เดียว")
+    ap.add_argument("--workers", type=int, default=MAX_WORKERS, help="จำนวน process (ค่าเริ่มต้น = จำนวน CPU)")
+    args = ap.parse_args(argv)
+
+    migrations.migrate(args.db, migrations.ADMIN_MIGRATIONS)
+    ids = _read_ids(args.ids_from) if args.ids_from else None
+    try:
+        rows = select_bookings(args.db, tickets=args.ticket, ids=ids, date=args.date, dest=args.dest, dep=args.dep)
+    except ValueError as e:
+        ap.error(str(e))
+    if not rows:
+        print("ไม่พบการจองตามเงื่อนไข", file=sys.stderr); return 1
+
+    t0 = time.perf_counter()
+    files = export(rows, args.out, args.merge, args.workers,
+                   progress=lambda done, total: print(f"PROGRESS {done}/{total}", file=sys.stderr, flush=True))
+    print(f"ส่งออก {len(rows)} การจอง -> {len(files)} ไฟล์ ใน {time.perf_counter() - t0:.1f} วินาที", file=sys.stderr)
+    print(args.out)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
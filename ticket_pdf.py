@@ -0,0 +1,334 @@
+# ticket_pdf.py — Go with CREPE
+# วาดตั๋ว (หน้า 1) + ใบเสร็จ (หน้า 2) ลง PDF
+# - ฟังก์ชันวาดไม่ผูกกับหน้าจอ ใช้ได้ทั้งใน GUI thread และ worker thread (ใช้ QImage แทน QPixmap)
+# - TicketPdfJob รันบน QThreadPool แล้วแจ้งความคืบหน้า/ผลลัพธ์ผ่าน signal
+
+import random, threading
+from contextlib import contextmanager
+from functools import lru_cache
+from PyQt6.QtCore import Qt, QObject, QRunnable, QRectF, QLineF, QMarginsF, pyqtSignal
+from PyQt6.QtGui import (
+    QFont, QFontMetricsF, QImage, QPainter, QColor, QPen, QPageSize, QPageLayout, QPdfWriter
+)
+import assets
+
+LOGO_IMG = r"picture\logo.png"
+
+# ฟอนต์ต้องถูกลงทะเบียนแล้ว (assets.load_fonts) ก่อนเริ่มวาด
+FONT_EN = "Rubik"
+FONT_TH = "FC Minimal"
+
+PDF_DPI        = 300
+PDF_MARGIN_MM  = 12
+
+# ---------- Theme (ตรงกับ home.py) ----------
+BROWN       = "#8a663f"
+TEXT_DARK   = "#111"
+CARD_BLUE   = "#eaf3f6"
+INK         = "#2b2b2b"
+CARD_BORDER = "#9fd0d8"
+TEXT_SOFT   = "#3a3a3a"
+
+# เก็บส่วนที่ไม่เปลี่ยนของหน้าตั๋ว/ใบเสร็จ (กรอบ เงา โลโก้ ป้ายข้อความ) เป็นรายการคำสั่งวาดต่อขนาดหน้า + DPI
+# แล้ววาดเฉพาะข้อมูลของแต่ละการจองทับลงไป
+# render_pdf / render_batch(use_cache=False) คือวาดแบบเดิมทุกอย่าง (ใช้เทียบผล/วัดเวลาใน ticket_pdf_bench.py)
+# ค่านี้เก็บต่อ thread ระหว่างการเรียกครั้งนั้น: งานที่กำลังวาดบน thread อื่นไม่ถูกกระทบ
+
+_cache_lock = threading.Lock()
+_layer_cache = {}
+_render = threading.local()
+
+def _use_cache() -> bool:
+    return getattr(_render, "use_cache", True)
+
+@contextmanager
+def _rendering(use_cache: bool):
+    prev = _use_cache()
+    _render.use_cache = use_cache
+    try:
+        yield
+    finally:
+        _render.use_cache = prev
+
+def _logo(w: int, h: int) -> QImage | None:
+    """โลโก้ย่อขนาดแล้ว (จาก assets: ย่อครั้งเดียวต่อขนาด เก็บไว้ทั้งในหน่วยความจำและบนดิสก์)"""
+    if not _use_cache():
+        img = QImage(LOGO_IMG)
+        return None if img.isNull() else img.scaled(w, h, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    img = assets.image(LOGO_IMG, w, h)
+    return None if img.isNull() else img
+
+@lru_cache(maxsize=64)
+def _font(fam: str, size_px: int, weight: int) -> QFont:
+    return QFont(fam, size_px, weight)
+
+@lru_cache(maxsize=16)
+def _dpi_device(dpi: int) -> QImage:
+    """ภาพ 1x1 ที่มี DPI ตามต้องการ ใช้วัดความกว้างข้อความนอก QPainter"""
+    dev = QImage(1, 1, QImage.Format.Format_ARGB32)
+    dev.setDotsPerMeterX(round(dpi / 0.0254)); dev.setDotsPerMeterY(round(dpi / 0.0254))
+    return dev
+
+@lru_cache(maxsize=256)
+def _metrics(fam: str, size_px: int, weight: int, dpi: int) -> QFontMetricsF:
+    return QFontMetricsF(_font(fam, size_px, weight), _dpi_device(dpi))
+
+def T(p: QPainter, txt: str, fam: str, size_px: int, weight: int, color: str, x: int, y: int, align="left"):
+    p.setPen(QColor(color))
+    if not _use_cache():
+        p.setFont(QFont(fam, size_px, weight))
+        fm = p.fontMetrics()
+    else:
+        p.setFont(_font(fam, size_px, weight))
+        fm = _metrics(fam, size_px, weight, p.device().logicalDpiY()) if align != "left" else None
+
+    if align == "center":
+        tw = fm.horizontalAdvance(txt)
+        x_center = x - tw / 2
+        p.drawText(int(x_center), int(y), txt)
+    elif align == "right":
+        tw = fm.horizontalAdvance(txt)
+        x_right = x - tw
+        p.drawText(int(x_right), int(y), txt)
+    else:
+        p.drawText(int(x), int(y), txt)
+
+class _Recorder:
+    """
+    ตัวแทน QPainter ที่จดคำสั่งวาด (ชื่อเมธอด, อาร์กิวเมนต์) ไว้เล่นซ้ำ
+    ไม่ใช้ QPicture เพราะ QPicture ขยายพิกัดตาม DPI ของปลายทาง และฝังโลโก้ใหม่ทุกหน้าใน PDF
+    """
+    def __init__(self, device):
+        self.ops = []
+        self._device = device
+
+    def device(self):
+        return self._device
+
+    def __getattr__(self, name):
+        return lambda *args: self.ops.append((name, args))
+
+def _layer(kind: str, p: QPainter, rect: QRectF, draw_static) -> None:
+    """วาดส่วนคงที่: ถ้ามีรายการคำสั่งของ (ชนิด, ขนาดหน้า, DPI) แล้วใช้ซ้ำ ไม่งั้นจดใหม่"""
+    if not _use_cache():
+        draw_static(p, rect); return
+    dev = p.device()
+    key = (kind, rect.width(), rect.height(), dev.logicalDpiX(), dev.logicalDpiY())
+    with _cache_lock:
+        ops = _layer_cache.get(key)
+    if ops is None:
+        rec = _Recorder(dev)
+        draw_static(rec, rect)
+        with _cache_lock:
+            ops = _layer_cache.setdefault(key, rec.ops)
+    for name, args in ops:
+        getattr(p, name)(*args)
+
+def _hints(p: QPainter):
+    p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+    p.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
+
+# ---------- ตั๋ว (หน้า 1) ----------
+# ตำแหน่งที่ปรับให้ตรงกับรูปภาพ 'ตั๋ว.png'
+def _ticket_geom(rect: QRectF):
+    OUT = 100
+    CARD = QRectF(rect.left()+OUT, rect.top()+OUT, rect.width()-OUT*2, rect.height()-OUT*2.2)
+    pad = 32
+    xL_base = CARD.left() + pad + 6
+    y0 = CARD.top() + pad + 15                       # บรรทัด "เลขที่ตั๋ว"
+    box = QRectF(CARD.left()+pad, y0 + 218, CARD.width()-pad*2, 200)   # กรอบรายละเอียดการเดินทาง
+    return CARD, pad, xL_base, y0, box
+
+def _ticket_static(p: QPainter, rect: QRectF):
+    _hints(p)
+    p.fillRect(rect, QColor("#ffffff"))
+    CARD, pad, xL_base, y0, box = _ticket_geom(rect)
+
+    # วาดเงาและกรอบ
+    p.setPen(Qt.PenStyle.NoPen); p.setBrush(QColor(0,0,0,14))
+    p.drawRoundedRect(CARD.adjusted(2,4,2,4), 16, 16)
+    p.setBrush(QColor("#ffffff")); p.setPen(QPen(QColor(CARD_BORDER), 3))
+    p.drawRoundedRect(CARD, 16, 16)
+
+    # --- HEADER (สำหรับลูกค้า + โลโก้) ---
+    T(p, "(สำหรับลูกค้า)", FONT_TH, 20, QFont.Weight.DemiBold, TEXT_SOFT, int(CARD.right()-pad-6), int(CARD.top()+pad+4), align="right")
+    logo_width, logo_height = 50, 50
+    logo = _logo(logo_width, logo_height)
+    if logo is not None:
+        p.drawImage(int(CARD.right()-pad-logo_width), int(CARD.top()+pad+28), logo)
+
+    # --- BLOCK 1: ป้ายรายละเอียดผู้โดยสาร ---
+    T(p, "เลขที่ตั๋ว", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y0))
+    T(p, "ชื่อ :", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y0 + 70))
+    T(p, "เบอร์โทร :", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y0 + 106))
+    T(p, "ที่นั่ง :", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y0 + 142))
+    T(p, "ราคา :", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, int(xL_base), int(y0 + 178))  # ว่างเปล่าตามรูป
+
+    # --- BLOCK 2: กรอบรายละเอียดการเดินทาง ---
+    p.setPen(QPen(QColor("#2b2b2b"), 2)); p.setBrush(Qt.BrushStyle.NoBrush); p.drawRect(box)
+    bx_inner = int(box.left()+20)
+    by_inner = int(box.top()+28)
+    line_height = 36
+    T(p, "ขึ้นรถที่", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner)
+    T(p, f"ขอนแก่น เท่านั้น", FONT_TH, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+90, by_inner)
+    T(p, "ลงรถที่", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner + line_height)
+    T(p, "วันที่", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner + line_height*2)
+    T(p, "เวลา", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner + line_height*3)
+    T(p, "ราคา", FONT_TH, 22, QFont.Weight.Normal, TEXT_DARK, bx_inner, by_inner + line_height*4)
+
+    # --- BLOCK 3: ขอบคุณ, หมายเหตุ ---
+    T(p, "ขอบคุณที่ใช้บริการ", FONT_TH, 24, QFont.Weight.DemiBold, TEXT_DARK, int(CARD.center().x()), int(box.bottom() + 30), align="center")
+    T(p, "โปรดแสดงตั๋วนี้แก่พนักงานในวันที่เดินทาง", FONT_TH, 20, QFont.Weight.Normal, TEXT_SOFT, int(CARD.center().x()), int(box.bottom() + 160), align="center")
+
+def draw_ticket(p: QPainter, rect: QRectF, data: dict):
+    # ฟังก์ชันวาดตั๋ว (หน้า 1): ส่วนคงที่จาก cache + ข้อมูลการจอง
+    _layer("ticket", p, rect, _ticket_static)
+    _hints(p)
+    CARD, pad, xL_base, y0, box = _ticket_geom(rect)
+
+    T(p, data["ticket_no"], FONT_EN, 26, QFont.Weight.Bold, TEXT_DARK, int(xL_base), int(y0 + 30))
+    T(p, (data["passenger_name"] or "-"), FONT_TH, 22, QFont.Weight.Bold, TEXT_DARK, int(xL_base + 60), int(y0 + 70))
+    T(p, (data["phone"] or "-"), FONT_EN, 22, QFont.Weight.Bold, TEXT_DARK, int(xL_base + 100), int(y0 + 106))
+    T(p, (data["seat_list_text"] or "-"), FONT_TH, 22, QFont.Weight.Bold, TEXT_DARK, int(xL_base + 70), int(y0 + 142))
+
+    bx_inner = int(box.left()+20)
+    by_inner = int(box.top()+28)
+    line_height = 36
+    T(p, f"  {data['dest']}", FONT_TH, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+90, by_inner + line_height)
+    T(p, f"  {data['date_full_th']}", FONT_TH, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+60, by_inner + line_height*2)
+    T(p, f"  {data['dep_time']}", FONT_TH, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+60, by_inner + line_height*3)
+    T(p, f"  {data['price_each']} บาท/ที่นั่ง", FONT_TH, 22, QFont.Weight.Bold, TEXT_DARK, bx_inner+60, by_inner + line_height*4)
+
+    # วาด Bar Code Mockup (สุ่มจากเลขที่ตั๋ว)
+    bc_top = int(box.bottom() + 60); bc_left = int(CARD.left()+pad+16); bc_right = int(CARD.right()-pad-16); bc_h = 70
+    p.setPen(QPen(QColor("#444"), 1.6))
+    rng = random.Random(data["ticket_no"]); x = bc_left
+    bars = []
+    cached = _use_cache()
+    while x < bc_right:
+        w = rng.choice([1,2,3,4])
+        if cached: bars.append(QLineF(x, bc_top, x, bc_top + bc_h))
+        else: p.drawLine(int(x), bc_top, int(x), bc_top + bc_h)
+        x += w + 1
+    if bars: p.drawLines(bars)   # ครั้งเดียวทั้งแถบ (แทน drawLine ทีละเส้น ~500 ครั้ง)
+
+# ---------- ใบเสร็จ (หน้า 2) ----------
+def _invoice_geom(rect: QRectF):
+    MM_TO_PX = rect.width() / 210
+    def mm_to_px(mm_val): return mm_val * MM_TO_PX
+
+    margin_px = mm_to_px(15)
+    card = QRectF(rect.left() + margin_px, rect.top() + mm_to_px(15), rect.width() - 2*margin_px, rect.height() - 2*mm_to_px(15))
+    header = QRectF(card.left(), card.top(), card.width(), mm_to_px(20))
+    addr_y = int(header.bottom() + mm_to_px(10))         # บรรทัดแรกของที่อยู่บริษัท
+    table_y = addr_y + mm_to_px(4)*5 + mm_to_px(10)      # หัวตารางสรุป
+    row_h = mm_to_px(8.5)
+    sum_y = table_y + row_h*3 + mm_to_px(20)             # กรอบยอดเงิน
+    return mm_to_px, card, header, addr_y, table_y, row_h, sum_y
+
+def _invoice_static(p: QPainter, rect: QRectF):
+    _hints(p)
+    p.fillRect(rect, QColor("#ffffff"))
+    mm_to_px, card, header, addr_y, table_y, row_h, sum_y = _invoice_geom(rect)
+
+    p.setBrush(QColor(CARD_BLUE)); p.setPen(Qt.PenStyle.NoPen); p.drawRoundedRect(header, 18, 18)
+    T(p, "ใบยืนยันการรับเงิน", FONT_TH, 30, QFont.Weight.Bold, "#000", int(header.center().x()), int(header.center().y() + mm_to_px(3)), align="center")
+
+    # --- Address Block ---
+    bx, by = int(card.left() + mm_to_px(1)), addr_y
+    T(p, "GO WITH CREPE COMPANY", FONT_EN, 16, QFont.Weight.Bold, "#000", bx, by)
+    by += mm_to_px(4); T(p, "Baan Suksabai Park Co., Ltd. (Building B)", FONT_EN, 12, QFont.Weight.Normal, "#000", bx, by)
+    by += mm_to_px(4); T(p, "775 Moo 12, Sila Subdistrict,", FONT_EN, 12, QFont.Weight.Normal, "#000", bx, by)
+    by += mm_to_px(4); T(p, "Mueang District, Khon Kaen Province 40000,", FONT_EN, 12, QFont.Weight.Normal, "#000", bx, by)
+    by += mm_to_px(4); T(p, "Thailand", FONT_EN, 12, QFont.Weight.Normal, "#000", bx, by)
+    by += mm_to_px(4); T(p, "Tax ID: 0486739765823", FONT_EN, 12, QFont.Weight.Normal, "#000", bx, by)
+
+    # --- Summary Table (Placeholder) ---
+    T(p, "Description", FONT_EN, 12, QFont.Weight.Bold, "#000", int(card.left() + mm_to_px(10)), int(table_y + mm_to_px(3)))
+    T(p, "Amount(THB)", FONT_EN, 12, QFont.Weight.Bold, "#000", int(card.right() - mm_to_px(30)), int(table_y + mm_to_px(3)), align="right")
+    p.setPen(QPen(QColor("#d9d9d9"), 1)); p.drawLine(QLineF(card.left(), table_y + row_h, card.right(), table_y + row_h))
+
+    # Financial Summary
+    p.setPen(QPen(QColor("#b9d4db"), 2)); p.drawRect(QRectF(card.right() - mm_to_px(70), sum_y, mm_to_px(70), row_h * 3.5))
+    T(p, "Subtotal:", FONT_TH, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(65)), int(sum_y + mm_to_px(6)))
+    T(p, "VAT 7%:", FONT_TH, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(65)), int(sum_y + row_h + mm_to_px(6)))
+    T(p, "TOTAL:", FONT_TH, 18, QFont.Weight.Black, BROWN, int(card.right() - mm_to_px(65)), int(sum_y + row_h*2 + mm_to_px(8)))
+
+def draw_invoice(p: QPainter, rect: QRectF, data: dict):
+    # ฟังก์ชันวาดใบเสร็จ (หน้า 2): ส่วนคงที่จาก cache + ข้อมูลการจอง
+    _layer("invoice", p, rect, _invoice_static)
+    _hints(p)
+    mm_to_px, card, header, addr_y, table_y, row_h, sum_y = _invoice_geom(rect)
+
+    T(p, f"วันที่ทำรายการ {data['date_long_th']}", FONT_TH, 20, QFont.Weight.Normal, BROWN, int(card.right() - mm_to_px(5)), int(header.center().y() + mm_to_px(3)), align="right")
+    T(p, f"Payment of : Bus Ticket No. {data['ticket_no']} ({data['qty']} seats)", FONT_EN, 12, QFont.Weight.Bold, "#000", int(card.left() + mm_to_px(10)), int(table_y + row_h*2 + mm_to_px(3)))
+    T(p, f"{data['subtotal']:,.2f}", FONT_EN, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(5)), int(sum_y + mm_to_px(6)), align="right")
+    T(p, f"{data['vat']:,.2f}", FONT_EN, 16, QFont.Weight.Normal, INK, int(card.right() - mm_to_px(5)), int(sum_y + row_h + mm_to_px(6)), align="right")
+    T(p, f"{data['grand_total']:,.2f}", FONT_TH, 18, QFont.Weight.Black, BROWN, int(card.right() - mm_to_px(5)), int(sum_y + row_h*2 + mm_to_px(8)), align="right")
+
+def new_writer(out_path: str) -> QPdfWriter:
+    writer = QPdfWriter(out_path)
+    writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
+    writer.setResolution(PDF_DPI)
+    writer.setPageMargins(QMarginsF(PDF_MARGIN_MM, PDF_MARGIN_MM, PDF_MARGIN_MM, PDF_MARGIN_MM), QPageLayout.Unit.Millimeter)
+    return writer
+
+def render_pdf(out_path: str, data: dict, progress=None, use_cache: bool = True):
+    """เขียนตั๋ว + ใบเสร็จของการจอง 1 รายการลง out_path (progress(percent, ข้อความ) ถ้ามี)"""
+    report = progress or (lambda pct, msg: None)
+    writer = new_writer(out_path)
+
+    p = QPainter()
+    if not p.begin(writer): raise RuntimeError("ไม่สามารถเริ่มเขียน PDF ได้")
+    try:
+        with _rendering(use_cache):
+            page_rect = QRectF(0, 0, writer.width(), writer.height())
+            report(10, "กำลังสร้างตั๋ว")
+            draw_ticket(p, page_rect, data)
+            writer.newPage()
+            report(55, "กำลังสร้างใบเสร็จ")
+            draw_invoice(p, page_rect, data)
+    finally:
+        p.end()
+    report(100, "บันทึกไฟล์แล้ว")
+
+def render_batch(out_path: str, items: list[dict], use_cache: bool = True):
+    """เขียนหลายการจองลงไฟล์เดียว (ตั๋ว, ใบเสร็จ, ตั๋ว, ใบเสร็จ, ...)"""
+    writer = new_writer(out_path)
+    p = QPainter()
+    if not p.begin(writer): raise RuntimeError("ไม่สามารถเริ่มเขียน PDF ได้")
+    try:
+        with _rendering(use_cache):
+            page_rect = QRectF(0, 0, writer.width(), writer.height())
+            for i, data in enumerate(items):
+                if i: writer.newPage()
+                draw_ticket(p, page_rect, data)
+                writer.newPage()
+                draw_invoice(p, page_rect, data)
+    finally:
+        p.end()
+
+class TicketPdfSignals(QObject):
+    progress = pyqtSignal(int, str)   # (เปอร์เซ็นต์, ข้อความ)
+    finished = pyqtSignal(str)        # พาธไฟล์ที่เขียนเสร็จ
+    failed   = pyqtSignal(str)        # ข้อความผิดพลาด
+
+class TicketPdfJob(QRunnable):
+    """
+    งานสร้าง PDF สำหรับ QThreadPool
+    data ต้องเป็นข้อมูลธรรมดา (str/int/float/list) เพราะถูกอ่านจาก worker thread
+    signal ถูกส่งกลับไปยัง GUI thread แบบ queued อัตโนมัติ
+    """
+    def __init__(self, out_path: str, data: dict):
+        super().__init__()
+        self.out_path = out_path
+        self.data = dict(data)
+        self.signals = TicketPdfSignals()
+
+    def run(self):
+        try:
+            render_pdf(self.out_path, self.data, self.signals.progress.emit)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(self.out_path)
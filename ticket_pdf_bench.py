@@ -0,0 +1,42 @@
+# ticket_pdf_bench.py — Go with CREPE
+# วัดเวลาวาดตั๋ว + ใบเสร็จต่อ 1 การจอง: วาดทุกอย่างใหม่ทุกครั้ง (use_cache=False) เทียบกับใช้ส่วนคงที่จาก cache
+#   python ticket_pdf_bench.py            (ค่าเริ่มต้น 500 การจอง)
+#   python ticket_pdf_bench.py 2000
+
+import os, sys, time, tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtGui import QGuiApplication
+import assets
+import ticket_pdf
+
+ROUNDS = 3
+
+def sample(i: int) -> dict:
+    return {
+        "ticket_no": str(10000000 + i), "passenger_name": "สมชาย ใจดี", "phone": "0812345678",
+        "seat_list_text": "A1, A2", "qty": 2, "price_each": 100, "dest": "อุดรธานี", "dep_time": "09:00",
+        "date_full_th": "วันอาทิตย์ที่ 2 พฤศจิกายน 2568", "date_long_th": "2 พ.ย. 2568",
+        "subtotal": 200.0, "vat": 14.0, "grand_total": 214.0,
+    }
+
+def run(n: int, cached: bool) -> float:
+    items = [sample(i) for i in range(n)]
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "bench.pdf")
+        ticket_pdf.render_batch(out, items[:1], use_cache=cached)     # อุ่นเครื่อง (โหลดฟอนต์/โลโก้, สร้าง cache)
+        t0 = time.perf_counter()
+        ticket_pdf.render_batch(out, items, use_cache=cached)
+        return (time.perf_counter() - t0) * 1000 / n
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    app = QGuiApplication(sys.argv)
+    assets.load_fonts()
+    # สลับรันหลายรอบแล้วเอาเวลาที่ดีที่สุด (ลดผลจากลำดับการรัน/แคชของระบบ)
+    before = after = float("inf")
+    for _ in range(ROUNDS):
+        before = min(before, run(n, cached=False))
+        after = min(after, run(n, cached=True))
+    print(f"{n} การจอง (ตั๋ว + ใบเสร็จ)")
+    print(f"  วาดใหม่ทั้งหมด : {before:6.2f} ms/การจอง")
+    print(f"  ใช้ส่วนคงที่จาก cache : {after:6.2f} ms/การจอง  (เร็วขึ้น {before / after:.1f} เท่า)")